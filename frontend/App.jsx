@@ -11,14 +11,13 @@ class App extends React.Component {
     }
 
     componentDidMount() {
-        this.fetchData();
-        setInterval(this.fetchData.bind(this), 1000);
+        // The server sends the table whenever it changes. EventSource reconnects by itself.
+        this.events = new EventSource(`${window.DATA_URL}/events`, { withCredentials: true });
+        this.events.onmessage = event => this.setState(JSON.parse(event.data));
     }
 
-    fetchData() {
-        fetch(window.DATA_URL, { credentials: 'same-origin' })
-            .then(response => response.json())
-            .then(json => this.setState(json));
+    componentWillUnmount() {
+        this.events.close();
     }
 
     findPlayer(position) {
@@ -14,6 +14,8 @@ const PlayerWidget = props => (
         <ul className="player-info">
             <li>Balance: {props.balance}</li>
             <li>Bet: {props.bet}</li>
+            {props.hand ? <li>Hand: {props.hand}</li> : null}
+            {props.preflopEquity !== undefined ? <li>Preflop: {Math.round(100 * props.preflopEquity)}%</li> : null}
             {props.dealer ? <li>Dealer</li> : null}
             {props.state === 'folded' ? <li>Folded</li> : null}
             {props.state === 'all in' ? <li>All In</li> : null}
@@ -30,6 +32,8 @@ PlayerWidget.propTypes = {
     dealer: PropTypes.bool.isRequired,
     current: PropTypes.bool.isRequired,
     folded: PropTypes.bool.isRequired,
+    preflopEquity: PropTypes.number,
+    hand: PropTypes.string,
     cards: PropTypes.arrayOf(PropTypes.string).isRequired
 };
 
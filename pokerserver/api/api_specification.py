@@ -1,12 +1,58 @@
-from apispec import APISpec
+import gzip
+from hashlib import sha1
+import json
 
 from ..version import DESCRIPTION, NAME, VERSION
 
-API_SPECIFICATION = APISpec(
-    title=NAME,
-    version=VERSION,
-    info=dict(
-        description=DESCRIPTION
-    ),
-    plugins=['apispec.ext.tornado']
-)
+
+class ApiSpecification:
+    """The OpenAPI specification of the registered handlers, built and encoded once on first use.
+
+    apispec is only imported and the docstrings of the handlers are only parsed when the specification is requested
+    for the first time, so neither delays the start of the server.
+    """
+
+    def __init__(self):
+        self.handlers = []
+        self._encoded = None
+        self._compressed = None
+        self._etag = None
+
+    def add_handlers(self, handlers):
+        self.handlers.extend(handlers)
+        self._encoded = self._compressed = self._etag = None
+
+    def to_dict(self):
+        from apispec import APISpec
+        specification = APISpec(
+            title=NAME,
+            version=VERSION,
+            info=dict(
+                description=DESCRIPTION
+            ),
+            plugins=['apispec.ext.tornado']
+        )
+        for handler in self.handlers:
+            specification.add_path(urlspec=handler)
+        return specification.to_dict()
+
+    @property
+    def encoded(self):
+        if self._encoded is None:
+            self._encoded = json.dumps(self.to_dict()).encode()
+        return self._encoded
+
+    @property
+    def compressed(self):
+        if self._compressed is None:
+            self._compressed = gzip.compress(self.encoded)
+        return self._compressed
+
+    @property
+    def etag(self):
+        if self._etag is None:
+            self._etag = '"{}"'.format(sha1(self.encoded).hexdigest())
+        return self._etag
+
+
+API_SPECIFICATION = ApiSpecification()
@@ -0,0 +1,210 @@
+from argparse import ArgumentParser
+from collections import OrderedDict
+import json
+import platform
+import random
+import sys
+from time import perf_counter
+
+from pokerserver.models import CATEGORY_NAMES, evaluate, get_all_cards, rank
+from pokerserver.models.card import RANKS, SUITS
+
+EVALUATORS = OrderedDict([
+    ('rank', rank),
+    ('evaluate', evaluate)
+])
+REFERENCE_EVALUATOR = 'rank'
+
+HAND_SIZES = (5, 6, 7)
+MAX_MISMATCH_EXAMPLES = 10
+MAX_TRIES = 1000
+
+_RANK_STRINGS = {value: string for string, value in RANKS.items()}
+
+
+def _card(rank_value, suit):
+    return _RANK_STRINGS[14 if rank_value == 1 else rank_value] + suit
+
+
+def _distinct_ranks(rng, number):
+    return rng.sample(range(2, 15), number)
+
+
+def _straight_ranks(rng):
+    top = rng.randint(5, 14)
+    return [top - offset for offset in range(5)]
+
+
+def _high_card(rng):
+    return [_card(rank_value, rng.choice(SUITS)) for rank_value in _distinct_ranks(rng, 5)]
+
+
+def _pair(rng):
+    pair, *kickers = _distinct_ranks(rng, 4)
+    return [_card(pair, suit) for suit in rng.sample(SUITS, 2)] + [_card(r, rng.choice(SUITS)) for r in kickers]
+
+
+def _two_pairs(rng):
+    pair1, pair2, kicker = _distinct_ranks(rng, 3)
+    return ([_card(pair1, suit) for suit in rng.sample(SUITS, 2)] +
+            [_card(pair2, suit) for suit in rng.sample(SUITS, 2)] +
+            [_card(kicker, rng.choice(SUITS))])
+
+
+def _three_of_a_kind(rng):
+    triple, *kickers = _distinct_ranks(rng, 3)
+    return [_card(triple, suit) for suit in rng.sample(SUITS, 3)] + [_card(r, rng.choice(SUITS)) for r in kickers]
+
+
+def _straight(rng):
+    return [_card(rank_value, rng.choice(SUITS)) for rank_value in _straight_ranks(rng)]
+
+
+def _flush(rng):
+    suit = rng.choice(SUITS)
+    return [_card(rank_value, suit) for rank_value in _distinct_ranks(rng, 5)]
+
+
+def _full_house(rng):
+    triple, pair = _distinct_ranks(rng, 2)
+    return [_card(triple, suit) for suit in rng.sample(SUITS, 3)] + [_card(pair, suit) for suit in rng.sample(SUITS, 2)]
+
+
+def _four_of_a_kind(rng):
+    quad, kicker = _distinct_ranks(rng, 2)
+    return [_card(quad, suit) for suit in SUITS] + [_card(kicker, rng.choice(SUITS))]
+
+
+def _straight_flush(rng):
+    suit = rng.choice(SUITS)
+    return [_card(rank_value, suit) for rank_value in _straight_ranks(rng)]
+
+
+# Indexed like CATEGORY_NAMES
+_CATEGORY_GENERATORS = [
+    _high_card,
+    _pair,
+    _two_pairs,
+    _three_of_a_kind,
+    _straight,
+    _flush,
+    _full_house,
+    _four_of_a_kind,
+    _straight_flush
+]
+
+
+def generate_hand(rng, category, size):
+    """Generate a random hand with `size` cards whose best five cards belong to the given category."""
+    all_cards = get_all_cards()
+    for _ in range(MAX_TRIES):
+        cards = _CATEGORY_GENERATORS[category](rng)
+        remaining_cards = [card for card in all_cards if card not in cards]
+        cards += rng.sample(remaining_cards, size - len(cards))
+        rng.shuffle(cards)
+        if rank(cards)[0] == category:
+            return cards
+    raise RuntimeError('Could not generate a hand of category {}'.format(CATEGORY_NAMES[category]))
+
+
+def generate_hands(seed, hands_per_category, sizes=HAND_SIZES):
+    """Return a dict mapping (size, category) to a list of hands. The same seed always yields the same hands."""
+    rng = random.Random(seed)
+    return OrderedDict(
+        ((size, category), [generate_hand(rng, category, size) for _ in range(hands_per_category)])
+        for size in sizes
+        for category in range(len(CATEGORY_NAMES))
+    )
+
+
+def measure(evaluator, hands, repeat):
+    start = perf_counter()
+    for _ in range(repeat):
+        for cards in hands:
+            evaluator(cards)
+    return perf_counter() - start
+
+
+def find_mismatches(evaluator, reference, hands):
+    mismatches = []
+    for cards in hands:
+        expected, actual = reference(cards), evaluator(cards)
+        if actual != expected:
+            mismatches.append({'cards': cards, 'expected': expected, 'actual': actual})
+    return mismatches
+
+
+def run_benchmark(seed, hands_per_category, sizes=HAND_SIZES, repeat=3, evaluators=None):
+    # pylint: disable=too-many-locals
+    evaluators = evaluators or EVALUATORS
+    hands_by_group = generate_hands(seed, hands_per_category, sizes)
+    reference = evaluators[REFERENCE_EVALUATOR]
+
+    results = OrderedDict()
+    for name, evaluator in evaluators.items():
+        total_seconds = 0
+        total_hands = 0
+        categories = OrderedDict()
+        mismatches = []
+        for (size, category), hands in hands_by_group.items():
+            seconds = measure(evaluator, hands, repeat)
+            total_seconds += seconds
+            total_hands += len(hands) * repeat
+            category_result = categories.setdefault(CATEGORY_NAMES[category], OrderedDict())
+            category_result[str(size)] = {'mean_latency_us': 1e6 * seconds / (len(hands) * repeat)}
+            if evaluator is not reference:
+                mismatches.extend(find_mismatches(evaluator, reference, hands))
+
+        results[name] = OrderedDict([
+            ('hands_per_second', total_hands / total_seconds if total_seconds > 0 else None),
+            ('mismatches', len(mismatches)),
+            ('mismatch_examples', mismatches[:MAX_MISMATCH_EXAMPLES]),
+            ('categories', categories)
+        ])
+
+    reference_speed = results[REFERENCE_EVALUATOR]['hands_per_second']
+    for result in results.values():
+        speed = result['hands_per_second']
+        result['speedup'] = speed / reference_speed if speed and reference_speed else None
+
+    return OrderedDict([
+        ('seed', seed),
+        ('hands_per_category', hands_per_category),
+        ('sizes', list(sizes)),
+        ('repeat', repeat),
+        ('reference', REFERENCE_EVALUATOR),
+        ('python', platform.python_version()),
+        ('evaluators', results)
+    ])
+
+
+def main():
+    parser = ArgumentParser(description='Benchmark and cross-check the hand evaluators.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for generating the random hands.')
+    parser.add_argument('--hands', type=int, default=1000, dest='hands_per_category',
+                        help='Number of hands per category and hand size.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(HAND_SIZES), choices=HAND_SIZES,
+                        help='Number of cards per hand.')
+    parser.add_argument('--repeat', type=int, default=3, help='How often each hand is evaluated.')
+    parser.add_argument('--evaluators', nargs='+', default=list(EVALUATORS), choices=list(EVALUATORS),
+                        help='Evaluators to benchmark. The reference evaluator is always included.')
+    parser.add_argument('-o', '--output', type=str, default=None, help='Write the JSON results to this file.')
+    args = parser.parse_args()
+
+    names = [REFERENCE_EVALUATOR] + [name for name in args.evaluators if name != REFERENCE_EVALUATOR]
+    result = run_benchmark(args.seed, args.hands_per_category, args.sizes, args.repeat,
+                           OrderedDict((name, EVALUATORS[name]) for name in names))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(result, file, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+
+    if any(evaluator_result['mismatches'] for evaluator_result in result['evaluators'].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from argparse import ArgumentParser
+from multiprocessing import Pool, cpu_count
+
+from pokerserver.models import compute_equity_matrix, write_equity_table
+
+
+def main():
+    parser = ArgumentParser(description='Precompute the preflop equities of all heads-up starting hand matchups')
+    parser.add_argument(type=str, nargs='?', default='preflop_equity.bin', help='Path to the output file.',
+                        dest='path')
+    parser.add_argument('--samples', type=int, default=1000, help='Number of sampled deals per matchup.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for sampling the deals.')
+    parser.add_argument('--processes', type=int, default=cpu_count(), help='Number of worker processes.')
+    args = parser.parse_args()
+
+    if args.processes > 1:
+        with Pool(args.processes) as pool:
+            matrix = compute_equity_matrix(args.samples, args.seed, pool)
+    else:
+        matrix = compute_equity_matrix(args.samples, args.seed)
+    write_equity_table(args.path, matrix, args.samples)
+
+
+if __name__ == "__main__":
+    main()
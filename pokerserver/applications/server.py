@@ -5,6 +5,7 @@ from logging.config import dictConfig
 import os
 from os.path import abspath, dirname, join
 import sys
+from time import time
 
 from tornado.ioloop import IOLoop
 from tornado.platform.asyncio import AsyncIOMainLoop
@@ -12,13 +13,16 @@ from tornado.web import Application
 
 import pokerserver
 from pokerserver.configuration import LOGGING, ServerConfig
-from pokerserver.controllers import HANDLERS
-from pokerserver.database import Database, TableConfig
-from pokerserver.models import Table
+from pokerserver.controllers import HANDLERS, UUIDCache
+from pokerserver.database import (Database, EventsRelation, HandHistoryRelation, PlayerStatsRelation,
+                                  SnapshotsRelation, StatisticsRollupsRelation, TableConfig, TimersRelation)
+from pokerserver.models import (HandArchive, PlayerStatsAggregator, Statistics, Table, TimerWheel, compact_hand_history,
+                                downsample_rollups, load_equity_table, recover_timers)
 
 LOG = logging.getLogger(__name__)
 
 ENSURE_TABLES_INTERVAL_SECONDS = 10
+DOWNSAMPLE_INTERVAL_SECONDS = 5 * 60
 
 
 def make_app(args):
@@ -32,8 +36,21 @@ def make_app(args):
 
 
 async def setup(args):
-    ServerConfig.set(timeout=args.timeout or None)
+    ServerConfig.set(timeout=args.timeout or None, equity_table=args.equity_table)
+    if args.equity_table:
+        load_equity_table(args.equity_table)  # only maps the file, fails early if it is invalid
     await Database.connect(args.db)
+    # Databases created by older versions lack these relations.
+    for relation in [TimersRelation, EventsRelation, SnapshotsRelation, HandHistoryRelation, PlayerStatsRelation,
+                     StatisticsRollupsRelation]:
+        if not await relation.relation_exists():
+            await relation.create_relation()
+    number_of_timers = await recover_timers(args.turn_delay, args.showdown_timeout)
+    LOG.info('Recovered %s timers of running games.', number_of_timers)
+    leaderboard = await Statistics.leaderboard()
+    LOG.info('Loaded the statistics of %s players.', len(leaderboard))
+    number_of_uuids = await UUIDCache.load()
+    LOG.info('Loaded the uuids of %s players.', number_of_uuids)
 
 
 async def ensure_free_tables(args):
@@ -56,7 +73,39 @@ async def ensure_free_tables(args):
             LOG.exception('An error occurred in ensure_free_tables!')
 
 
+async def compact_archive(args):
+    archive = HandArchive(args.archive)
+    while True:
+        try:
+            number_of_hands = await compact_hand_history(archive)
+            LOG.info('Archived %s hands.', number_of_hands)
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception('An error occurred in compact_archive!')
+        await sleep(args.archive_interval)
+
+
+async def flush_player_stats(args):
+    while True:
+        await sleep(args.stats_interval)
+        try:
+            await PlayerStatsAggregator.instance().flush()
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception('An error occurred in flush_player_stats!')
+
+
+async def downsample_statistics():
+    while True:
+        try:
+            number_of_buckets = await downsample_rollups(time())
+            LOG.info('Downsampled %s statistics buckets.', number_of_buckets)
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception('An error occurred in downsample_statistics!')
+        await sleep(DOWNSAMPLE_INTERVAL_SECONDS)
+
+
 async def teardown():
+    TimerWheel.clear()
+    await PlayerStatsAggregator.instance().flush()
     await Database.instance().close_connection()
 
 
@@ -83,12 +132,24 @@ def main():
     parser.add_argument('--password', default='', type=str, help='Password to protect the frontend.')
     parser.add_argument('--showdown-timeout', default=None, type=float,
                         help='Waiting time in seconds before the next hand starts after a showdown.')
+    parser.add_argument('--equity-table', default=None, type=str,
+                        help='Path to a preflop equity table created with createequitytable.')
+    parser.add_argument('--archive', default=None, type=str,
+                        help='Directory of a columnar hand archive for analytics, which is updated in the background.')
+    parser.add_argument('--archive-interval', default=60, type=float,
+                        help='Interval between updates of the hand archive in seconds.')
+    parser.add_argument('--stats-interval', default=10, type=float,
+                        help='Interval at which VPIP, PFR and showdown counts are stored in the database in seconds.')
     args = parser.parse_args()
 
     LOG.debug('Starting server...')
     AsyncIOMainLoop().install()
     get_event_loop().run_until_complete(setup(args))
     get_event_loop().create_task(ensure_free_tables(args))
+    get_event_loop().create_task(flush_player_stats(args))
+    get_event_loop().create_task(downsample_statistics())
+    if args.archive:
+        get_event_loop().create_task(compact_archive(args))
     app = make_app(args)
     LOG.debug('Listening on %s:%s...', args.ip, args.port)
     app.listen(address=args.ip, port=args.port)
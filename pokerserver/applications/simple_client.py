@@ -1,5 +1,6 @@
 from argparse import ArgumentParser
 from pokerserver.client import SimpleClient
+from pokerserver.models import load_equity_table
 
 
 def main():
@@ -9,10 +10,12 @@ def main():
     parser.add_argument('-p', '--port', type=int, help='Server port number', default=5555)
     parser.add_argument('-s', '--host', help='Server address', default='localhost')
     parser.add_argument('-u', '--uuid', help='UUID of the player', default=None)
+    parser.add_argument('-e', '--equity-table', help='Path to a preflop equity table', default=None)
     parser.add_argument(help='Player name', dest='name')
     args = parser.parse_args()
 
-    client = SimpleClient(args.host, args.port, args.name, args.uuid)
+    equity_table = load_equity_table(args.equity_table) if args.equity_table else None
+    client = SimpleClient(args.host, args.port, args.name, args.uuid, equity_table)
     client.play()
 
 
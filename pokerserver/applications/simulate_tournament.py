@@ -0,0 +1,49 @@
+from argparse import ArgumentParser
+import json
+import sys
+from time import perf_counter
+
+from pokerserver.simulator import simulate, summarize
+
+
+def main():
+    parser = ArgumentParser(description='Let bot strategies play against each other without server and database.')
+    parser.add_argument('strategies', type=str, nargs='+',
+                        help='One strategy per seat: simple, random, calling or module:callable.')
+    parser.add_argument('--tables', type=int, default=100, help='Number of independent tables.')
+    parser.add_argument('--max-hands', type=int, default=1000, help='Maximum number of hands per table.')
+    parser.add_argument('--start-balance', type=int, default=40, help='Start balance of each player.')
+    parser.add_argument('--small-blind', type=int, default=1, help='Small blind.')
+    parser.add_argument('--big-blind', type=int, default=2, help='Big blind.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for shuffling and for the strategies.')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='Number of worker processes (default: one per CPU).')
+    parser.add_argument('-e', '--equity-table', type=str, default=None,
+                        help='Preflop equity table for the simple strategy.')
+    parser.add_argument('-o', '--output', type=str, default=None, help='Write the JSON results to this file.')
+    args = parser.parse_args()
+
+    if len(args.strategies) < 2:
+        parser.error('At least two strategies are needed.')
+
+    start = perf_counter()
+    results = simulate(
+        args.strategies, args.tables, seed=args.seed, processes=args.processes, max_hands=args.max_hands,
+        start_balance=args.start_balance, small_blind=args.small_blind, big_blind=args.big_blind,
+        equity_table_path=args.equity_table
+    )
+    seconds = perf_counter() - start
+    summary = summarize(results)
+    summary['seconds'] = seconds
+    summary['hands_per_second'] = summary['hands'] / seconds if seconds > 0 else None
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(summary, file, indent=2)
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
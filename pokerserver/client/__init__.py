@@ -1,3 +1,3 @@
 from .base import BaseClient, Table, TableInfo, Pot, RequestError
-from .simple import SimpleClient
+from .simple import SimpleClient, SimpleStrategy
 from .cli import CliClient
@@ -1,4 +1,7 @@
+from copy import deepcopy
 from enum import Enum
+from http import HTTPStatus
+from urllib.parse import urlencode
 
 from requests import HTTPError, Session, ConnectionError as RequestsConnectionError
 from requests.adapters import HTTPAdapter
@@ -44,6 +47,9 @@ class Table:
         self.pots = [Pot(**pot_dict) for pot_dict in kwargs.get('pots', [])]
         self.open_cards = kwargs.get('open_cards')
         self.state = TableState(kwargs.get('state', 'closed'))
+        self.version = kwargs.get('version')
+        # Legal actions and amounts, only sent to the current player.
+        self.turn = kwargs.get('turn')
 
     def __eq__(self, other):
         return isinstance(other, Table) and self.__dict__ == other.__dict__
@@ -78,13 +84,14 @@ class Pot:
 
 
 class Player:
-    def __init__(self, name, position, balance, bet, cards, state, table_id):
+    def __init__(self, name, position, balance, bet, cards, state, table_id, hand=None):
         # pylint: disable=too-many-arguments
         self.name = name
         self.position = int(position)
         self.balance = int(balance)
         self.bet = int(bet)
         self.cards = cards
+        self.hand = hand
         self.state = PlayerState(state)
         self.table_id = int(table_id)
 
@@ -102,6 +109,28 @@ class PlayerState(Enum):
     SITTING_OUT = 'sitting out'
 
 
+def apply_patch(document, patch):
+    """Return a copy of `document` with the "add", "remove" and "replace" operations of a JSON patch applied."""
+    document = deepcopy(document)
+    for operation in patch:
+        *parents, last = [part.replace('~1', '/').replace('~0', '~') for part in operation['path'].split('/')[1:]]
+        target = document
+        for part in parents:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        key = int(last) if isinstance(target, list) else last
+        if operation['op'] == 'replace':
+            target[key] = operation['value']
+        elif operation['op'] == 'add' and isinstance(target, list):
+            target.insert(key, operation['value'])
+        elif operation['op'] == 'add':
+            target[key] = operation['value']
+        elif operation['op'] == 'remove':
+            del target[key]
+        else:
+            raise ValueError('Unsupported operation {}'.format(operation['op']))
+    return document
+
+
 class BaseClient:
     def __init__(self, host, port, log_requests=False):
         self.host = host
@@ -109,6 +138,8 @@ class BaseClient:
         self.log_requests = log_requests
         self.session = Session()
         self.session.mount('http://', HTTPAdapter(max_retries=3))
+        self._cache = {}
+        self._table_data = {}
 
     def receive_uuid(self, player_name):
         try:
@@ -117,16 +148,40 @@ class BaseClient:
         except RequestError:
             return None
 
-    def fetch_table(self, name, uuid=None):
-        if uuid:
-            response = self.fetch('/table/{}?uuid={}'.format(name, uuid))
-        else:
-            response = self.fetch('/table/{}'.format(name))
-        return Table(name, **response)
+    def fetch_table(self, name, uuid=None, since=None):
+        """Load a table. With `since`, the server waits until the version of the table differs from it.
 
-    def fetch_tables(self):
-        response = self.fetch('/tables')
-        return [TableInfo(**table_data) for table_data in response['tables']]
+        After the first request only the changes since the last loaded version are transferred.
+        """
+        key = ('table', name, uuid)
+        last_data = self._table_data.get(key)
+        arguments = []
+        if uuid:
+            arguments.append('uuid={}'.format(uuid))
+        if since is not None:
+            arguments.append('since={}'.format(since))
+        if last_data is not None and last_data.get('epoch') is not None:
+            arguments.append('delta_from={}-{}'.format(last_data['epoch'], last_data['version']))
+        url = '/table/{}'.format(name)
+        if arguments:
+            url += '?' + '&'.join(arguments)
+
+        def parse(response):
+            data = response
+            if 'patch' in response:
+                data = dict(apply_patch(last_data, response['patch']), version=response['version'])
+            self._table_data[key] = data
+            return Table(name, **data)
+
+        # The view of a table depends on the uuid but not on since.
+        return self.fetch_cached(url, parse, key=key)
+
+    def fetch_tables(self, **filters):
+        """Load the table infos, e.g. `fetch_tables(min_free_seats=2)`, see /tables for the filters."""
+        url = '/tables'
+        if filters:
+            url += '?' + urlencode(sorted(filters.items()))
+        return self.fetch_cached(url, lambda response: [TableInfo(**table_data) for table_data in response['tables']])
 
     @staticmethod
     def find_free_table(table_infos, *player_names):
@@ -145,6 +200,11 @@ class BaseClient:
             json={'position': position}
         )
 
+    def find_seats(self, uuid, *group_uuids):
+        """Join any table with free seats for the player and the group. Returns the table name and the positions."""
+        response = self.post('/matchmaking?uuid={}'.format(uuid), json={'uuids': list(group_uuids)}).json()
+        return response['table'], response['positions']
+
     def fold(self, table_name, uuid):
         url = '/table/{}/actions/fold?uuid={}'.format(table_name, uuid)
         self.post(url)
@@ -178,11 +238,31 @@ class BaseClient:
         return response
 
     def fetch(self, url, as_json=True):
+        response = self.get(url)
+        return response.json() if as_json else response.text
+
+    def fetch_cached(self, url, parse, key=None):
+        """Fetch JSON and return it parsed by `parse`.
+
+        The ETag of the response is sent with the next request for the same `key` (the url by default). If the
+        response has not changed, the server answers with 304 and the last parsed value is returned again.
+        """
+        key = url if key is None else key
+        etag, value = self._cache.get(key, (None, None))
+        response = self.get(url, headers={'If-None-Match': etag} if etag else None)
+        if response.status_code == HTTPStatus.NOT_MODIFIED.value:
+            return value
+        value = parse(response.json())
+        if 'Etag' in response.headers:
+            self._cache[key] = (response.headers['Etag'], value)
+        return value
+
+    def get(self, url, headers=None):
         url = self.build_url(url)
         if self.log_requests:
             self.log("GET {}... ".format(url), new_line=False)
         try:
-            response = self.session.get(url)
+            response = self.session.get(url, headers=headers) if headers else self.session.get(url)
             response.raise_for_status()
             if self.log_requests:
                 self.log('{}'.format(response.status_code))
@@ -192,8 +272,7 @@ class BaseClient:
         except RequestsConnectionError:
             self.log('ConnectionError')
             raise RequestError
-
-        return response.json() if as_json else response.text
+        return response
 
     def build_url(self, url):
         url = 'http://{}:{}{}'.format(self.host, self.port, url)
@@ -17,10 +17,11 @@ class CliClient(BaseClient):
     def run(self):
         self.register_players(self.player_count)
         self.find_table_and_join()
+        since = None
         try:
             while True:
                 try:
-                    table = self.load_table_and_players()
+                    table = self.load_table_and_players(since)
                 except RequestError:
                     sleep(1)
                     continue
@@ -32,8 +33,12 @@ class CliClient(BaseClient):
 
                 if self.table.current_player in self.player_names:
                     self.read_and_execute_command()
+                    since = None
                 else:
-                    sleep(self.INTERVAL)
+                    # Wait for the next change of the table, or poll if the server does not support waiting.
+                    since = self.table.version
+                    if since is None:
+                        sleep(self.INTERVAL)
         except EOFError:
             print()
 
@@ -52,21 +57,11 @@ class CliClient(BaseClient):
             self.uuids[name] = uuid
 
     def find_table_and_join(self):
-        table = self.find_suitable_table()
-        for name, position in zip(self.player_names, table.find_free_positions()):
-            self.join_table(table, position, self.uuids[name])
-        self.table_name = table.name  # table is a TableInfo, full data is loaded later
-
-    def find_suitable_table(self):
-        tables = self.fetch_tables()
-        for table in tables:
-            if len(table.players) + len(self.player_names) <= table.max_player_count:
-                return table
-        else:
-            raise RuntimeError('No suitable table')
+        uuids = [self.uuids[name] for name in self.player_names]
+        self.table_name, _ = self.find_seats(*uuids)
 
-    def load_table_and_players(self):
-        table = self.fetch_table(self.table_name)
+    def load_table_and_players(self, since=None):
+        table = self.fetch_table(self.table_name, since=since)
         # Load the same table separately for each player to get the cards.
         # Insert the cards in the table above.
         for player in table.players:
@@ -1,57 +1,55 @@
-from http import HTTPStatus
 from random import choice
 from time import sleep
 
-from requests import HTTPError
-
 from pokerserver.client import BaseClient
 
 POLL_INTERVAL_SECONDS = 1
+FOLD_EQUITY = 0.45
+RAISE_EQUITY = 0.6
 
 
-class SimpleClient(BaseClient):
-    def __init__(self, host, port, player_name, uuid):
-        super().__init__(host, port)
-        self.player_name = player_name
-        self.uuid = uuid
-
-    def play(self):
-        self.ensure_uuid()
-        table_info, position = self.join()
+class SimpleStrategy:
+    """Decides the turns of the `SimpleClient`. It does not need a server, so the simulator can use it as well."""
 
-        while True:
-            table = self.fetch_table(table_info.name)
-            if self.player_name not in [player.name for player in table.players]:
-                self.log('I am no longer at this table.')
-                break
-            if table.is_closed:
-                self.log('Table was closed.')
-                break
-            if table.current_player == self.player_name:
-                self.make_turn(table, position)
-            sleep(POLL_INTERVAL_SECONDS)
+    def __init__(self, equity_table=None):
+        self.equity_table = equity_table
 
-    def make_turn(self, table, position):  # pylint: disable=unused-argument
-        self.log("It's my turn")
+    def decide_turn(self, table, position):
+        """Return 'check', 'fold', 'call' or ('raise', amount)."""
         if self.can_check(table, position):
-            self.check(table.name, self.uuid)
-            return
-
-        actions = {
-            'fold': lambda: self.fold(table.name, self.uuid),
-            'call': lambda: self.call(table.name, self.uuid)
-        }
+            return 'check'
 
+        action_names = ['fold', 'call']
         if self.can_raise(table, position):
-            actions['raise'] = lambda: self.raise_bet(table.name, self.uuid, self.get_max_raise(table, position))
-
-        action = choice(list(actions.keys()))
-        actions[action]()
+            action_names.append('raise')
+
+        action = self.choose_action(table, position, action_names)
+        if action == 'raise':
+            return action, self.get_max_raise(table, position)
+        return action
+
+    def choose_action(self, table, position, action_names):
+        equity = self.get_preflop_equity(table, position)
+        if equity is None:
+            return choice(action_names)
+        if equity < FOLD_EQUITY:
+            return 'fold'
+        if equity > RAISE_EQUITY and 'raise' in action_names:
+            return 'raise'
+        return 'call'
+
+    def get_preflop_equity(self, table, position):
+        if self.equity_table is None or table.round != 'preflop':
+            return None
+        cards = next(player.cards for player in table.players if player.position == position)
+        return self.equity_table.equity_of_cards(cards) if len(cards) == 2 else None
 
     @classmethod
     def get_max_raise(cls, table, position):
         balance = cls.get_balance(table, position)
         maximum_bet = cls.maximum_bet(table, position)
+        if table.turn is not None:
+            return max(table.turn['min_raise'], min(table.turn['max_raise'], 3 * maximum_bet))
         return min(balance, 3 * maximum_bet)
 
     @classmethod
@@ -60,12 +58,16 @@ class SimpleClient(BaseClient):
 
     @classmethod
     def can_check(cls, table, position):
+        if table.turn is not None:
+            return 'check' in table.turn['actions']
         my_bet = next(player.bet for player in table.players if player.position == position)
         maximum_bet = cls.maximum_bet(table, position)
         return my_bet >= maximum_bet
 
     @classmethod
     def can_raise(cls, table, position):
+        if table.turn is not None:
+            return 'raise' in table.turn['actions']
         balance = cls.get_balance(table, position)
         my_bet = next(player.bet for player in table.players if player.position == position)
         maximum_bet = cls.maximum_bet(table, position)
@@ -75,24 +77,55 @@ class SimpleClient(BaseClient):
     def maximum_bet(table, position):
         return max((player.bet for player in table.players if player.position != position))
 
+
+class SimpleClient(SimpleStrategy, BaseClient):
+    def __init__(self, host, port, player_name, uuid, equity_table=None):  # pylint: disable=too-many-arguments
+        BaseClient.__init__(self, host, port)
+        SimpleStrategy.__init__(self, equity_table)
+        self.player_name = player_name
+        self.uuid = uuid
+
+    def play(self):
+        self.ensure_uuid()
+        table_name, position = self.join()
+
+        version = None
+        while True:
+            table = self.fetch_table(table_name, self.uuid, since=version)
+            if self.player_name not in [player.name for player in table.players]:
+                self.log('I am no longer at this table.')
+                break
+            if table.is_closed:
+                self.log('Table was closed.')
+                break
+            if table.current_player == self.player_name:
+                self.make_turn(table, position)
+            if table.version is None:
+                sleep(POLL_INTERVAL_SECONDS)  # the server does not support waiting for changes
+            version = table.version
+
+    def make_turn(self, table, position):
+        self.log("It's my turn")
+        decision = self.decide_turn(table, position)
+        if decision == 'check':
+            self.check(table.name, self.uuid)
+        elif decision == 'fold':
+            self.fold(table.name, self.uuid)
+        elif decision == 'call':
+            self.call(table.name, self.uuid)
+        else:
+            _, amount = decision
+            self.raise_bet(table.name, self.uuid, amount)
+
     def ensure_uuid(self):
         if self.uuid is None:
             self.uuid = self.receive_uuid(self.player_name)
             self.log("Received UUID: {}".format(self.uuid))
 
     def join(self):
-        while True:
-            tables = self.fetch_tables()
-            free_table = self.find_free_table(tables, self.player_name)
-            free_position = free_table.find_free_position()
-
-            self.log("Joining {} at {}...".format(free_table.name, free_position))
-            try:
-                self.join_table(free_table, free_position, self.uuid)
-                return free_table, free_position
-            except HTTPError as error:
-                if error.response.status_code != HTTPStatus.CONFLICT.value:
-                    raise
+        table_name, positions = self.find_seats(self.uuid)
+        self.log("Joined {} at {}".format(table_name, positions[self.player_name]))
+        return table_name, positions[self.player_name]
 
     def log(self, message, new_line=True):
         super().log('[{}] {}'.format(self.player_name, message), new_line=new_line)
@@ -1,26 +1,33 @@
 from pokerserver.api import API_SPECIFICATION
 from .api import ApiController, ApiDocsController
-from .base import BaseController
-from .frontend import DevCookieController, FrontendDataController, IndexController
+from .base import BaseController, UUIDCache
+from .frontend import DevCookieController, FrontendDataController, FrontendEventsController, IndexController
+from .history import HistoryController
 from .info import InfoController
+from .matchmaking import MatchmakingController
+from .socket import TableSocketController
 from .statistics import StatisticsController
 from .table import CallController, CheckController, FoldController, JoinController, RaiseController, TableController
 from .tables import TablesController
 from .uuid import UUIDController
 
 _CONTROLLERS = [
+    FrontendEventsController,  # before FrontendDataController, which would match its route as well
     FrontendDataController,
     IndexController,
     DevCookieController,
     InfoController,
     TableController,
+    TableSocketController,
     TablesController,
     JoinController,
+    MatchmakingController,
     FoldController,
     CallController,
     CheckController,
     RaiseController,
     StatisticsController,
+    HistoryController,
     UUIDController,
     ApiController,
     ApiDocsController
@@ -28,5 +35,4 @@ _CONTROLLERS = [
 
 HANDLERS = [(controller.route, controller) for controller in _CONTROLLERS]
 
-for handler in HANDLERS:
-    API_SPECIFICATION.add_path(urlspec=handler)
+API_SPECIFICATION.add_handlers(HANDLERS)
@@ -1,6 +1,7 @@
 from tornado.web import RequestHandler
 
 from pokerserver.api import API_SPECIFICATION
+from .base import is_not_modified
 
 
 class ApiController(RequestHandler):
@@ -9,12 +10,42 @@ class ApiController(RequestHandler):
     async def get(self):
         """Endpoint for OpenAPI specification.
         ---
-        description: Returns the OpenAPI/Swagger specification.
+        description: Returns the OpenAPI/Swagger specification, gzip compressed if the client accepts it.
         responses:
             200:
                 description: Successful operation.
+            304:
+                description: The specification has not changed since the response with the ETag in "If-None-Match".
         """
-        self.write(API_SPECIFICATION.to_dict())
+        compress = accepts_encoding(self.request.headers.get('Accept-Encoding', ''), 'gzip')
+        self.set_header('Vary', 'Accept-Encoding')
+        # The compressed and the uncompressed document are different representations with different ETags.
+        etag = API_SPECIFICATION.etag[:-1] + '-gzip"' if compress else API_SPECIFICATION.etag
+        if is_not_modified(self, etag):
+            return
+        self.set_header('Content-Type', 'application/json; charset=UTF-8')
+        if compress:
+            self.set_header('Content-Encoding', 'gzip')
+            self.write(API_SPECIFICATION.compressed)
+        else:
+            self.write(API_SPECIFICATION.encoded)
+
+
+def accepts_encoding(accept_encoding, encoding):
+    """Whether the Accept-Encoding header allows `encoding`, an encoding with "q=0" or "*;q=0" is not acceptable."""
+    qualities = {}
+    for item in accept_encoding.split(','):
+        name, *parameters = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+    return qualities.get(encoding, qualities.get('*', 0.0)) > 0
 
 
 class ApiDocsController(RequestHandler):
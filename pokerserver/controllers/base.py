@@ -1,4 +1,5 @@
 import asyncio
+from collections import OrderedDict
 import functools
 from http import HTTPStatus
 import logging
@@ -9,16 +10,55 @@ from tornado.escape import json_decode
 from tornado.web import HTTPError as TornadoHTTPError, MissingArgumentError, RequestHandler
 
 from pokerserver.database import UUIDsRelation
-from pokerserver.models import Match, Player, Table, TableNotFoundError
+from pokerserver.models import Match, Table, TableNotFoundError, TableVersions
 
 LOG = logging.getLogger(__name__)
 
+LONG_POLL_TIMEOUT_SECONDS = 30
+
+
+class UUIDCache:
+    """Player names by uuid, least recently used first.
+
+    A uuid never changes its player once registered, so entries never get stale. The cache is filled at startup and
+    by registrations, uuids evicted because of the size limit are loaded again on their next use.
+    """
+    MAX_SIZE = 100000
+    _player_names = OrderedDict()
+
+    @classmethod
+    async def load(cls):
+        """Load the uuids of all players, at most `MAX_SIZE`. Returns the number of uuids loaded."""
+        cls.clear()
+        for uuid, player_name in (await UUIDsRelation.load_all()).items():
+            if len(cls._player_names) >= cls.MAX_SIZE:
+                break
+            cls._player_names[uuid] = player_name
+        return len(cls._player_names)
+
+    @classmethod
+    def add(cls, uuid, player_name):
+        cls._player_names[uuid] = player_name
+        cls._player_names.move_to_end(uuid)
+        if len(cls._player_names) > cls.MAX_SIZE:
+            cls._player_names.popitem(last=False)
+
+    @classmethod
+    def get(cls, uuid):
+        player_name = cls._player_names.get(uuid)
+        if player_name is not None:
+            cls._player_names.move_to_end(uuid)
+        return player_name
+
+    @classmethod
+    def clear(cls):
+        cls._player_names = OrderedDict()
+
 
 class BaseController(RequestHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.player_name = None
-        self.player = None
 
     async def prepare(self):
         await self.authenticate()
@@ -28,11 +68,24 @@ class BaseController(RequestHandler):
 
     async def authenticate(self):
         uuid = self._get_uuid()
-        uuid_data = await UUIDsRelation.load_by_uuid(uuid)
-        if uuid_data is not None:
-            self.player_name = uuid_data['player_name']
-            self.player = await Player.load_if_exists(self.player_name)
-            LOG.info("[%s] Authenticated", self.player_name)
+        if uuid is None:
+            return
+        player_name = await self.find_player_name(uuid)
+        if player_name is None:
+            return
+        self.player_name = player_name
+        LOG.info("[%s] Authenticated", self.player_name)
+
+    @staticmethod
+    async def find_player_name(uuid):
+        player_name = UUIDCache.get(uuid)
+        if player_name is None:
+            uuid_data = await UUIDsRelation.load_by_uuid(uuid)
+            if uuid_data is None:
+                return None
+            player_name = uuid_data['player_name']
+            UUIDCache.add(uuid, player_name)
+        return player_name
 
     def _get_uuid(self):
         try:
@@ -56,6 +109,9 @@ class BaseController(RequestHandler):
             table = await Table.load_by_name(table_name)
         except TableNotFoundError:
             raise HTTPError(HTTPStatus.NOT_FOUND, 'Table not found')
+        return self.create_match(table)
+
+    def create_match(self, table):
         turn_delay = self.settings.get('args').turn_delay if self.settings.get('args') else 0
         showdown_timeout = self.settings.get('args').showdown_timeout if self.settings.get('args') else 0
         return Match(table, turn_delay, showdown_timeout)
@@ -63,6 +119,45 @@ class BaseController(RequestHandler):
     def get_body(self):
         return json_decode(self.request.body)
 
+    async def wait_for_table_change(self, table_name):
+        return await wait_for_table_change(self, table_name)
+
+    def get_int_argument(self, name, default=None):
+        return get_int_argument(self, name, default)
+
+
+def get_int_argument(handler, name, default=None):
+    """Return a non-negative integer query argument."""
+    value = handler.get_query_argument(name, None)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        value = -1
+    if value < 0:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, 'Invalid {}'.format(name))
+    return value
+
+
+async def wait_for_table_change(handler, table_name):
+    """Wait for a change of the table if the request has a "since" argument. Returns the table version."""
+    versions = TableVersions.instance()
+    since = get_int_argument(handler, 'since')
+    if since is None:
+        return versions.get(table_name)
+    timeout = min(get_int_argument(handler, 'timeout', LONG_POLL_TIMEOUT_SECONDS), LONG_POLL_TIMEOUT_SECONDS)
+    return await versions.wait(table_name, since, timeout)
+
+
+def is_not_modified(handler, etag):
+    """Set the ETag header. If the client has the response already, set the status to 304 and return True."""
+    handler.set_header('Etag', etag)
+    if handler.check_etag_header():
+        handler.set_status(HTTPStatus.NOT_MODIFIED.value)
+        return True
+    return False
+
 
 def authenticated(method):
     @functools.wraps(method)
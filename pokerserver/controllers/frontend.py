@@ -1,19 +1,35 @@
+from asyncio import Event, TimeoutError as AsyncTimeoutError, ensure_future, wait_for
 from http import HTTPStatus
+import json
+import logging
 from urllib.parse import quote
+from tornado.iostream import StreamClosedError
 from tornado.web import RequestHandler, HTTPError
 
-from pokerserver.models import Table, TableNotFoundError
+from pokerserver.configuration import ServerConfig
+from pokerserver.models import Table, TableFeed, TableNotFoundError, TableVersions, load_equity_table
+from .base import is_not_modified, wait_for_table_change
+
+LOG = logging.getLogger(__name__)
 
 TABLE_NAME_PATTERN = r'(.+)'
 
+# Spectators receive a comment after this many seconds without changes, so closed connections are noticed.
+KEEPALIVE_SECONDS = 30
+
+
+def check_frontend_password(handler):
+    """Raise 401 unless the request has the "devcookie" with the password of the server, if it has one."""
+    actual_password = handler.application.settings['args'].password
+    if actual_password:
+        provided_password = handler.get_cookie('devcookie', '')
+        if actual_password != provided_password:
+            raise HTTPError(HTTPStatus.UNAUTHORIZED)
+
 
 class FrontendBaseController(RequestHandler):
     def prepare(self):
-        actual_password = self.application.settings['args'].password
-        if actual_password:
-            provided_password = self.get_cookie('devcookie', '')
-            if actual_password != provided_password:
-                raise HTTPError(HTTPStatus.UNAUTHORIZED)
+        check_frontend_password(self)
 
 
 class IndexController(FrontendBaseController):
@@ -57,25 +73,30 @@ class FrontendDataController(FrontendBaseController):
     async def get(self, table_name):
         """Frontend endpoint
         ---
-        description: returns full player and card information that usually is invisible to clients
+        description: returns full player and card information that usually is invisible to clients. With "since" the
+            request waits for the next change of the table like /table does.
         responses:
             200:
                 description: cards and player state
+            304:
+                description: The table has not changed since the response with the ETag in "If-None-Match".
+            404:
+                description: The table was not found.
         """
+        version = await wait_for_table_change(self, table_name)
+        # A missing table is a 404 even if the ETag of its version matches.
         try:
             table = await Table.load_by_name(table_name)
         except TableNotFoundError:
             raise HTTPError(HTTPStatus.NOT_FOUND)
+        if is_not_modified(self, TableVersions.instance().etag(version)):
+            return
 
-        self.write({
-            'players': [self.write_player(table, player) for player in table.players],
-            'openCards': table.open_cards,
-            'pot': sum(pot.amount for pot in table.pots)
-        })
+        self.write(build_frontend_data(table, version))
 
     @staticmethod
-    def write_player(table, player):
-        return {
+    def write_player(table, player, equity_table=None):
+        data = {
             'position': player.position,
             'name': player.name,
             'balance': player.balance,
@@ -83,8 +104,161 @@ class FrontendDataController(FrontendBaseController):
             'dealer': player is table.dealer,
             'current': player is table.current_player,
             'state': player.state.value,
-            'cards': player.cards
+            'cards': player.cards,
+            'hand': table.hand_category(player)
         }
+        if equity_table is not None and len(player.cards) == 2:
+            data['preflopEquity'] = equity_table.equity_of_cards(player.cards)
+        return data
+
+
+def build_frontend_data(table, version):
+    equity_table_path = ServerConfig.get('equity_table')
+    equity_table = load_equity_table(equity_table_path) if equity_table_path else None
+    return {
+        'players': [FrontendDataController.write_player(table, player, equity_table) for player in table.players],
+        'openCards': table.open_cards,
+        'pot': sum(pot.amount for pot in table.pots),
+        'version': version
+    }
+
+
+class Spectator:
+    """The newest message for a connection. Messages it did not send in time are replaced by newer ones."""
+
+    def __init__(self):
+        self.message = None
+        self.closed = False
+        self.changed = Event()
+
+    def send(self, message):
+        self.message = message
+        self.changed.set()
+
+    def close(self):
+        self.closed = True
+        self.changed.set()
+
+    async def receive(self, timeout):
+        """Return the newest message, None after `timeout` seconds without one and when closed."""
+        try:
+            await wait_for(self.changed.wait(), timeout)
+        except AsyncTimeoutError:
+            return None
+        self.changed.clear()
+        message, self.message = self.message, None
+        return message
+
+
+class SpectatorBroadcast:
+    """Serializes the frontend data of a table once per change and sends it to all spectators of the table.
+
+    Changes during a serialization are combined into one.
+    """
+    _broadcasts = {}
+
+    def __init__(self, table_name):
+        self.table_name = table_name
+        self.spectators = set()
+        self.message = None
+        self._refreshing = False
+        self._dirty = False
+
+    @classmethod
+    def join(cls, table_name, spectator):
+        broadcast = cls._broadcasts.get(table_name)
+        if broadcast is None:
+            broadcast = cls._broadcasts[table_name] = cls(table_name)
+            TableFeed.instance().subscribe(table_name, broadcast.on_table_change)
+        broadcast.spectators.add(spectator)
+        if broadcast.message is not None:
+            spectator.send(broadcast.message)
+        else:
+            broadcast.refresh()
+
+    @classmethod
+    def leave(cls, table_name, spectator):
+        broadcast = cls._broadcasts.get(table_name)
+        if broadcast is None:
+            return
+        broadcast.spectators.discard(spectator)
+        if not broadcast.spectators:
+            TableFeed.instance().unsubscribe(table_name, broadcast.on_table_change)
+            del cls._broadcasts[table_name]
+
+    @classmethod
+    def clear(cls):
+        cls._broadcasts = {}
+
+    def on_table_change(self, version, events):  # pylint: disable=unused-argument
+        self.refresh()
+
+    def refresh(self):
+        if self._refreshing:
+            self._dirty = True
+        else:
+            self._refreshing = True
+            ensure_future(self._refresh())
+
+    async def _refresh(self):
+        try:
+            self._dirty = True
+            while self._dirty:
+                self._dirty = False
+                # The version is read before loading, so the table is at least as recent as the version.
+                version = TableVersions.instance().get(self.table_name)
+                table = await Table.load_by_name(self.table_name)
+                self.message = 'data: {}\n\n'.format(json.dumps(build_frontend_data(table, version)))
+                for spectator in list(self.spectators):
+                    spectator.send(self.message)
+        except TableNotFoundError:
+            for spectator in list(self.spectators):
+                spectator.close()
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception('Failed to send table %s to spectators', self.table_name)
+        finally:
+            self._refreshing = False
+
+
+class FrontendEventsController(FrontendBaseController):
+    route = r'/fedata/([^/]+)/events/?'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.spectator = Spectator()
+
+    async def get(self, table_name):
+        """Frontend event stream
+        ---
+        description: Server-sent events with the data of /fedata, sent whenever the table changes.
+        responses:
+            200:
+                description: event stream
+            404:
+                description: Table was not found.
+        """
+        try:
+            await Table.load_by_name(table_name)
+        except TableNotFoundError:
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+
+        self.set_header('Content-Type', 'text/event-stream')
+        self.set_header('Cache-Control', 'no-cache')
+        SpectatorBroadcast.join(table_name, self.spectator)
+        try:
+            while True:
+                message = await self.spectator.receive(KEEPALIVE_SECONDS)
+                if self.spectator.closed:
+                    break
+                self.write(message or ': keepalive\n\n')
+                await self.flush()
+        except StreamClosedError:
+            pass
+        finally:
+            SpectatorBroadcast.leave(table_name, self.spectator)
+
+    def on_connection_close(self):
+        self.spectator.close()
 
 
 class DevCookieController(RequestHandler):
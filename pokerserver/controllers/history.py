@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+from tornado.iostream import StreamClosedError
+
+from pokerserver.database import HandHistoryRelation, TablesRelation
+from pokerserver.models import to_ndjson_line
+from .base import BaseController, HTTPError
+from .frontend import check_frontend_password
+
+# Hands loaded from the database and written to the client at a time.
+PAGE_SIZE = 500
+
+
+class HistoryController(BaseController):
+    route = r'/history/?'
+
+    def prepare(self):
+        # Hands contain the hole cards of all players, which only the frontend may show.
+        check_frontend_password(self)
+
+    async def get(self):
+        """Endpoint to export the hand history.
+        ---
+        description: Streams finished hands ordered by hand_id as newline delimited JSON (one hand per line). To
+            continue an export pass the hand_id of the last hand received as "after".
+        parameters:
+            - name: after
+              in: query
+              description: Only return hands with a greater hand_id.
+              type: integer
+            - name: limit
+              in: query
+              description: Maximum number of hands to return. All hands by default.
+              type: integer
+            - name: table
+              in: query
+              description: Only return hands of the table with this name.
+              type: string
+        responses:
+            200:
+                description: Successful operation.
+            400:
+                description: Invalid parameters.
+            401:
+                description: The "devcookie" with the password of the frontend is missing.
+            404:
+                description: The table was not found.
+        """
+        after = self.get_int_argument('after', 0)
+        limit = self.get_int_argument('limit', None)
+        table_id = await self._get_table_id()
+
+        self.set_header('Content-Type', 'application/x-ndjson')
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = PAGE_SIZE if remaining is None else min(PAGE_SIZE, remaining)
+            hands = await HandHistoryRelation.load_page(after, page_size, table_id)
+            self.write(''.join(to_ndjson_line(hand) for hand in hands))
+            try:
+                await self.flush()
+            except StreamClosedError:
+                return
+            if len(hands) < page_size:
+                break
+            after = hands[-1]['hand_id']
+            if remaining is not None:
+                remaining -= len(hands)
+
+    async def _get_table_id(self):
+        table_name = self.get_query_argument('table', None)
+        if table_name is None:
+            return None
+        table_data = await TablesRelation.load_table_by_name(table_name)
+        if table_data is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, 'Table not found')
+        return table_data['table_id']
@@ -1,5 +1,6 @@
 from tornado.web import RequestHandler
 
+from pokerserver.models import TimerWheel
 from pokerserver.version import NAME, DESCRIPTION, VERSION
 
 
@@ -9,7 +10,7 @@ class InfoController(RequestHandler):
     async def get(self):
         """Endpoint for information about the server.
         ---
-        description: Returns version information of the server.
+        description: Returns version information of the server and metrics of the turn timers.
         responses:
             200:
                 description: Successful operation.
@@ -17,5 +18,6 @@ class InfoController(RequestHandler):
         self.write({
             'name': NAME,
             'description': DESCRIPTION,
-            'version': VERSION
+            'version': VERSION,
+            'timers': TimerWheel.instance().metrics()
         })
@@ -0,0 +1,47 @@
+from http import HTTPStatus
+from uuid import UUID
+
+from pokerserver.models import Matchmaker
+from .base import BaseController, HTTPError, authenticated
+
+
+class MatchmakingController(BaseController):
+    route = r'/matchmaking/?'
+
+    @authenticated
+    async def post(self):
+        """Endpoint for joining any table with a free seat.
+        ---
+        description: Seats the player at the first open table with a free seat and returns
+            {"table":...,"positions":{player:position}}. Players with the uuids in the optional body
+            {"uuids":[...]} are seated at the same table.
+        responses:
+            200:
+                description: Successful operation.
+            400:
+                description: Invalid or unknown uuids.
+            409:
+                description: No table has enough free seats.
+        """
+        player_names = [self.player_name] + await self._get_group()
+        if len(set(player_names)) < len(player_names):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'Duplicate player')
+        table_name, positions = await Matchmaker.instance().seat(player_names, self.create_match)
+        if table_name is None:
+            raise HTTPError(HTTPStatus.CONFLICT, 'No free seats')
+        self.write({'table': table_name, 'positions': positions})
+
+    async def _get_group(self):
+        if not self.request.body:
+            return []
+        try:
+            uuids = [UUID(uuid) for uuid in self.get_body().get('uuids', [])]
+        except (ValueError, TypeError, AttributeError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'Invalid uuids')
+        player_names = []
+        for uuid in uuids:
+            player_name = await self.find_player_name(uuid)
+            if player_name is None:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, 'Unknown uuid')
+            player_names.append(player_name)
+        return player_names
@@ -0,0 +1,133 @@
+from asyncio import Queue, QueueFull, ensure_future
+import json
+import logging
+
+from tornado.websocket import WebSocketClosedError, WebSocketHandler
+
+from pokerserver.models import InvalidTurnError, Table, TableFeed, TableNotFoundError, TableVersions, events_for_viewer
+from .base import BaseController, HTTPError
+from .table import TABLE_NAME_PATTERN
+
+LOG = logging.getLogger(__name__)
+
+# Messages waiting to be sent to a client. Clients which fall further behind are disconnected.
+SEND_QUEUE_SIZE = 100
+
+CLOSE_TABLE_NOT_FOUND = 4004
+CLOSE_TOO_SLOW = 4008
+
+ACTIONS = ['fold', 'call', 'check', 'raise']
+
+
+class TableSocketController(BaseController, WebSocketHandler):
+    route = r'/table/' + TABLE_NAME_PATTERN + r'/socket/?'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.table_name = None
+        self.snapshot_version = None
+        self.queue = Queue(maxsize=SEND_QUEUE_SIZE)
+        self.sender = None
+
+    async def get(self, table_name):  # pylint: disable=arguments-differ
+        """WebSocket endpoint for the events of a table.
+        ---
+        description: Upgrades to a WebSocket. The server first sends {"type":"table","version":...,"table":...}
+            with the table as returned by /table, then {"type":"events","version":...,"events":[...]} for every
+            change of the table. The authenticated player gets a "your_turn" event with the turn token. Clients
+            send actions as {"action":"fold"|"call"|"check"|"raise","amount":...} and get {"type":"error"} if an
+            action fails. Clients which do not receive fast enough are disconnected.
+        responses:
+            101:
+                description: Switching to the WebSocket protocol.
+        """
+        await super().get(table_name)
+
+    async def open(self, table_name):  # pylint: disable=arguments-differ
+        self.table_name = table_name
+        versions = TableVersions.instance()
+        TableFeed.instance().subscribe(table_name, self.on_table_change)
+        # Changes may be persisted while loading the table. Events of changes before the snapshot are skipped.
+        while True:
+            version = versions.get(table_name)
+            try:
+                table = await Table.load_by_name(table_name)
+            except TableNotFoundError:
+                self.close(CLOSE_TABLE_NOT_FOUND, 'Table not found')
+                return
+            if versions.get(table_name) == version:
+                break
+        self.snapshot_version = version
+        messages = [{'type': 'table', 'version': version, 'table': table.to_dict(self.player_name)}]
+        if table.current_player is not None and table.current_player.name == self.player_name:
+            messages.append({'type': 'events', 'version': version, 'events': [
+                {'type': 'your_turn', 'data': {'token': table.current_player_token}}
+            ]})
+        self.sender = ensure_future(self._send_messages(messages))
+
+    def on_table_change(self, version, events):
+        message = {'type': 'events', 'version': version, 'events': events_for_viewer(events, self.player_name)}
+        self._enqueue(version, message)
+
+    async def on_message(self, message):
+        try:
+            request = json.loads(message)
+            action = request['action']
+        except (ValueError, KeyError, TypeError):
+            self._send_error('Invalid message')
+            return
+        if self.player_name is None:
+            self._send_error('Not authenticated')
+            return
+        if action not in ACTIONS:
+            self._send_error('Invalid action')
+            return
+        amount = None
+        if action == 'raise':
+            try:
+                amount = int(request['amount'])
+            except (KeyError, ValueError, TypeError):
+                self._send_error('Invalid amount')
+                return
+        try:
+            match = await self.load_match(self.table_name)
+            if amount is None:
+                await getattr(match, action)(self.player_name)
+            else:
+                await match.raise_bet(self.player_name, amount)
+        except (InvalidTurnError, ValueError) as error:
+            self._send_error(str(error))
+        except HTTPError as error:
+            self._send_error(error.log_message)
+
+    def on_close(self):
+        self._stop()
+
+    def _send_error(self, message):
+        self._enqueue(None, {'type': 'error', 'message': message})
+
+    def _enqueue(self, version, message):
+        try:
+            self.queue.put_nowait((version, json.dumps(message)))
+        except QueueFull:
+            LOG.warning('Disconnecting %s from table %s, the client is too slow',
+                        self.player_name or 'spectator', self.table_name)
+            self._stop()
+            self.close(CLOSE_TOO_SLOW, 'Too slow')
+
+    async def _send_messages(self, messages):
+        try:
+            for message in messages:
+                await self.write_message(message)
+            while True:
+                version, message = await self.queue.get()
+                if version is None or version > self.snapshot_version:
+                    await self.write_message(message)
+        except WebSocketClosedError:
+            self._stop()
+
+    def _stop(self):
+        TableFeed.instance().unsubscribe(self.table_name, self.on_table_change)
+        if self.sender is not None:
+            self.sender.cancel()
+            self.sender = None
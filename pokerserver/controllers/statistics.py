@@ -1,18 +1,97 @@
-from tornado.web import RequestHandler
+from http import HTTPStatus
+from time import time
 
-from pokerserver.models import Statistics
+from pokerserver.database import PlayerStatsRelation
+from pokerserver.models import (WINDOWS, Leaderboard, PlayerStatsAggregator, Statistics, load_statistics_window,
+                                to_rates)
+from .base import BaseController, HTTPError
 
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 1000
 
-class StatisticsController(RequestHandler):
+
+class StatisticsController(BaseController):
     route = r'/statistics/?'
 
     async def get(self):
         """Statistics endpoint
         ---
-        description: returns player statistics
+        description: Returns player statistics. Without parameters the statistics of all players are returned by
+            name. With "order", "offset", "limit" or "player" a page of the leaderboard or the rank of one player
+            is returned instead. With "window" the statistics of the recent past are returned by name.
+        parameters:
+            - name: window
+              in: query
+              description: Only count the last "minute", "hour", "day" or number of seconds. Can be combined with
+                "player". The start of the window is rounded down to the start of a minute, hour or day.
+              type: string
+            - name: order
+              in: query
+              description: Rank players by "gain" (default) or "gain_per_match".
+              type: string
+            - name: offset
+              in: query
+              description: Number of players to skip.
+              type: integer
+            - name: limit
+              in: query
+              description: Maximum number of players to return, i.e. limit=N returns the top N.
+              type: integer
+            - name: player
+              in: query
+              description: Return only the rank and statistics of this player, including VPIP, PFR and the
+                share of showdowns won.
+              type: string
         responses:
             200:
-                description: list of all accumulated player statistics
+                description: list of all accumulated player statistics or a page of the leaderboard
+            400:
+                description: Invalid parameters.
+            404:
+                description: The player has no statistics.
         """
-        statistics = await Statistics.load()
-        self.write(statistics.to_dict())
+        if self.get_query_argument('window', None) is not None:
+            await self._write_window()
+            return
+        if not any(self.get_query_argument(name, None) is not None for name in ['order', 'offset', 'limit', 'player']):
+            statistics = await Statistics.load()
+            self.write(statistics.to_dict())
+            return
+
+        order = self.get_query_argument('order', 'gain')
+        if order not in Leaderboard.ORDERS:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'Invalid order')
+        leaderboard = await Statistics.leaderboard()
+        result = {'order': order, 'total': len(leaderboard)}
+
+        player_name = self.get_query_argument('player', None)
+        if player_name is not None:
+            if player_name not in leaderboard:
+                raise HTTPError(HTTPStatus.NOT_FOUND, 'Player not found')
+            result['player'] = self._to_dict(leaderboard.rank(player_name, order), leaderboard.get(player_name))
+            result['player']['advanced'] = await self._load_advanced_statistics(player_name)
+        else:
+            offset = self.get_int_argument('offset', 0)
+            limit = min(self.get_int_argument('limit', DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+            result['players'] = [
+                self._to_dict(rank, statistics) for rank, statistics in leaderboard.page(order, offset, limit)
+            ]
+        self.write(result)
+
+    async def _write_window(self):
+        window = self.get_query_argument('window')
+        seconds = WINDOWS[window] if window in WINDOWS else self.get_int_argument('window')
+        players = await load_statistics_window(seconds, time(), self.get_query_argument('player', None))
+        self.write({'window': seconds, 'players': players})
+
+    @staticmethod
+    def _to_dict(rank, statistics):
+        return dict(statistics.to_dict(), rank=rank, name=statistics.player_name)
+
+    @staticmethod
+    async def _load_advanced_statistics(player_name):
+        counters = await PlayerStatsRelation.load_by_name(player_name) or {}
+        counters.pop('player_name', None)
+        for counter, value in PlayerStatsAggregator.instance().pending(player_name).items():
+            counters[counter] = counters.get(counter, 0) + value
+        return to_rates({counter: counters.get(counter, 0) for counter in PlayerStatsRelation.COUNTERS})
@@ -1,7 +1,9 @@
 from http import HTTPStatus
+import json
 
-from pokerserver.models import InvalidTurnError, PositionOccupiedError, Table, TableNotFoundError
-from .base import BaseController, HTTPError, authenticated
+from pokerserver.models import (InvalidTurnError, Matchmaker, PositionOccupiedError, TableNotFoundError, TableVersions,
+                                TableViews)
+from .base import BaseController, HTTPError, authenticated, is_not_modified
 
 TABLE_NAME_PATTERN = r'([^/]+)'
 
@@ -12,18 +14,60 @@ class TableController(BaseController):
     async def get(self, name):  # pylint: disable=arguments-differ
         """Endpoint for information about a table.
         ---
-        description: Returns a table's state.
+        description: Returns a table's state and version. With "since" the request waits until the version differs
+            from "since" or the timeout expires, so clients can wait for the next change instead of polling.
+        parameters:
+            - name: since
+              in: query
+              description: Version of the table the client has seen.
+              type: integer
+            - name: timeout
+              in: query
+              description: Seconds to wait for a change, at most 30.
+              type: integer
+            - name: delta_from
+              in: query
+              description: Epoch and version of the table the client has, "<epoch>-<version>". If the server still
+                knows this version, it only returns {"version":...,"patch":[...]} with JSON patch operations from it
+                to the current version.
+              type: string
         responses:
             200:
                 description: Successful operation.
+            304:
+                description: The table has not changed since the response with the ETag in "If-None-Match".
             404:
                 description: The table was not found.
         """
+        # The version is read before loading, so the table is at least as recent as the version.
+        version = await self.wait_for_table_change(name)
+        # All viewers of a version share one view, the table is only loaded and encoded once.
         try:
-            table = await Table.load_by_name(name)
-            self.write(table.to_dict(self.player_name))
+            view = await TableViews.instance().load(name, version)
         except TableNotFoundError:
             raise HTTPError(HTTPStatus.NOT_FOUND, 'Table not found')
+        old_view = self._get_old_view(name)
+        # Players see their own cards and a patch depends on the version it starts from.
+        etag = TableVersions.instance().etag(version, self.player_name or '', old_view.version if old_view else '')
+        if is_not_modified(self, etag):
+            return
+        self.set_header('Content-Type', 'application/json; charset=UTF-8')
+        if old_view is None:
+            self.write(view.encode(self.player_name))
+        else:
+            self.write(json.dumps({'version': version, 'patch': view.diff(old_view, self.player_name)}))
+
+    def _get_old_view(self, name):
+        token = self.get_query_argument('delta_from', None)
+        if token is None:
+            return None
+        epoch, _, version = token.rpartition('-')
+        if not version.isdigit():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'Invalid delta_from')
+        # Versions start at 0 in every server process, a version of an earlier process says nothing about this one.
+        if epoch != TableVersions.instance().epoch:
+            return None
+        return TableViews.instance().get(name, int(version))
 
 
 class JoinController(BaseController):
@@ -43,9 +87,11 @@ class JoinController(BaseController):
                 description: The position was already occupied.
         """
         position = self._get_position()
-        match = await self.load_match(table_name)
         try:
-            await match.join(self.player_name, position)
+            # Seats are also given away by /matchmaking, which holds the lock of a table while it loads and joins it.
+            async with Matchmaker.instance().table_lock(table_name):
+                match = await self.load_match(table_name)
+                await match.join(self.player_name, position)
         except PositionOccupiedError:
             raise HTTPError(HTTPStatus.CONFLICT, 'Position occupied')
         except ValueError as error:
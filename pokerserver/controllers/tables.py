@@ -1,6 +1,12 @@
-from tornado.web import RequestHandler
+from http import HTTPStatus
 
-from pokerserver.models import Table
+from tornado.web import HTTPError, RequestHandler
+
+from pokerserver.database import TableState
+from pokerserver.models import TableIndex, TableVersions
+from .base import get_int_argument, is_not_modified
+
+TABLE_STATES = [state.value for state in TableState]
 
 
 class TablesController(RequestHandler):
@@ -9,11 +15,50 @@ class TablesController(RequestHandler):
     async def get(self):
         """Endpoint to list all tables.
         ---
-        description: Returns an array of table infos.
+        description: Returns an array of table infos ordered by table id.
+        parameters:
+            - name: state
+              in: query
+              description: Only tables in this state, e.g. "waiting for players".
+              type: string
+            - name: has_free_seats
+              in: query
+              description: If "true", only tables with at least one free seat.
+              type: string
+            - name: min_free_seats
+              in: query
+              description: Only tables with at least this many free seats.
+              type: integer
+            - name: limit
+              in: query
+              description: Return at most this many tables.
+              type: integer
+            - name: offset
+              in: query
+              description: Skip this many of the matching tables.
+              type: integer
         responses:
             200:
                 description: Successful operation.
+            304:
+                description: No table has changed since the response with the ETag in "If-None-Match".
+            400:
+                description: Invalid filter.
         """
-        tables = await Table.load_all()
-        table_data = [table.to_dict_for_info() for table in tables]
-        self.write({'tables': table_data})
+        state = self.get_query_argument('state', None)
+        if state is not None and state not in TABLE_STATES:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'Invalid state')
+        has_free_seats = self.get_query_argument('has_free_seats', 'false')
+        if has_free_seats not in ('true', 'false'):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'Invalid has_free_seats')
+        min_free_seats = get_int_argument(self, 'min_free_seats', 0)
+        if has_free_seats == 'true':
+            min_free_seats = max(min_free_seats, 1)
+        limit = get_int_argument(self, 'limit')
+        offset = get_int_argument(self, 'offset', 0)
+
+        if is_not_modified(self, TableVersions.instance().etag(TableVersions.instance().total)):
+            return
+        response = await TableIndex.instance().encode(state, min_free_seats, limit, offset)
+        self.set_header('Content-Type', 'application/json; charset=UTF-8')
+        self.write(response)
@@ -4,7 +4,7 @@ import uuid as mod_uuid
 
 from pokerserver.database import DuplicateKeyError, UUIDsRelation
 from pokerserver.models import PLAYER_NAME_PATTERN
-from .base import BaseController, HTTPError
+from .base import BaseController, HTTPError, UUIDCache
 
 
 class UUIDController(BaseController):
@@ -26,6 +26,7 @@ class UUIDController(BaseController):
             await UUIDsRelation.add_uuid(uuid, player_name)
         except DuplicateKeyError:
             raise HTTPError(HTTPStatus.BAD_REQUEST, 'Player already registered')
+        UUIDCache.add(uuid, player_name)
         self.write(str(uuid))
 
     def _get_player_name(self):
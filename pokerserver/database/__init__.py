@@ -1,7 +1,13 @@
 from .database import Database, DbException, DuplicateKeyError, convert_datetime
+from .events import EventsRelation
+from .hand_history import HandHistoryRelation
+from .player_stats import PlayerStatsRelation
 from .players import PlayerState, PlayersRelation
 from .relations import RELATIONS, clear_relations, create_relations
+from .rollups import StatisticsRollupsRelation
+from .snapshots import SnapshotsRelation
 from .statistics import StatisticsRelation
 from .tables import TableConfig, TableState, TablesRelation
+from .timers import TimersRelation
 from .utils import from_card_list, from_pot_list_string, make_card_list, to_pot_list_string
 from .uuids import UUIDsRelation
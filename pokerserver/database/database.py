@@ -78,6 +78,12 @@ class Database:
         self._queue.put(task)
         return _ExecuteContextManager(task)
 
+    def execute_batch(self, statements):
+        """Execute a list of (query, args) tuples in a single transaction."""
+        task = BatchTask(self._loop, statements)
+        self._queue.put(task)
+        return task.future
+
     async def find_one(self, query, *args):
         result = await self.execute(query, *args)
         return result.rows[0][0] if result.rows else None
@@ -168,6 +174,32 @@ class QueryManyTask(Task):
         return "<QUERY_MANY: {}, {}>".format(self.query, self.args)
 
 
+class BatchTask(Task):
+    def __init__(self, loop, statements):
+        super().__init__(loop)
+        self.statements = statements
+
+    def execute(self, connection):
+        results = []
+        try:
+            for query, args in self.statements:
+                cursor = connection.execute(query, args)
+                results.append(QueryResult(rows=list(cursor), rowcount=cursor.rowcount))
+                cursor.close()
+        except sqlite3.IntegrityError as exc:
+            connection.rollback()
+            raise DuplicateKeyError(str(exc))
+        except sqlite3.OperationalError as exc:
+            connection.rollback()
+            raise DbException(str(exc)) from exc
+
+        connection.commit()
+        return results
+
+    def __str__(self):
+        return "<BATCH: {}>".format(self.statements)
+
+
 QueryResult = namedtuple('QueryResult', 'rows rowcount')
 
 
@@ -0,0 +1,88 @@
+from collections import namedtuple
+
+from .database import Database
+from .relation import Relation
+
+
+class EventsRelation(Relation):
+    """Append-only log of the events of each table, numbered by a sequence per table."""
+    NAME = 'events'
+
+    FIELDS = ['table_id', 'sequence', 'type', 'data']
+
+    EVENTS_RELATION_ROW = namedtuple('EventsRelationRow', FIELDS)
+
+    CREATE_QUERY = """
+        CREATE TABLE events (
+            table_id INT NOT NULL,
+            sequence INT NOT NULL,
+            type VARCHAR NOT NULL,
+            data VARCHAR NOT NULL,
+            PRIMARY KEY (table_id, sequence)
+        ) WITHOUT ROWID
+    """
+
+    DROP_IF_EXISTS_QUERY = """
+        DROP TABLE IF EXISTS events
+    """
+
+    CLEAR_QUERY = """
+        DELETE FROM events
+    """
+
+    # The primary key makes finding the last sequence of a table a single index lookup.
+    APPEND_QUERY = """
+        INSERT INTO events (table_id, sequence, type, data)
+        SELECT ?, COALESCE(MAX(sequence), 0) + 1, ?, ?
+        FROM events
+        WHERE table_id = ?
+    """
+
+    LOAD_SINCE_QUERY = """
+        SELECT {}
+        FROM events
+        WHERE table_id = ? AND sequence > ?
+        ORDER BY sequence
+    """.format(','.join(FIELDS))
+
+    LOAD_CURRENT_HAND_QUERY = """
+        SELECT {}
+        FROM events
+        WHERE table_id = ? AND sequence >= (
+            SELECT sequence
+            FROM events
+            WHERE table_id = ? AND type = 'hand'
+            ORDER BY sequence DESC
+            LIMIT 1
+        )
+        ORDER BY sequence
+    """.format(','.join(FIELDS))
+
+    @classmethod
+    def append_statement(cls, table_id, event_type, data):
+        return cls.APPEND_QUERY, (table_id, event_type, data, table_id)
+
+    @classmethod
+    async def append(cls, table_id, event_type, data):
+        query, args = cls.append_statement(table_id, event_type, data)
+        await Database.instance().execute(query, *args)
+
+    @classmethod
+    async def load_since(cls, table_id, sequence=0):
+        """Load the events of a table after the given sequence number in order."""
+        events = []
+        db = Database.instance()
+        async with db.execute(cls.LOAD_SINCE_QUERY, table_id, sequence) as cursor:
+            async for row in cursor:
+                events.append(cls.EVENTS_RELATION_ROW(*row)._asdict())
+        return events
+
+    @classmethod
+    async def load_current_hand(cls, table_id):
+        """Load the events of a table since its last 'hand' event, which starts each hand."""
+        events = []
+        db = Database.instance()
+        async with db.execute(cls.LOAD_CURRENT_HAND_QUERY, table_id, table_id) as cursor:
+            async for row in cursor:
+                events.append(cls.EVENTS_RELATION_ROW(*row)._asdict())
+        return events
@@ -0,0 +1,74 @@
+from collections import namedtuple
+
+from .database import Database
+from .relation import Relation
+
+
+class HandHistoryRelation(Relation):
+    """One row per finished hand. `data` is the JSON encoded record of the hand, see `models.hand_history`."""
+    NAME = 'hand_history'
+
+    FIELDS = ['hand_id', 'table_id', 'finished_at', 'data']
+
+    HAND_HISTORY_RELATION_ROW = namedtuple('HandHistoryRelationRow', FIELDS)
+
+    CREATE_QUERY = """
+        CREATE TABLE hand_history (
+            hand_id INTEGER PRIMARY KEY,
+            table_id INT NOT NULL,
+            finished_at REAL NOT NULL,
+            data VARCHAR NOT NULL
+        )
+    """
+
+    CREATE_INDEX_QUERIES = [
+        'CREATE INDEX IF NOT EXISTS hand_history_by_table ON hand_history (table_id, hand_id)'
+    ]
+
+    DROP_IF_EXISTS_QUERY = """
+        DROP TABLE IF EXISTS hand_history
+    """
+
+    CLEAR_QUERY = """
+        DELETE FROM hand_history
+    """
+
+    INSERT_QUERY = """
+        INSERT INTO hand_history (table_id, finished_at, data)
+        VALUES (?, ?, ?)
+    """
+
+    # Keyset pagination: the cost of a page does not depend on how many hands were skipped.
+    LOAD_PAGE_QUERY = """
+        SELECT {}
+        FROM hand_history
+        WHERE hand_id > ?
+        ORDER BY hand_id
+        LIMIT ?
+    """.format(','.join(FIELDS))
+
+    LOAD_PAGE_BY_TABLE_QUERY = """
+        SELECT {}
+        FROM hand_history
+        WHERE table_id = ? AND hand_id > ?
+        ORDER BY hand_id
+        LIMIT ?
+    """.format(','.join(FIELDS))
+
+    @classmethod
+    def insert_statement(cls, table_id, finished_at, data):
+        return cls.INSERT_QUERY, (table_id, finished_at, data)
+
+    @classmethod
+    async def load_page(cls, after=0, limit=100, table_id=None):
+        """Load up to `limit` hands with an id greater than `after` in order, optionally only those of one table."""
+        if table_id is None:
+            query, args = cls.LOAD_PAGE_QUERY, (after, limit)
+        else:
+            query, args = cls.LOAD_PAGE_BY_TABLE_QUERY, (table_id, after, limit)
+        hands = []
+        db = Database.instance()
+        async with db.execute(query, *args) as cursor:
+            async for row in cursor:
+                hands.append(cls.HAND_HISTORY_RELATION_ROW(*row)._asdict())
+        return hands
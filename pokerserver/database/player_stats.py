@@ -0,0 +1,61 @@
+from collections import namedtuple
+
+from .database import Database
+from .relation import Relation
+
+
+class PlayerStatsRelation(Relation):
+    """Per player counters of hands played, voluntarily paid and raised preflop, showdowns and showdowns won."""
+    NAME = 'player_stats'
+
+    COUNTERS = ['hands', 'vpip_hands', 'pfr_hands', 'showdowns', 'showdown_wins']
+
+    FIELDS = ['player_name'] + COUNTERS
+
+    PLAYER_STATS_RELATION_ROW = namedtuple('PlayerStatsRelationRow', FIELDS)
+
+    CREATE_QUERY = """
+        CREATE TABLE player_stats (
+            player_name VARCHAR NOT NULL,
+            {},
+            PRIMARY KEY (player_name)
+        )
+    """.format(',\n'.join('{} INT NOT NULL DEFAULT 0'.format(counter) for counter in COUNTERS))
+
+    DROP_IF_EXISTS_QUERY = """
+        DROP TABLE IF EXISTS player_stats
+    """
+
+    CLEAR_QUERY = """
+        DELETE FROM player_stats
+    """
+
+    INIT_QUERY = """
+        INSERT OR IGNORE INTO player_stats (player_name)
+        VALUES (?)
+    """
+
+    INCREMENT_QUERY = """
+        UPDATE player_stats
+        SET {}
+        WHERE player_name = ?
+    """.format(', '.join('{0} = {0} + ?'.format(counter) for counter in COUNTERS))
+
+    LOAD_BY_NAME_QUERY = """
+        SELECT {}
+        FROM player_stats
+        WHERE player_name = ?
+    """.format(','.join(FIELDS))
+
+    @classmethod
+    def increment_statements(cls, player_name, counters):
+        """Add the counters (a dict by counter name) of a player, creating the row if necessary."""
+        return [
+            (cls.INIT_QUERY, (player_name,)),
+            (cls.INCREMENT_QUERY, tuple(counters.get(counter, 0) for counter in cls.COUNTERS) + (player_name,))
+        ]
+
+    @classmethod
+    async def load_by_name(cls, player_name):
+        row = await Database.instance().find_row(cls.LOAD_BY_NAME_QUERY, player_name)
+        return cls.PLAYER_STATS_RELATION_ROW(*row)._asdict() if row is not None else None
@@ -2,7 +2,7 @@ from collections import namedtuple
 from enum import Enum, unique
 
 from .database import Database, convert_datetime
-from .relation import Relation
+from .relation import Relation, update_statement
 from .utils import from_card_list, make_card_list
 
 
@@ -99,6 +99,11 @@ class PlayersRelation(Relation):
         WHERE name = ? AND table_id = ?
     """
 
+    TO_DB = {
+        'cards': make_card_list,
+        'state': lambda state: state.value
+    }
+
     @classmethod
     async def load_all(cls):
         player_data = []
@@ -138,14 +143,29 @@ class PlayersRelation(Relation):
     @classmethod
     async def add_player(cls, table_id, position, name, balance, cards, bet,  # pylint: disable=too-many-arguments
                          last_seen, state):
+        query, args = cls.insert_statement(table_id, position, name, balance, cards, bet, last_seen, state)
+        await Database.instance().execute(query, *args)
+
+    @classmethod
+    def insert_statement(cls, table_id, position, name, balance, cards, bet,  # pylint: disable=too-many-arguments
+                         last_seen, state):
         assert position > 0
-        cards = make_card_list(cards)
-        await Database.instance().execute(cls.INSERT_QUERY, table_id, position, name, balance, cards, bet,
-                                          last_seen, state.value)
+        return cls.INSERT_QUERY, (table_id, position, name, balance, make_card_list(cards), bet, last_seen,
+                                  state.value)
 
     @classmethod
     async def delete_player(cls, table_id, position):
-        await Database.instance().execute(cls.DELETE_QUERY, table_id, position)
+        query, args = cls.delete_statement(table_id, position)
+        await Database.instance().execute(query, *args)
+
+    @classmethod
+    def delete_statement(cls, table_id, position):
+        return cls.DELETE_QUERY, (table_id, position)
+
+    @classmethod
+    def update_statement(cls, name, table_id, fields):
+        """Return query and arguments for updating several fields of a player at once."""
+        return update_statement(cls, fields, 'name = ? AND table_id = ?', (name, table_id))
 
     @classmethod
     async def set_balance(cls, name, table_id, balance):
@@ -9,6 +9,11 @@ class Relation:
     CREATE_QUERY = ''
     DROP_IF_EXISTS_QUERY = ''
     CLEAR_QUERY = ''
+    # Indices are created along with the relation and dropped with it.
+    CREATE_INDEX_QUERIES = []
+
+    # Functions converting field values to their database representation, see `update_statement`.
+    TO_DB = {}
 
     EXISTS_QUERY = """
         SELECT 1
@@ -22,11 +27,14 @@ class Relation:
         for _ in range(cls.MAXIMUM_TRIES):
             try:
                 await Database.instance().execute(cls.CREATE_QUERY)
-                return
+                break
             except DbException as exc:
                 if 'already exists' not in str(exc):
                     raise
-        raise DbException('Could not create relation after {} tries.'.format(cls.MAXIMUM_TRIES))
+        else:
+            raise DbException('Could not create relation after {} tries.'.format(cls.MAXIMUM_TRIES))
+        for query in cls.CREATE_INDEX_QUERIES:
+            await Database.instance().execute(query)
 
     @classmethod
     async def drop_relation(cls):
@@ -40,3 +48,20 @@ class Relation:
     async def relation_exists(cls):
         exists = await Database.instance().find_one(cls.EXISTS_QUERY, cls.NAME)
         return exists == 1
+
+
+def update_statement(relation, fields, condition, condition_args):
+    """Build an UPDATE query for the given fields of a relation.
+
+    Values are converted with the relation's TO_DB functions.
+    """
+    assert fields, 'Need at least one field to update'
+    assert set(fields) <= set(relation.FIELDS), 'Unknown fields: {}'.format(set(fields) - set(relation.FIELDS))
+    columns = sorted(fields)
+    query = 'UPDATE {} SET {} WHERE {}'.format(
+        relation.NAME, ', '.join('{} = ?'.format(column) for column in columns), condition)
+    values = tuple(
+        relation.TO_DB[column](fields[column]) if column in relation.TO_DB else fields[column]
+        for column in columns
+    )
+    return query, values + tuple(condition_args)
@@ -1,9 +1,18 @@
+from .events import EventsRelation
+from .hand_history import HandHistoryRelation
+from .player_stats import PlayerStatsRelation
 from .players import PlayersRelation
+from .rollups import StatisticsRollupsRelation
+from .snapshots import SnapshotsRelation
 from .statistics import StatisticsRelation
 from .tables import TablesRelation
+from .timers import TimersRelation
 from .uuids import UUIDsRelation
 
-RELATIONS = [PlayersRelation, TablesRelation, StatisticsRelation, UUIDsRelation]
+RELATIONS = [
+    PlayersRelation, TablesRelation, StatisticsRelation, UUIDsRelation, TimersRelation, EventsRelation,
+    SnapshotsRelation, HandHistoryRelation, PlayerStatsRelation, StatisticsRollupsRelation
+]
 
 
 async def clear_relations(exclude=None):
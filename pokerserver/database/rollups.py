@@ -0,0 +1,108 @@
+from collections import namedtuple
+
+from .database import Database
+from .relation import Relation
+
+
+class StatisticsRollupsRelation(Relation):
+    """Statistics increments summed up per player in time buckets of a resolution (seconds per bucket).
+
+    `bucket_start` is seconds since the epoch and a multiple of the resolution.
+    """
+    NAME = 'statistics_rollups'
+
+    FIELDS = ['resolution', 'bucket_start', 'player_name', 'matches', 'buy_in', 'gain']
+
+    STATISTICS_ROLLUPS_RELATION_ROW = namedtuple('StatisticsRollupsRelationRow', FIELDS)
+
+    CREATE_QUERY = """
+        CREATE TABLE statistics_rollups (
+            resolution INT NOT NULL,
+            bucket_start INT NOT NULL,
+            player_name VARCHAR NOT NULL,
+            matches INT NOT NULL DEFAULT 0,
+            buy_in INT NOT NULL DEFAULT 0,
+            gain INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (resolution, bucket_start, player_name)
+        ) WITHOUT ROWID
+    """
+
+    DROP_IF_EXISTS_QUERY = """
+        DROP TABLE IF EXISTS statistics_rollups
+    """
+
+    CLEAR_QUERY = """
+        DELETE FROM statistics_rollups
+    """
+
+    INIT_QUERY = """
+        INSERT OR IGNORE INTO statistics_rollups (resolution, bucket_start, player_name)
+        VALUES (?, ?, ?)
+    """
+
+    INCREMENT_QUERY = """
+        UPDATE statistics_rollups
+        SET matches = matches + ?, buy_in = buy_in + ?, gain = gain + ?
+        WHERE resolution = ? AND bucket_start = ? AND player_name = ?
+    """
+
+    LOAD_BEFORE_QUERY = """
+        SELECT {}
+        FROM statistics_rollups
+        WHERE resolution = ? AND bucket_start < ?
+    """.format(','.join(FIELDS))
+
+    DELETE_BEFORE_QUERY = """
+        DELETE FROM statistics_rollups
+        WHERE resolution = ? AND bucket_start < ?
+    """
+
+    SUM_SINCE_QUERY = """
+        SELECT player_name, SUM(matches), SUM(buy_in), SUM(gain)
+        FROM statistics_rollups
+        WHERE resolution = ? AND bucket_start >= ?
+        GROUP BY player_name
+    """
+
+    SUM_SINCE_BY_PLAYER_QUERY = """
+        SELECT player_name, SUM(matches), SUM(buy_in), SUM(gain)
+        FROM statistics_rollups
+        WHERE resolution = ? AND bucket_start >= ? AND player_name = ?
+        GROUP BY player_name
+    """
+
+    # pylint: disable=too-many-arguments
+    @classmethod
+    def increment_statements(cls, resolution, bucket_start, player_name, matches, buy_in, gain):
+        return [
+            (cls.INIT_QUERY, (resolution, bucket_start, player_name)),
+            (cls.INCREMENT_QUERY, (matches, buy_in, gain, resolution, bucket_start, player_name))
+        ]
+
+    @classmethod
+    def delete_before_statement(cls, resolution, bucket_start):
+        return cls.DELETE_BEFORE_QUERY, (resolution, bucket_start)
+
+    @classmethod
+    async def load_before(cls, resolution, bucket_start):
+        """Load the buckets of a resolution starting before `bucket_start`."""
+        buckets = []
+        db = Database.instance()
+        async with db.execute(cls.LOAD_BEFORE_QUERY, resolution, bucket_start) as cursor:
+            async for row in cursor:
+                buckets.append(cls.STATISTICS_ROLLUPS_RELATION_ROW(*row)._asdict())
+        return buckets
+
+    @classmethod
+    async def sum_since(cls, resolution, bucket_start, player_name=None):
+        """Sum up the buckets of a resolution from `bucket_start` on per player."""
+        if player_name is None:
+            query, args = cls.SUM_SINCE_QUERY, (resolution, bucket_start)
+        else:
+            query, args = cls.SUM_SINCE_BY_PLAYER_QUERY, (resolution, bucket_start, player_name)
+        sums = {}
+        db = Database.instance()
+        async with db.execute(query, *args) as cursor:
+            async for name, matches, buy_in, gain in cursor:
+                sums[name] = {'matches': matches, 'buy_in': buy_in, 'gain': gain}
+        return sums
@@ -0,0 +1,55 @@
+from collections import namedtuple
+
+from .database import Database
+from .relation import Relation
+
+
+class SnapshotsRelation(Relation):
+    """Snapshots of tables. Each belongs to the last event of the table when it was taken."""
+    NAME = 'snapshots'
+
+    FIELDS = ['table_id', 'sequence', 'data']
+
+    SNAPSHOTS_RELATION_ROW = namedtuple('SnapshotsRelationRow', FIELDS)
+
+    CREATE_QUERY = """
+        CREATE TABLE snapshots (
+            table_id INT NOT NULL,
+            sequence INT NOT NULL,
+            data VARCHAR NOT NULL,
+            PRIMARY KEY (table_id, sequence)
+        )
+    """
+
+    DROP_IF_EXISTS_QUERY = """
+        DROP TABLE IF EXISTS snapshots
+    """
+
+    CLEAR_QUERY = """
+        DELETE FROM snapshots
+    """
+
+    INSERT_QUERY = """
+        INSERT OR REPLACE INTO snapshots (table_id, sequence, data)
+        SELECT ?, COALESCE(MAX(sequence), 0), ?
+        FROM events
+        WHERE table_id = ?
+    """
+
+    LOAD_LATEST_QUERY = """
+        SELECT {}
+        FROM snapshots
+        WHERE table_id = ?
+        ORDER BY sequence DESC
+        LIMIT 1
+    """.format(','.join(FIELDS))
+
+    @classmethod
+    def insert_statement(cls, table_id, data):
+        """Snapshot the table as of its last event, which must be appended before in the same transaction."""
+        return cls.INSERT_QUERY, (table_id, data, table_id)
+
+    @classmethod
+    async def load_latest(cls, table_id):
+        row = await Database.instance().find_row(cls.LOAD_LATEST_QUERY, table_id)
+        return cls.SNAPSHOTS_RELATION_ROW(*row)._asdict() if row is not None else None
@@ -42,6 +42,10 @@ class StatisticsRelation(Relation):
         INSERT INTO statistics ({}) VALUES ({})
     """.format(','.join(FIELDS), ','.join(['?'] * len(FIELDS)))
 
+    INIT_STATS_IF_MISSING_QUERY = """
+        INSERT OR IGNORE INTO statistics ({}) VALUES (?, 0, 0, 0)
+    """.format(','.join(FIELDS))
+
     INCREMENT_STATS_QUERY = """
         UPDATE statistics
         SET matches = matches + ?, buy_in = buy_in + ?, gain = gain + ?
@@ -71,3 +75,10 @@ class StatisticsRelation(Relation):
         result = await db.execute(cls.INCREMENT_STATS_QUERY, matches, buy_in, gain, player_name)
         if result.rowcount == 0:
             await db.execute(cls.INIT_STATS_QUERY, player_name, matches, buy_in, gain)
+
+    @classmethod
+    def increment_statements(cls, player_name, matches, buy_in, gain):
+        return [
+            (cls.INIT_STATS_IF_MISSING_QUERY, (player_name,)),
+            (cls.INCREMENT_STATS_QUERY, (matches, buy_in, gain, player_name))
+        ]
@@ -2,7 +2,7 @@ from collections import namedtuple
 from enum import Enum, unique
 
 from .database import Database
-from .relation import Relation
+from .relation import Relation, update_statement
 from .utils import from_card_list, from_pot_list_string, make_card_list, to_pot_list_string
 
 TableConfig = namedtuple(
@@ -136,6 +136,13 @@ class TablesRelation(Relation):
         UPDATE tables SET state = ? WHERE table_id = ?
     """
 
+    TO_DB = {
+        'remaining_deck': make_card_list,
+        'open_cards': make_card_list,
+        'pots': to_pot_list_string,
+        'state': lambda state: state.value
+    }
+
     @classmethod
     async def load_all(cls):
         table_data = []
@@ -232,7 +239,17 @@ class TablesRelation(Relation):
 
     @classmethod
     async def add_joined_player(cls, table_id, player_name):
-        await Database.instance().execute(cls.ADD_JOINED_PLAYER_QUERY, player_name, table_id)
+        query, args = cls.add_joined_player_statement(table_id, player_name)
+        await Database.instance().execute(query, *args)
+
+    @classmethod
+    def add_joined_player_statement(cls, table_id, player_name):
+        return cls.ADD_JOINED_PLAYER_QUERY, (player_name, table_id)
+
+    @classmethod
+    def update_statement(cls, table_id, fields):
+        """Return query and arguments for updating several fields of a table at once."""
+        return update_statement(cls, fields, 'table_id = ?', (table_id,))
 
     @classmethod
     async def set_state(cls, table_id, state):
@@ -0,0 +1,90 @@
+from collections import namedtuple
+
+from .database import Database
+from .relation import Relation
+from .tables import TableState
+
+
+class TimersRelation(Relation):
+    """Deadlines of pending turn timeouts and delayed actions, at most one of each kind per table.
+
+    Deadlines are seconds since the epoch, so they survive a restart of the server.
+    """
+    NAME = 'timers'
+
+    TURN_TIMEOUT = 'turn timeout'
+    SCHEDULED = 'scheduled'
+
+    FIELDS = ['table_id', 'kind', 'deadline', 'action', 'player_name', 'token']
+
+    TIMERS_RELATION_ROW = namedtuple('TimersRelationRow', FIELDS)
+
+    CREATE_QUERY = """
+        CREATE TABLE timers (
+            table_id INT NOT NULL,
+            kind VARCHAR NOT NULL,
+            deadline REAL NOT NULL,
+            action VARCHAR NOT NULL,
+            player_name VARCHAR,
+            token VARCHAR,
+            PRIMARY KEY (table_id, kind)
+        )
+    """
+
+    DROP_IF_EXISTS_QUERY = """
+        DROP TABLE IF EXISTS timers
+    """
+
+    CLEAR_QUERY = """
+        DELETE FROM timers
+    """
+
+    SET_QUERY = """
+        INSERT OR REPLACE INTO timers ({})
+        VALUES ({})
+    """.format(','.join(FIELDS), ','.join(['?'] * len(FIELDS)))
+
+    DELETE_QUERY = """
+        DELETE FROM timers
+        WHERE table_id = ? AND kind = ?
+    """
+
+    DELETE_BY_TABLE_QUERY = """
+        DELETE FROM timers
+        WHERE table_id = ?
+    """
+
+    LOAD_BY_TABLE_STATE_QUERY = """
+        SELECT {}
+        FROM timers
+        WHERE table_id IN (SELECT table_id FROM tables WHERE state = ?)
+        ORDER BY deadline
+    """.format(','.join('timers.' + field for field in FIELDS))
+
+    # pylint: disable=too-many-arguments
+    @classmethod
+    def set_statement(cls, table_id, kind, deadline, action, player_name=None, token=None):
+        return cls.SET_QUERY, (table_id, kind, deadline, action, player_name, token)
+
+    @classmethod
+    def delete_statement(cls, table_id, kind):
+        return cls.DELETE_QUERY, (table_id, kind)
+
+    @classmethod
+    def delete_by_table_statement(cls, table_id):
+        return cls.DELETE_BY_TABLE_QUERY, (table_id,)
+
+    @classmethod
+    async def set_timer(cls, table_id, kind, deadline, action, player_name=None, token=None):
+        query, args = cls.set_statement(table_id, kind, deadline, action, player_name, token)
+        await Database.instance().execute(query, *args)
+
+    @classmethod
+    async def load_running(cls):
+        """Load the timers of all running games, the earliest deadline first."""
+        timers = []
+        db = Database.instance()
+        async with db.execute(cls.LOAD_BY_TABLE_STATE_QUERY, TableState.RUNNING_GAME.value) as cursor:
+            async for row in cursor:
+                timers.append(cls.TIMERS_RELATION_ROW(*row)._asdict())
+        return timers
@@ -1,8 +1,25 @@
+from .archive import (ArchiveError, HandArchive, HandArchiveReader, compact_hand_history, decode_card,
+                      encode_card)
 from .card import get_all_cards, parse_card
-from .match import (InsufficientBalanceError, InvalidBetError, InvalidTurnError, Match, NotYourTurnError,
-                    PositionOccupiedError)
+from .equity import (HAND_CLASSES, EquityTableError, PreflopEquityTable, compute_equity_matrix, hand_class,
+                     load_equity_table, write_equity_table)
+from .engine import (InsufficientBalanceError, InvalidBetError, InvalidTurnError, MatchEngine, NotYourTurnError,
+                     PositionOccupiedError, TableEvent)
+from .event_log import EVENT_TYPES, apply_event, rebuild_table, replay, restore, snapshot
+from .hand_history import build_hand_record, to_ndjson_line
+from .leaderboard import Leaderboard, RankedIndex
+from .match import Match, recover_timers
+from .matchmaking import Matchmaker
 from .player import PLAYER_NAME_PATTERN, Player
-from .ranking import (determine_winning_players, find_flush, find_full_house, find_high_card, find_n_of_a_kind,
-                      find_straight, find_straight_flush, find_two_pairs, rank)
+from .player_stats import PlayerStatsAggregator, to_rates
+from .ranking import (CATEGORY_NAMES, EMPTY_SUIT_MASKS, combine_suit_masks, determine_winning_players, evaluate,
+                      find_flush, find_full_house, find_high_card, find_n_of_a_kind, find_straight, find_straight_flush,
+                      find_two_pairs, rank, rank_suit_masks, to_suit_masks)
+from .rollups import WINDOWS, downsample_rollups, load_statistics_window
 from .statistics import Statistics, PlayerStatistics
-from .table import Pot, Round, Table, TableNotFoundError
+from .table import HandRankCache, Pot, Round, Table, TableNotFoundError
+from .table_feed import TableFeed, events_for_viewer
+from .table_index import TableIndex, filter_infos
+from .table_view import TableView, TableViews
+from .table_versions import TableVersions
+from .timer_wheel import TimerWheel
@@ -0,0 +1,275 @@
+"""Append-only columnar archive of finished hands for analytics.
+
+The archive is a directory with one binary file per column. Each file is an array of fixed-width little-endian
+values, so a reader can memory-map it and scan millions of hands as NumPy arrays without deserializing rows. There are
+three tables:
+
+- hands: one row per hand with its board and the range of its rows in the other tables,
+- seats: one row per player and hand with the balance before the blinds, hole cards and winnings,
+- actions: one row per action in order.
+
+Players are stored as indexes into the list of player names and cards as ints (see `encode_card`), -1 means no card.
+`manifest.json` holds the number of rows of each table and is replaced atomically after each append. Rows beyond
+these counts are the remainder of an interrupted append, they are ignored by readers and overwritten by the next one.
+"""
+from asyncio import get_event_loop
+from collections import OrderedDict, namedtuple
+import json
+import os
+import struct
+
+from pokerserver.database import HandHistoryRelation
+from .card import RANKS, SUITS
+from .table import Round
+
+try:
+    import numpy
+except ImportError:  # NumPy is only needed to read archives, see the analytics extra in setup.py.
+    numpy = None
+
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+BOARD_SIZE = 5
+
+# `code` is the NumPy type of a column without byte order, `width` the number of values per row.
+Column = namedtuple('Column', 'name code width')
+
+_STRUCT_CODES = {'i1': 'b', 'u1': 'B', 'i4': 'i', 'i8': 'q', 'f8': 'd'}
+
+TABLES = OrderedDict([
+    ('hands', [
+        Column('hand_id', 'i8', 1),
+        Column('table_id', 'i4', 1),
+        Column('finished_at', 'f8', 1),
+        Column('dealer', 'i4', 1),
+        Column('board', 'i1', BOARD_SIZE),
+        Column('first_seat', 'i8', 1),
+        Column('seat_count', 'u1', 1),
+        Column('first_action', 'i8', 1),
+        Column('action_count', 'i4', 1)
+    ]),
+    ('seats', [
+        Column('hand', 'i8', 1),
+        Column('player', 'i4', 1),
+        Column('position', 'u1', 1),
+        Column('balance', 'i4', 1),
+        Column('cards', 'i1', 2),
+        Column('won', 'i4', 1)
+    ]),
+    ('actions', [
+        Column('hand', 'i8', 1),
+        Column('player', 'i4', 1),
+        Column('round', 'u1', 1),
+        Column('action', 'u1', 1),
+        Column('amount', 'i4', 1)
+    ])
+])
+
+ACTIONS = ['blind', 'call', 'raise', 'check', 'fold', 'kick']
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+ROUND_CODES = {round_.name.lower(): round_.value for round_ in Round}
+
+_SUIT_CODES = {suit: code for code, suit in enumerate(SUITS)}
+_RANKS_BY_VALUE = {value: rank for rank, value in RANKS.items()}
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def encode_card(card):
+    """Encode a card as 4 * (rank - 2) + suit, i.e. '2s' -> 0 and 'Ac' -> 51."""
+    rank, suit = card[:-1], card[-1:]
+    return 4 * (RANKS[rank] - 2) + _SUIT_CODES[suit]
+
+
+def decode_card(code):
+    return _RANKS_BY_VALUE[code // 4 + 2] + SUITS[code % 4]
+
+
+def _column_path(path, table, column):
+    return os.path.join(path, '{}.{}.bin'.format(table, column.name))
+
+
+def _row_size(column):
+    return struct.calcsize('<' + _STRUCT_CODES[column.code]) * column.width
+
+
+def _read_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST)) as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return None
+    if manifest.get('version') != FORMAT_VERSION:
+        raise ArchiveError('Unsupported archive version: {}'.format(manifest.get('version')))
+    return manifest
+
+
+class HandArchive:
+    """Writer of an archive. Only one process may append to an archive at a time."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.manifest = _read_manifest(path)
+        if self.manifest is None:
+            self.manifest = {
+                'version': FORMAT_VERSION,
+                'last_hand_id': 0,
+                'rows': {table: 0 for table in TABLES},
+                'players': []
+            }
+            self._write_manifest()
+        self._player_ids = {name: index for index, name in enumerate(self.manifest['players'])}
+        # Discard the remainder of an interrupted append.
+        self._truncate_columns()
+
+    @property
+    def last_hand_id(self):
+        return self.manifest['last_hand_id']
+
+    def append(self, hands):
+        """Append rows of the hand_history relation ordered by hand_id. Hands already archived are skipped."""
+        hands = [hand for hand in hands if hand['hand_id'] > self.last_hand_id]
+        if not hands:
+            return 0
+        rows = self.manifest['rows']
+        previous_rows, previous_last_hand_id = dict(rows), self.last_hand_id
+        player_count = len(self.manifest['players'])
+        try:
+            values = {table: {column.name: [] for column in columns} for table, columns in TABLES.items()}
+            for offset, hand in enumerate(hands):
+                self._add_hand(values, rows['hands'] + offset, hand, json.loads(hand['data']))
+            for table, columns in TABLES.items():
+                for column in columns:
+                    self._append_column(table, column, values[table][column.name])
+            rows['hands'] += len(hands)
+            rows['seats'] += len(values['seats']['hand'])
+            rows['actions'] += len(values['actions']['hand'])
+            self.manifest['last_hand_id'] = hands[-1]['hand_id']
+            self._write_manifest()
+        except Exception:
+            # Columns written before the failure must not stay, the next append would not line up with them.
+            self.manifest['rows'] = previous_rows
+            self.manifest['last_hand_id'] = previous_last_hand_id
+            for name in self.manifest['players'][player_count:]:
+                del self._player_ids[name]
+            del self.manifest['players'][player_count:]
+            self._truncate_columns()
+            raise
+        return len(hands)
+
+    def _add_hand(self, values, hand_row, hand, record):
+        seats, actions = values['seats'], values['actions']
+        board = [encode_card(card) for card in record['board']]
+        winnings = {}
+        for result in record['results']:
+            winnings[result['player']] = winnings.get(result['player'], 0) + result['amount']
+
+        hand_values = values['hands']
+        hand_values['hand_id'].append(hand['hand_id'])
+        hand_values['table_id'].append(hand['table_id'])
+        hand_values['finished_at'].append(hand['finished_at'])
+        hand_values['dealer'].append(self._player_id(record['dealer']))
+        hand_values['board'].extend(board + [-1] * (BOARD_SIZE - len(board)))
+        hand_values['first_seat'].append(self.manifest['rows']['seats'] + len(seats['hand']))
+        hand_values['seat_count'].append(len(record['players']))
+        hand_values['first_action'].append(self.manifest['rows']['actions'] + len(actions['hand']))
+        hand_values['action_count'].append(len(record['actions']))
+
+        for player in record['players']:
+            cards = [encode_card(card) for card in player['cards']]
+            seats['hand'].append(hand_row)
+            seats['player'].append(self._player_id(player['name']))
+            seats['position'].append(player['position'])
+            seats['balance'].append(player['balance'])
+            seats['cards'].extend(cards + [-1] * (2 - len(cards)))
+            seats['won'].append(winnings.get(player['name'], 0))
+
+        for action in record['actions']:
+            actions['hand'].append(hand_row)
+            actions['player'].append(self._player_id(action['player']))
+            actions['round'].append(ROUND_CODES[action['round']])
+            actions['action'].append(ACTION_CODES[action['action']])
+            actions['amount'].append(action.get('amount', 0))
+
+    def _player_id(self, name):
+        if name not in self._player_ids:
+            self._player_ids[name] = len(self.manifest['players'])
+            self.manifest['players'].append(name)
+        return self._player_ids[name]
+
+    def _append_column(self, table, column, values):
+        if not values:
+            return
+        with open(_column_path(self.path, table, column), 'ab') as file:
+            file.write(struct.pack('<{}{}'.format(len(values), _STRUCT_CODES[column.code]), *values))
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _truncate_columns(self):
+        """Truncate every column to the number of rows in the manifest."""
+        for table, columns in TABLES.items():
+            for column in columns:
+                with open(_column_path(self.path, table, column), 'ab') as file:
+                    file.truncate(self.manifest['rows'][table] * _row_size(column))
+
+    def _write_manifest(self):
+        temporary_path = os.path.join(self.path, MANIFEST + '.tmp')
+        with open(temporary_path, 'w') as file:
+            json.dump(self.manifest, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, os.path.join(self.path, MANIFEST))
+
+
+class HandArchiveReader:
+    """Read-only NumPy views on the columns of an archive, e.g. `reader.seats['won']`.
+
+    Columns are memory-mapped, only the pages a scan touches are read. The reader sees the archive as of its
+    creation, create a new one to see hands appended since.
+    """
+
+    def __init__(self, path):
+        if numpy is None:
+            raise ArchiveError('Reading hand archives requires NumPy')
+        self.path = path
+        manifest = _read_manifest(path)
+        if manifest is None:
+            raise ArchiveError('Not a hand archive: {}'.format(path))
+        self.players = manifest['players']
+        self.last_hand_id = manifest['last_hand_id']
+        self._player_ids = {name: index for index, name in enumerate(self.players)}
+        self.hands, self.seats, self.actions = [
+            {column.name: self._map(table, column, manifest['rows'][table]) for column in TABLES[table]}
+            for table in ['hands', 'seats', 'actions']
+        ]
+
+    def __len__(self):
+        return len(self.hands['hand_id'])
+
+    def player_id(self, name):
+        return self._player_ids[name]
+
+    def _map(self, table, column, rows):
+        dtype = numpy.dtype('<' + column.code)
+        shape = (rows,) if column.width == 1 else (rows, column.width)
+        if rows == 0:
+            return numpy.empty(shape, dtype)  # empty files cannot be mapped
+        return numpy.memmap(_column_path(self.path, table, column), dtype=dtype, mode='r', shape=shape)
+
+
+async def compact_hand_history(archive, page_size=1000):
+    """Append the hands finished since the last compaction to the archive. Returns the number of hands appended.
+
+    Files are written in the default executor so the event loop is not blocked.
+    """
+    loop = get_event_loop()
+    appended = 0
+    while True:
+        hands = await HandHistoryRelation.load_page(archive.last_hand_id, page_size)
+        if hands:
+            appended += await loop.run_in_executor(None, archive.append, hands)
+        if len(hands) < page_size:
+            return appended
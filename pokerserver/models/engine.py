@@ -0,0 +1,571 @@
+"""The rules of the game as a synchronous state machine without any I/O.
+
+`MatchEngine.apply` takes an action, changes the in-memory `Table` accordingly and returns the table together
+with the effects of the action. Effects describe every state change (e.g. an updated player) and every request to
+the outside world (e.g. to start a player's timeout). `Match` persists them, simulations may simply ignore them.
+"""
+from collections import namedtuple
+import logging
+import random
+from uuid import uuid4
+
+from pokerserver.database import PlayerState, TableState
+from .card import get_all_cards
+from .player import Player
+from .table import Round
+
+LOG = logging.getLogger(__name__)
+
+
+class PositionOccupiedError(Exception):
+    pass
+
+
+class InvalidTurnError(Exception):
+    pass
+
+
+class NotYourTurnError(InvalidTurnError):
+    pass
+
+
+class InsufficientBalanceError(InvalidTurnError):
+    pass
+
+
+class InvalidBetError(InvalidTurnError):
+    pass
+
+
+# Actions
+Join = namedtuple('Join', 'player_name position')
+Start = namedtuple('Start', 'dealer_name')
+Fold = namedtuple('Fold', 'player_name')
+Call = namedtuple('Call', 'player_name')
+Check = namedtuple('Check', 'player_name')
+Raise = namedtuple('Raise', 'player_name amount')
+Kick = namedtuple('Kick', 'player_name token reason')
+ActivatePlayer = namedtuple('ActivatePlayer', 'player_name')
+StartNextHand = namedtuple('StartNextHand', [])
+
+TURN_ACTIONS = (Fold, Call, Check, Raise)
+
+# Effects
+HandStarted = namedtuple('HandStarted', 'dealer')
+# The pots of the hand were paid out, the events since the last 'hand' event make up its history.
+HandFinished = namedtuple('HandFinished', [])
+PlayerJoined = namedtuple('PlayerJoined', 'row')
+PlayerUpdated = namedtuple('PlayerUpdated', 'name fields')
+PlayerRemoved = namedtuple('PlayerRemoved', 'name position')
+TableUpdated = namedtuple('TableUpdated', 'fields')
+StatisticsIncremented = namedtuple('StatisticsIncremented', 'player_name matches buy_in gain')
+TurnStarted = namedtuple('TurnStarted', 'player_name token')
+# The engine stops after scheduling an action. The caller has to apply the action after the delay.
+Scheduled = namedtuple('Scheduled', 'delay action')
+# What happened at the table in terms of the game (join, blind, deal, bet, fold, draw, payout, ...), see `event_log`.
+TableEvent = namedtuple('TableEvent', 'type data')
+
+
+def apply(table, action, check_turn=True, **kwargs):
+    return MatchEngine(table, **kwargs).apply(action, check_turn)
+
+
+class MatchEngine:  # pylint: disable=too-many-public-methods
+    def __init__(self, table, turn_delay=None, showdown_timeout=None, rng=random):
+        self.table = table
+        self.turn_delay = turn_delay
+        self.showdown_timeout = showdown_timeout
+        self.rng = rng
+        self.effects = []
+
+    def apply(self, action, check_turn=True):
+        """Apply the action and return the table and the effects of the action.
+
+        Turn actions raise a `NotYourTurnError` if `check_turn` is set and the player is not the current
+        player. Kicks are silently ignored in that case. Callers that check the turn themselves (e.g. atomically
+        in the database) pass `check_turn=False`.
+        """
+        self.validate(action)
+        if check_turn and isinstance(action, TURN_ACTIONS + (Kick,)):
+            if not self.is_current_player(action.player_name, getattr(action, 'token', None)):
+                if isinstance(action, Kick):
+                    return self.table, []
+                raise NotYourTurnError('It\'s not your turn')
+        self.execute(action)
+        return self.table, self.take_effects()
+
+    def take_effects(self):
+        effects, self.effects = self.effects, []
+        return effects
+
+    def is_current_player(self, player_name, token=None):
+        current_player = self.table.current_player
+        return (
+            current_player is not None and current_player.name == player_name and
+            (token is None or token == self.table.current_player_token)
+        )
+
+    def validate(self, action):
+        if isinstance(action, Join):
+            self._validate_join(action.player_name, action.position)
+        elif isinstance(action, Call):
+            player = self.table.find_player(action.player_name)
+            if self._get_highest_bet() <= player.bet:
+                raise InvalidTurnError('Cannot call without higher bet, use \'check\' instead')
+        elif isinstance(action, Check):
+            player = self.table.find_player(action.player_name)
+            if self._get_highest_bet() > player.bet:
+                raise InvalidTurnError('Cannot check after a higher bet was made')
+        elif isinstance(action, Raise):
+            player = self.table.find_player(action.player_name)
+            if action.amount <= self._get_highest_bet() - player.bet:
+                raise InvalidBetError('Amount too low')
+            if action.amount > player.balance:
+                raise InsufficientBalanceError('Balance too low')
+
+    def _validate_join(self, player_name, position):
+        if self.table.is_closed:
+            raise ValueError('Table is closed')
+        if not self.table.is_position_valid(position):
+            raise ValueError('Invalid position')
+        if not self.table.is_position_free(position):
+            raise PositionOccupiedError()
+        if self.table.is_player_at_table(player_name) or player_name in self.table.joined_players:
+            raise ValueError('Player has already joined')
+
+    def execute(self, action):  # pylint: disable=too-many-branches
+        """Execute an action without validating it."""
+        if isinstance(action, Join):
+            self.join(action.player_name, action.position)
+        elif isinstance(action, Start):
+            self.start(self.table.find_player(action.dealer_name) if action.dealer_name is not None else None)
+        elif isinstance(action, ActivatePlayer):
+            self.activate_player(self.table.find_player(action.player_name))
+        elif isinstance(action, StartNextHand):
+            self.start_next_hand()
+        else:
+            player = self.table.find_player(action.player_name)
+            if self.table.current_player is not None:
+                self._set_current_player(None, None)
+            if isinstance(action, Fold):
+                self.fold(player)
+            elif isinstance(action, Call):
+                self.call(player)
+            elif isinstance(action, Check):
+                self.check(player)
+            elif isinstance(action, Raise):
+                self.raise_bet(player, action.amount)
+            elif isinstance(action, Kick):
+                self.kick(player, action.reason)
+            else:
+                raise ValueError('Unknown action: {}'.format(action))
+
+    def join(self, player_name, position):
+        self._seat(player_name, position)
+        self._start_if_complete()
+
+    def join_all(self, joins):
+        """Join several players, the game does not start before all of them have joined."""
+        for join in joins:
+            self._seat(join.player_name, join.position)
+        self._start_if_complete()
+
+    def _seat(self, player_name, position):
+        player = Player(
+            self.table.table_id, position, player_name, self.table.config.start_balance, [], 0,
+            state=PlayerState.SITTING_OUT
+        )
+        self.table.players.append(player)
+        self.table.joined_players.append(player_name)
+        self.effects.append(PlayerJoined({
+            'table_id': player.table_id,
+            'position': player.position,
+            'name': player.name,
+            'balance': player.balance,
+            'cards': [],
+            'bet': player.bet,
+            'last_seen': player.last_seen,
+            'state': player.state
+        }))
+
+        self._event('join', player=player_name, position=position, balance=player.balance)
+        self.log(player_name, 'Joined table {} at {}'.format(self.table.name, position))
+
+    def _start_if_complete(self):
+        if self.table.is_waiting_for_players and len(self.table.players) >= self.table.config.min_player_count:
+            self.start()
+
+    def start(self, dealer=None):
+        self._set_state(TableState.RUNNING_GAME)
+        self._event('start')
+        if dealer is None:
+            dealer = self.rng.choice(self.table.players)
+        self.reset_table()
+        self.start_hand(dealer)
+
+    def start_hand(self, dealer):
+        assert len(self.table.players) >= 2
+        self._set_dealer(dealer)
+        self.effects.append(HandStarted(dealer.name))
+        self._event('hand', dealer=dealer.name, players=[
+            {'name': player.name, 'position': player.position, 'balance': player.balance}
+            for player in self.table.players
+        ])
+        small_blind_player, big_blind_player = self.find_blind_players()
+        under_the_gun = self.find_start_player()
+        self.pay_blinds(small_blind_player, big_blind_player)
+        self.distribute_cards()
+        self.log(under_the_gun, "Started table {}".format(self.table.name))
+
+        if under_the_gun.state is not PlayerState.PLAYING:
+            # The player went all in paying the blind.
+            playing_players = [player for player in self.table.players if player.state is PlayerState.PLAYING]
+            if len(playing_players) > 1 or (playing_players and playing_players[0].bet < self._get_highest_bet()):
+                under_the_gun = self.table.player_left_of(under_the_gun, player_filter=playing_players)
+            else:
+                self.next_round()
+                return
+        self.set_player_active(under_the_gun)
+
+    def find_blind_players(self):
+        """Returns blind players independent of the progress of a match.
+
+        Only players that are sitting out are ignored.
+        """
+        active_players = [player for player in self.table.players if player.state is not PlayerState.SITTING_OUT]
+        if len(active_players) == 2:
+            small_blind = self.table.dealer
+            big_blind = self.table.player_left_of(small_blind, player_filter=active_players)
+        else:
+            small_blind = self.table.player_left_of(self.table.dealer, player_filter=active_players)
+            big_blind = self.table.player_left_of(small_blind, player_filter=active_players)
+        return small_blind, big_blind
+
+    def find_start_player(self):
+        """Find first player from small blind on that is playing (not sitting out)."""
+        small_blind, big_blind = self.find_blind_players()
+        if len(self.table.players) == 2:
+            return small_blind if self.table.round == Round.PREFLOP else big_blind
+        return self.table.player_left_of(big_blind) if self.table.round == Round.PREFLOP else small_blind
+
+    def find_start_player_postflop(self):
+        """Find first player from small blind on that is still playing (not folded, all in or sitting out)."""
+        small_blind, big_blind = self.find_blind_players()
+        active_players = [player for player in self.table.players if player.state is PlayerState.PLAYING]
+        if len(active_players) == 2:
+            start_player = small_blind if self.table.round == Round.PREFLOP else big_blind
+        else:
+            start_player = self.table.player_left_of(big_blind) if self.table.round == Round.PREFLOP else small_blind
+        if start_player.state is not PlayerState.PLAYING:
+            start_player = self.table.player_left_of(start_player, player_filter=active_players)
+        return start_player
+
+    def pay_blinds(self, small_blind_player, big_blind_player):
+        assert small_blind_player in self.table.players
+        assert big_blind_player in self.table.players
+        for player, blind in [(small_blind_player, self.table.config.small_blind),
+                              (big_blind_player, self.table.config.big_blind)]:
+            self._event('blind', player=player.name, amount=self.make_player_pay(player, blind))
+
+    def make_player_pay(self, player, amount):
+        """Pay the amount or as much as the balance allows. Returns the paid amount."""
+        assert amount > 0, 'amount to pay must be greater than 0'
+        paid_amount = amount if self.can_pay_amount(player, amount) else player.balance
+        self._increase_bet(player, paid_amount)
+        self.table.add_to_pot(player.position, paid_amount)
+        self._record_pots()
+        return paid_amount
+
+    @staticmethod
+    def can_pay_amount(player, amount):
+        return player.balance >= amount
+
+    def distribute_cards(self):
+        cards = get_all_cards()
+        self.rng.shuffle(cards)
+        for player in self.table.players:
+            self._update_player(player, cards=[cards.pop(), cards.pop()])
+        self._set_cards(remaining_deck=cards)
+        self._event(
+            'deal', cards={player.name: list(player.cards) for player in self.table.players}, deck=list(cards))
+
+    def set_player_active(self, player):
+        if self.turn_delay:
+            self.effects.append(Scheduled(self.turn_delay, ActivatePlayer(player.name)))
+        else:
+            self.activate_player(player)
+
+    def activate_player(self, player):
+        token = str(uuid4())
+        self._set_current_player(player, token)
+        self._event('turn', player=player.name, token=token)
+        self.effects.append(TurnStarted(player.name, token))
+
+    def fold(self, player):
+        self._update_player(player, state=PlayerState.FOLDED)
+        self._event('fold', player=player.name)
+        self.next_player_or_round(player)
+
+    def call(self, player):
+        amount = self.make_player_pay(player, self._get_highest_bet() - player.bet)
+        self._event('bet', player=player.name, amount=amount, action='call')
+        self.next_player_or_round(player)
+
+    def check(self, player):
+        self._event('check', player=player.name)
+        self.next_player_or_round(player)
+
+    def raise_bet(self, player, amount):
+        amount = self.make_player_pay(player, amount)
+        self._event('bet', player=player.name, amount=amount, action='raise')
+        self.next_player_or_round(player)
+
+    def kick(self, player, reason):
+        self.log(player, "Kicked due to: " + reason)
+        self._event('kick', player=player.name, reason=reason)
+        next_player = self.find_next_player(player)
+        if self.table.dealer.name == player.name:
+            self._set_dealer(self.table.player_right_of(self.table.dealer))
+
+        self.increment_stats_for_player(player)
+        self.remove_player(player)
+
+        if len(self.table.players) > 1:
+            if next_player is None:
+                self.next_round()
+            else:
+                self.set_player_active(next_player)
+        else:
+            self.close_table()
+
+    def next_player_or_round(self, current_player):
+        next_player = self.find_next_player(current_player)
+        if next_player is None:
+            self.next_round()
+        else:
+            self.set_player_active(next_player)
+
+    def find_next_player(self, current_player):
+        active_players = [
+            player for player in self.table.players
+            if player.state not in [PlayerState.FOLDED, PlayerState.SITTING_OUT]
+        ]
+
+        if len(active_players) <= 1:
+            return None
+
+        active_players_not_all_in = [
+            player for player in active_players
+            if player.position == current_player.position or player.state is not PlayerState.ALL_IN
+        ]
+
+        if not active_players_not_all_in:
+            return None
+
+        if len(active_players_not_all_in) == 1 and active_players_not_all_in[0].position == current_player.position:
+            return None
+
+        next_player = self.table.player_left_of(current_player, active_players_not_all_in)
+        if not self._may_make_another_turn(next_player, current_player):
+            return None
+        return next_player
+
+    def reset_bets(self):
+        for player in self.table.players:
+            self._update_player(player, bet=0)
+
+    def next_round(self):
+        self.reset_bets()
+        self._event('round')
+        active_players = [player for player in self.table.players if player.state is PlayerState.PLAYING]
+        all_in_players = [player for player in self.table.players if player.state is PlayerState.ALL_IN]
+
+        if len(active_players) < 2:
+            if all_in_players:
+                if self.table.round is Round.PREFLOP:
+                    self.draw_cards(3)
+                if self.table.round is Round.FLOP:
+                    self.draw_cards(1)
+                if self.table.round is Round.TURN:
+                    self.draw_cards(1)
+            self.finish_hand()
+            return
+
+        if self.table.round is Round.PREFLOP:
+            self.draw_cards(3)
+        elif self.table.round in [Round.FLOP, Round.TURN]:
+            self.draw_cards(1)
+        else:
+            self.finish_hand()
+            return
+
+        next_player = self.find_start_player_postflop()
+        self.log(next_player, 'Starts new round')
+        self.set_player_active(next_player)
+
+    def draw_cards(self, number):
+        self.table.reveal_cards(number)
+        self._event('draw', cards=self.table.open_cards[-number:])
+        self._record_table(remaining_deck=list(self.table.remaining_deck), open_cards=list(self.table.open_cards))
+
+    def finish_hand(self):
+        self.distribute_pots()
+        self.effects.append(HandFinished())
+        if self.showdown_timeout:
+            self.effects.append(Scheduled(self.showdown_timeout, StartNextHand()))
+        else:
+            self.start_next_hand()
+
+    def start_next_hand(self):
+        old_dealer = self.table.dealer
+        self.reset_table()
+
+        dealer = self.table.player_left_of(old_dealer)
+        while len(self.table.players) > 1:
+            bankrupt_players = self.find_bankrupt_players()
+            if not bankrupt_players:
+                break
+
+            for player in bankrupt_players:
+                self.log(player, 'leaves the game')
+                self._event('leave', player=player.name)
+                self.increment_stats_for_player(player)
+                self.remove_player(player)
+            if dealer in bankrupt_players:
+                dealer = self.table.player_left_of(dealer)
+
+        if len(self.table.players) > 1:
+            self.start_hand(dealer)
+        else:
+            self.close_table()
+
+    def distribute_pots(self):
+        active_players = self.table.active_players()
+
+        for pot in self.table.pots:
+            active_players_for_pot = [player for player in active_players if player.position in pot.bets.keys()]
+            self.distribute_pot(pot, active_players_for_pot)
+
+    def distribute_pot(self, pot, players):
+        winning_players = self.table.determine_winning_players(players) if len(players) > 1 else players
+
+        for player in winning_players:
+            self._pay_out(player, pot.amount // len(winning_players))
+
+        rest = pot.amount % len(winning_players)
+        if rest != 0:
+            player = self.table.player_left_of(self.table.dealer, player_filter=players)
+            self._pay_out(player, rest)
+
+    def find_bankrupt_players(self):
+        return [player for player in self.table.players if player.balance == 0]
+
+    def reset_table(self):
+        self._event('reset')
+        self._set_cards(remaining_deck=[], open_cards=[])
+        self.table.clear_pot_bets()
+        self._record_pots()
+        self._set_dealer(None)
+        for player in self.table.players:
+            self._update_player(player, bet=0, state=PlayerState.PLAYING)
+
+    def close_table(self):
+        self.log('', 'Closing table {}'.format(self.table.table_id))
+        for player in self.table.players:
+            self.increment_stats_for_player(player)
+        self._event('close')
+        self._set_state(TableState.CLOSED)
+        self._set_dealer(None)
+        if self.table.current_player is not None:
+            self._set_current_player(None, None)
+        for player in self.table.players.copy():
+            self.remove_player(player)
+
+    def remove_player(self, player):
+        self.table.players.remove(player)
+        self.effects.append(PlayerRemoved(player.name, player.position))
+
+    def increment_stats_for_player(self, player):
+        self.effects.append(StatisticsIncremented(
+            player.name, matches=1, buy_in=self.table.config.start_balance, gain=player.balance))
+
+    def _increase_bet(self, player, amount):
+        assert amount > 0, 'Need to increase bet by more than 0.'
+        self._update_player(player, balance=player.balance - amount, bet=player.bet + amount)
+        if player.balance == 0:
+            self._update_player(player, state=PlayerState.ALL_IN)
+
+    def _pay_out(self, player, amount):
+        self._increase_balance(player, amount)
+        self._event('payout', player=player.name, amount=amount)
+
+    def _event(self, event_type, **data):
+        self.effects.append(TableEvent(event_type, data))
+
+    def _increase_balance(self, player, increase):
+        assert increase >= 0, 'the balance increase must not be negative'
+        self._update_player(player, balance=player.balance + increase)
+
+    def _update_player(self, player, **fields):
+        for field, value in fields.items():
+            setattr(player, field, value)
+        self.effects.append(PlayerUpdated(player.name, fields))
+
+    def _set_state(self, state):
+        self.table.state = state
+        self._record_table(state=state)
+
+    def _set_dealer(self, dealer):
+        self.table.dealer = dealer
+        self._record_table(dealer=dealer.name if dealer is not None else None)
+
+    def _set_current_player(self, player, token):
+        assert player is None or player.state not in [PlayerState.FOLDED, PlayerState.SITTING_OUT]
+        self.table.current_player = player
+        self.table.current_player_token = token
+        self._record_table(current_player=player.name if player is not None else None, current_player_token=token)
+
+    def _set_cards(self, remaining_deck=None, open_cards=None):
+        if remaining_deck is not None:
+            self.table.remaining_deck = remaining_deck
+        if open_cards is not None:
+            self.table.open_cards = open_cards
+        self._record_table(remaining_deck=list(self.table.remaining_deck), open_cards=list(self.table.open_cards))
+
+    def _record_pots(self):
+        self._record_table(pots=[{'bets': dict(pot.bets)} for pot in self.table.pots])
+
+    def _record_table(self, **fields):
+        self.effects.append(TableUpdated(fields))
+
+    def _get_highest_bet(self):
+        return self.table.highest_bet()
+
+    def _may_make_another_turn(self, player, current_player):
+        has_highest_bet = player.bet == self._get_highest_bet()
+        if not has_highest_bet:
+            return True
+        elif player.bet > self._get_initial_bet(player):
+            return False
+        else:
+            start_player = self.find_start_player()
+            has_made_turn = player.position in self.table.player_positions_between(
+                start_player.position, current_player.position)
+            return not has_made_turn
+
+    def _get_initial_bet(self, player):
+        if self.table.round is not Round.PREFLOP:
+            return 0
+
+        small_blind_player, big_blind_player = self.find_blind_players()
+
+        if player.position == small_blind_player.position:
+            return self.table.config.small_blind
+        elif player.position == big_blind_player.position:
+            return self.table.config.big_blind
+        else:
+            return 0
+
+    @staticmethod
+    def log(player_or_name, message):
+        LOG.info('[%s] %s', str(player_or_name), message)
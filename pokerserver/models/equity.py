@@ -0,0 +1,168 @@
+from functools import lru_cache
+from itertools import combinations
+import mmap
+import random
+import struct
+
+from .card import RANKS, SUITS, get_all_cards, split_card
+from .ranking import combine_suit_masks, rank_suit_masks, to_suit_masks
+
+# Hand classes use single characters for ranks, i.e. 'T' instead of '10'.
+_SYMBOLS_BY_RANK = {rank: 'T' if rank == '10' else rank for rank in RANKS}
+_RANKS_BY_SYMBOL = {symbol: rank for rank, symbol in _SYMBOLS_BY_RANK.items()}
+_SYMBOLS = [_SYMBOLS_BY_RANK[rank] for rank in sorted(RANKS, key=RANKS.get, reverse=True)]  # ['A', 'K', ..., '2']
+
+
+def _build_hand_classes():
+    classes = []
+    for i, high in enumerate(_SYMBOLS):
+        classes.append(high + high)
+        for low in _SYMBOLS[i + 1:]:
+            classes.append(high + low + 's')
+            classes.append(high + low + 'o')
+    return classes
+
+
+# The 169 strategically different starting hands, e.g. 'AA', 'AKs' (suited) and 'AKo' (offsuit).
+HAND_CLASSES = _build_hand_classes()
+HAND_CLASS_INDEXES = {hand_class: index for index, hand_class in enumerate(HAND_CLASSES)}
+
+MAGIC = b'PEQT'
+FORMAT_VERSION = 1
+# magic, format version, number of hand classes, samples per matchup
+HEADER = struct.Struct('<4sHHI')
+# Equities are stored as fixed point numbers: 0 means 0%, MAX_VALUE means 100%.
+VALUE = struct.Struct('<H')
+MAX_VALUE = 0xFFFF
+
+
+class EquityTableError(Exception):
+    pass
+
+
+def hand_class(cards):
+    """Return the hand class of two hole cards, e.g. ['Kd', 'Ad'] -> 'AKs'."""
+    (rank1, suit1), (rank2, suit2) = sorted((split_card(card) for card in cards), key=lambda c: -RANKS[c[0]])
+    symbols = _SYMBOLS_BY_RANK[rank1] + _SYMBOLS_BY_RANK[rank2]
+    if rank1 == rank2:
+        return symbols
+    return symbols + ('s' if suit1 == suit2 else 'o')
+
+
+def hand_class_combinations(name):
+    """Return all concrete pairs of hole cards belonging to the given hand class."""
+    rank1, rank2, suitedness = _RANKS_BY_SYMBOL[name[0]], _RANKS_BY_SYMBOL[name[1]], name[2:]
+    if rank1 == rank2:
+        return [[rank1 + suit1, rank2 + suit2] for suit1, suit2 in combinations(SUITS, 2)]
+    if suitedness == 's':
+        return [[rank1 + suit, rank2 + suit] for suit in SUITS]
+    return [[rank1 + suit1, rank2 + suit2] for suit1 in SUITS for suit2 in SUITS if suit1 != suit2]
+
+
+def compute_equity(class1, class2, samples, rng=random):
+    """Estimate the all-in preflop equity of `class1` against `class2` by sampling random deals."""
+    combinations1 = hand_class_combinations(class1)
+    combinations2 = hand_class_combinations(class2)
+    all_cards = get_all_cards()
+    points = 0
+    done = 0
+    while done < samples:
+        hole_cards1 = rng.choice(combinations1)
+        hole_cards2 = rng.choice(combinations2)
+        if hole_cards1[0] in hole_cards2 or hole_cards1[1] in hole_cards2:
+            continue
+        used_cards = hole_cards1 + hole_cards2
+        board = to_suit_masks(rng.sample([card for card in all_cards if card not in used_cards], 5))
+        rank1 = rank_suit_masks(combine_suit_masks(to_suit_masks(hole_cards1), board))
+        rank2 = rank_suit_masks(combine_suit_masks(to_suit_masks(hole_cards2), board))
+        points += 2 if rank1 > rank2 else 1 if rank1 == rank2 else 0
+        done += 1
+    return points / (2 * samples)
+
+
+def _compute_row(args):
+    index, samples, seed = args
+    rng = random.Random('{}:{}'.format(seed, index))
+    return [compute_equity(HAND_CLASSES[index], HAND_CLASSES[other], samples, rng)
+            for other in range(index, len(HAND_CLASSES))]
+
+
+def compute_equity_matrix(samples, seed=0, pool=None):
+    """Compute the equity of every hand class against every other hand class.
+
+    Only the upper triangle is sampled, the lower triangle follows from equity(b, a) = 1 - equity(a, b).
+    Rows are computed in parallel if a `multiprocessing` pool is given.
+    """
+    size = len(HAND_CLASSES)
+    tasks = [(index, samples, seed) for index in range(size)]
+    rows = pool.map(_compute_row, tasks) if pool is not None else map(_compute_row, tasks)
+    matrix = [[0.0] * size for _ in range(size)]
+    for index, row in enumerate(rows):
+        for offset, equity in enumerate(row):
+            matrix[index][index + offset] = equity
+            if offset > 0:
+                matrix[index + offset][index] = 1 - equity
+    return matrix
+
+
+def compute_equities_against_random_hands(matrix):
+    """Weight each row by the number of concrete combinations per hand class (ignoring card removal)."""
+    weights = [len(hand_class_combinations(name)) for name in HAND_CLASSES]
+    total_weight = sum(weights)
+    return [sum(weight * equity for weight, equity in zip(weights, row)) / total_weight for row in matrix]
+
+
+def write_equity_table(path, matrix, samples):
+    """Write the matrix followed by the equities against random hands as fixed point numbers."""
+    values = [equity for row in matrix for equity in row] + compute_equities_against_random_hands(matrix)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(HAND_CLASSES), samples))
+        file.write(struct.pack('<{}H'.format(len(values)), *(round(value * MAX_VALUE) for value in values)))
+
+
+class PreflopEquityTable:
+    """Read-only view on an equity table file written by `write_equity_table`.
+
+    The file is memory-mapped, i.e. nothing is read at startup and all processes share the same pages.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise EquityTableError('File is empty: {}'.format(path))
+        size = len(HAND_CLASSES)
+        try:
+            magic, version, number_of_classes, self.samples = HEADER.unpack_from(self._mmap, 0)
+        except struct.error:
+            raise EquityTableError('File is too short: {}'.format(path))
+        if magic != MAGIC or version != FORMAT_VERSION or number_of_classes != size:
+            raise EquityTableError('Not a preflop equity table: {}'.format(path))
+        if len(self._mmap) != HEADER.size + VALUE.size * (size * size + size):
+            raise EquityTableError('Unexpected file size: {}'.format(path))
+
+    def _read(self, index):
+        return VALUE.unpack_from(self._mmap, HEADER.size + VALUE.size * index)[0] / MAX_VALUE
+
+    def equity(self, class1, class2):
+        size = len(HAND_CLASSES)
+        return self._read(HAND_CLASS_INDEXES[class1] * size + HAND_CLASS_INDEXES[class2])
+
+    def equity_against_random_hand(self, name):
+        size = len(HAND_CLASSES)
+        return self._read(size * size + HAND_CLASS_INDEXES[name])
+
+    def equity_of_cards(self, cards, opponent_cards=None):
+        if opponent_cards is None:
+            return self.equity_against_random_hand(hand_class(cards))
+        return self.equity(hand_class(cards), hand_class(opponent_cards))
+
+    def close(self):
+        self._mmap.close()
+
+
+@lru_cache(maxsize=None)
+def load_equity_table(path):
+    """Open each equity table only once per process."""
+    return PreflopEquityTable(path)
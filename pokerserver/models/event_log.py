@@ -0,0 +1,212 @@
+"""Rebuild tables from their append-only event log.
+
+The `MatchEngine` emits a `TableEvent` for everything that happens at a table: players join, blinds are paid, cards
+are dealt and drawn, players bet, check, fold or are kicked and pots are paid out. `Match` appends these events to
+the events relation and stores a snapshot of the table whenever a hand starts. A table is rebuilt from its latest
+snapshot and the events after it. Replaying the events of real hands also makes a realistic regression workload.
+"""
+import json
+
+from pokerserver.database import EventsRelation, PlayerState, SnapshotsRelation, TableState, TablesRelation
+from .engine import HandStarted, TableEvent
+from .player import Player
+from .table import Table, TableNotFoundError
+
+
+def _join(table, player, position, balance):
+    table.players.append(Player(table.table_id, position, player, balance, [], 0, state=PlayerState.SITTING_OUT))
+    table.joined_players.append(player)
+
+
+def _start(table):
+    table.state = TableState.RUNNING_GAME
+
+
+def _reset(table):
+    table.remaining_deck = []
+    table.open_cards = []
+    table.clear_pot_bets()
+    table.dealer = None
+    for player in table.players:
+        player.bet = 0
+        player.state = PlayerState.PLAYING
+
+
+def _hand(table, dealer, players):  # pylint: disable=unused-argument
+    table.dealer = table.find_player(dealer)
+
+
+def _blind(table, player, amount):
+    _pay(table, table.find_player(player), amount)
+
+
+def _deal(table, cards, deck):
+    for name, hole_cards in cards.items():
+        table.find_player(name).cards = list(hole_cards)
+    table.remaining_deck = list(deck)
+
+
+def _turn(table, player, token):
+    table.current_player = table.find_player(player)
+    table.current_player_token = token
+
+
+def _bet(table, player, amount, action):  # pylint: disable=unused-argument
+    _end_turn(table)
+    _pay(table, table.find_player(player), amount)
+
+
+def _check(table, player):  # pylint: disable=unused-argument
+    _end_turn(table)
+
+
+def _fold(table, player):
+    _end_turn(table)
+    table.find_player(player).state = PlayerState.FOLDED
+
+
+def _kick(table, player, reason):  # pylint: disable=unused-argument
+    _end_turn(table)
+    player = table.find_player(player)
+    if table.dealer is not None and table.dealer.name == player.name:
+        table.dealer = table.player_right_of(table.dealer)
+    table.players.remove(player)
+
+
+def _round(table):
+    for player in table.players:
+        player.bet = 0
+
+
+def _draw(table, cards):
+    drawn_cards = table.reveal_cards(len(cards))
+    assert drawn_cards == cards, 'Drew {} instead of {}'.format(drawn_cards, cards)
+
+
+def _payout(table, player, amount):
+    table.find_player(player).balance += amount
+
+
+def _leave(table, player):
+    table.players.remove(table.find_player(player))
+
+
+def _close(table):
+    _end_turn(table)
+    table.state = TableState.CLOSED
+    table.dealer = None
+    table.players = []
+
+
+def _pay(table, player, amount):
+    player.balance -= amount
+    player.bet += amount
+    if player.balance == 0:
+        player.state = PlayerState.ALL_IN
+    table.add_to_pot(player.position, amount)
+
+
+def _end_turn(table):
+    table.current_player = None
+    table.current_player_token = None
+
+
+_HANDLERS = {
+    'join': _join,
+    'start': _start,
+    'reset': _reset,
+    'hand': _hand,
+    'blind': _blind,
+    'deal': _deal,
+    'turn': _turn,
+    'bet': _bet,
+    'check': _check,
+    'fold': _fold,
+    'kick': _kick,
+    'round': _round,
+    'draw': _draw,
+    'payout': _payout,
+    'leave': _leave,
+    'close': _close
+}
+
+EVENT_TYPES = set(_HANDLERS)
+
+
+def apply_event(table, event):
+    """Change the table like the engine did when it emitted the event."""
+    _HANDLERS[event.type](table, **event.data)
+
+
+def replay(table, events):
+    for event in events:
+        apply_event(table, event)
+    return table
+
+
+def snapshot(table):
+    return {
+        'players': [{
+            'position': player.position,
+            'name': player.name,
+            'balance': player.balance,
+            'cards': player.cards,
+            'bet': player.bet,
+            'state': player.state.value
+        } for player in table.players],
+        'remaining_deck': table.remaining_deck,
+        'open_cards': table.open_cards,
+        'pots': [pot.to_dict() for pot in table.pots],
+        'current_player': table.current_player.name if table.current_player is not None else None,
+        'current_player_token': table.current_player_token,
+        'dealer': table.dealer.name if table.dealer is not None else None,
+        'state': table.state.value,
+        'joined_players': table.joined_players
+    }
+
+
+def restore(table_id, name, config, data):
+    """Create a table from a snapshot, which may have been encoded as JSON."""
+    players = [
+        Player(table_id, player['position'], player['name'], player['balance'], list(player['cards']), player['bet'],
+               state=PlayerState(player['state']))
+        for player in data['players']
+    ]
+    players_by_name = {player.name: player for player in players}
+    return Table(
+        table_id, name, config, players=players,
+        remaining_deck=list(data['remaining_deck']),
+        open_cards=list(data['open_cards']),
+        pots=[{'bets': {int(position): bet for position, bet in pot['bets'].items()}} for pot in data['pots']],
+        current_player=players_by_name.get(data['current_player']),
+        current_player_token=data['current_player_token'],
+        dealer=players_by_name.get(data['dealer']),
+        state=TableState(data['state']),
+        joined_players=list(data['joined_players'])
+    )
+
+
+def collect_event_statements(table, effects):
+    """Append the events of the effects to the log. Snapshot the table after them if a hand started."""
+    statements = [
+        EventsRelation.append_statement(table.table_id, effect.type, json.dumps(effect.data))
+        for effect in effects if isinstance(effect, TableEvent)
+    ]
+    if any(isinstance(effect, HandStarted) for effect in effects):
+        statements.append(SnapshotsRelation.insert_statement(table.table_id, json.dumps(snapshot(table))))
+    return statements
+
+
+async def rebuild_table(table_id):
+    """Rebuild a table from its latest snapshot and the events after it."""
+    table_data = await TablesRelation.load_table_by_id(table_id)
+    if table_data is None:
+        raise TableNotFoundError()
+    latest_snapshot = await SnapshotsRelation.load_latest(table_id)
+    if latest_snapshot is None:
+        table, sequence = Table(table_id, table_data['name'], table_data['config']), 0
+    else:
+        table = restore(table_id, table_data['name'], table_data['config'], json.loads(latest_snapshot['data']))
+        sequence = latest_snapshot['sequence']
+    events = await EventsRelation.load_since(table_id, sequence)
+    return replay(table, [TableEvent(event['type'], json.loads(event['data'])) for event in events])
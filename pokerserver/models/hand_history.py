@@ -0,0 +1,79 @@
+"""Records of finished hands, built from the events of the hand.
+
+A record lists the players with their balance before the blinds and their hole cards, the board, every action in
+order and the payouts. `Match` inserts one record per hand into the hand_history relation when the hand finishes.
+"""
+import json
+import logging
+
+from pokerserver.database import EventsRelation, HandHistoryRelation
+from .engine import HandFinished, TableEvent
+from .table import ROUNDS_BY_OPEN_CARDS
+
+LOG = logging.getLogger(__name__)
+
+ACTION_EVENTS = {'blind', 'bet', 'check', 'fold', 'kick'}
+
+
+def build_hand_record(events):
+    """Summarize the events of one hand, starting with its 'hand' event."""
+    assert events and events[0].type == 'hand', 'The events of a hand start with a hand event'
+    hand = events[0].data
+    players = [dict(player, cards=[]) for player in hand['players']]
+    players_by_name = {player['name']: player for player in players}
+    board, actions, results = [], [], []
+    for event in events[1:]:
+        if event.type == 'deal':
+            for name, cards in event.data['cards'].items():
+                players_by_name[name]['cards'] = list(cards)
+        elif event.type == 'draw':
+            board.extend(event.data['cards'])
+        elif event.type in ACTION_EVENTS:
+            action = {
+                'round': ROUNDS_BY_OPEN_CARDS[len(board)].name.lower(),
+                'player': event.data['player'],
+                'action': event.data.get('action', event.type)
+            }
+            if 'amount' in event.data:
+                action['amount'] = event.data['amount']
+            if 'reason' in event.data:
+                action['reason'] = event.data['reason']
+            actions.append(action)
+        elif event.type == 'payout':
+            results.append({'player': event.data['player'], 'amount': event.data['amount']})
+    return {'dealer': hand['dealer'], 'players': players, 'board': board, 'actions': actions, 'results': results}
+
+
+async def collect_history_statements(table_id, effects, finished_at):
+    """Insert a record for each hand finished by the effects.
+
+    Hands that started in an earlier batch of effects are completed with their events from the event log. Hands
+    started before there was an event log have no record.
+    """
+    statements = []
+    events, started = [], False
+    for effect in effects:
+        if isinstance(effect, TableEvent):
+            if effect.type == 'hand':
+                events, started = [], True
+            events.append(effect)
+        elif isinstance(effect, HandFinished):
+            if not started:
+                stored_events = await EventsRelation.load_current_hand(table_id)
+                events = [TableEvent(event['type'], json.loads(event['data'])) for event in stored_events] + events
+            if events and events[0].type == 'hand':
+                statements.append(HandHistoryRelation.insert_statement(
+                    table_id, finished_at, json.dumps(build_hand_record(events))))
+            else:
+                LOG.warning('No events for the hand finished at table %s, skipping its history', table_id)
+            events, started = [], False
+    return statements
+
+
+def to_ndjson_line(hand):
+    """Encode a row of the hand_history relation as one line of newline delimited JSON.
+
+    The stored record is already JSON, only the columns of the row are prepended.
+    """
+    head = json.dumps({'hand_id': hand['hand_id'], 'table_id': hand['table_id'], 'finished_at': hand['finished_at']})
+    return '{}, {}\n'.format(head[:-1], hand['data'][1:])
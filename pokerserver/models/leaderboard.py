@@ -0,0 +1,175 @@
+import random
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, next_nodes, widths):
+        self.key = key
+        self.next = next_nodes
+        self.width = widths
+
+
+_END = _Node(None, [], [])
+
+
+class RankedIndex:
+    """Sorted set of keys with O(log n) insert, remove, rank and access by rank.
+
+    This is an indexable skip list: every link stores how many keys it skips, so positions can be counted while
+    searching.
+    """
+    MAX_LEVELS = 24
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self._head = _Node(None, [_END] * self.MAX_LEVELS, [1] * self.MAX_LEVELS)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        node = self._head.next[0]
+        while node is not _END:
+            yield node.key
+            node = node.next[0]
+
+    def __getitem__(self, index):
+        return self._node_at(index).key
+
+    def add(self, key):
+        chain = [None] * self.MAX_LEVELS
+        steps_at_level = [0] * self.MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not _END and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        if chain[0].next[0] is not _END and chain[0].next[0].key == key:
+            return
+
+        height = 1
+        while height < self.MAX_LEVELS and self.rng.random() < 0.5:
+            height += 1
+        new_node = _Node(key, [None] * height, [None] * height)
+        steps = 0
+        for level in range(height):
+            previous = chain[level]
+            new_node.next[level] = previous.next[level]
+            previous.next[level] = new_node
+            new_node.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(height, self.MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        chain = self._find_chain(key)
+        node = chain[0].next[0]
+        if node is _END or node.key != key:
+            raise KeyError(key)
+        for level in range(len(node.next)):
+            previous = chain[level]
+            previous.width[level] += node.width[level] - 1
+            previous.next[level] = node.next[level]
+        for level in range(len(node.next), self.MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def rank(self, key):
+        """Return the 0-based position of `key`."""
+        node = self._head
+        position = 0
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not _END and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        if node.next[0] is _END or node.next[0].key != key:
+            raise KeyError(key)
+        return position
+
+    def slice(self, offset, limit):
+        """Return up to `limit` keys starting at position `offset`."""
+        if offset >= self._size or limit <= 0:
+            return []
+        keys = []
+        node = self._node_at(offset)
+        while node is not _END and len(keys) < limit:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+    def _find_chain(self, key):
+        chain = [None] * self.MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not _END and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        return chain
+
+    def _node_at(self, index):
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        node = self._head
+        index += 1
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.width[level] <= index:
+                index -= node.width[level]
+                node = node.next[level]
+        return node
+
+
+def _gain_per_match(statistics):
+    return statistics.gain / statistics.matches if statistics.matches else 0.0
+
+
+class Leaderboard:
+    """Players ranked by their statistics, best first. Ties are ordered by player name.
+
+    Keeps one `RankedIndex` per order, so changing the statistics of a player, top-N queries, pages and the rank of
+    a player take O(log n).
+    """
+    ORDERS = {
+        'gain': lambda statistics: statistics.gain,
+        'gain_per_match': _gain_per_match
+    }
+
+    def __init__(self, player_statistics=()):
+        self._statistics = {}
+        self._indexes = {order: RankedIndex() for order in self.ORDERS}
+        for statistics in player_statistics:
+            self.update(statistics)
+
+    def __len__(self):
+        return len(self._statistics)
+
+    def __contains__(self, player_name):
+        return player_name in self._statistics
+
+    def get(self, player_name, default=None):
+        return self._statistics.get(player_name, default)
+
+    def update(self, statistics):
+        """Insert the statistics of a player or replace the old ones."""
+        old_statistics = self._statistics.get(statistics.player_name)
+        for order, index in self._indexes.items():
+            if old_statistics is not None:
+                index.remove(self._key(order, old_statistics))
+            index.add(self._key(order, statistics))
+        self._statistics[statistics.player_name] = statistics
+
+    def rank(self, player_name, order='gain'):
+        """Return the 1-based rank of a player. Raises a `KeyError` for unknown players."""
+        return self._indexes[order].rank(self._key(order, self._statistics[player_name])) + 1
+
+    def page(self, order='gain', offset=0, limit=10):
+        """Return up to `limit` (rank, statistics) pairs starting at rank `offset` + 1."""
+        keys = self._indexes[order].slice(offset, limit)
+        return [(offset + index + 1, self._statistics[key[1]]) for index, key in enumerate(keys)]
+
+    def _key(self, order, statistics):
+        return -self.ORDERS[order](statistics), statistics.player_name
@@ -1,368 +1,323 @@
-import random
-
-from asyncio import get_event_loop, sleep
-from asyncio.tasks import gather
+from collections import OrderedDict
+from functools import partial
 import logging
-from uuid import uuid4
+from time import time
 
 from pokerserver.configuration import ServerConfig
-from pokerserver.database import DuplicateKeyError, PlayerState
-from pokerserver.database import TableState
-from .card import get_all_cards
-from .player import Player
-from .ranking import determine_winning_players
+from pokerserver.database import DuplicateKeyError, PlayersRelation, TableState, TablesRelation, TimersRelation
+from .engine import (ActivatePlayer, Call, Check, Fold, Join, Kick, MatchEngine, NotYourTurnError, PlayerJoined,
+                     PlayerRemoved, PlayerUpdated, PositionOccupiedError, Raise, Scheduled, StartNextHand,
+                     StatisticsIncremented, TableUpdated, TurnStarted)
+from .event_log import collect_event_statements
+from .hand_history import collect_history_statements
+from .player_stats import PlayerStatsAggregator
 from .statistics import Statistics
-from .table import Round
+from .table import Table, TableNotFoundError
+from .table_feed import TableFeed
+from .table_versions import TableVersions
+from .timer_wheel import TimerWheel
 
 LOG = logging.getLogger(__name__)
 
-
-class PositionOccupiedError(Exception):
-    pass
-
-
-class InvalidTurnError(Exception):
-    pass
-
-
-class NotYourTurnError(InvalidTurnError):
-    pass
-
-
-class InsufficientBalanceError(InvalidTurnError):
-    pass
-
-
-class InvalidBetError(InvalidTurnError):
-    pass
+KICK_ACTION = 'kick'
+ACTIVATE_PLAYER_ACTION = 'activate player'
+START_NEXT_HAND_ACTION = 'start next hand'
 
 
 class Match:  # pylint: disable=too-many-public-methods
+    """Runs the `MatchEngine` on a table and persists the effects of every action in one batch."""
+
     def __init__(self, table, turn_delay=None, showdown_timeout=None):
         self.table = table
-        self.turn_delay = turn_delay
-        self.showdown_timeout = showdown_timeout
+        self.engine = MatchEngine(table, turn_delay, showdown_timeout)
+
+    @property
+    def turn_delay(self):
+        return self.engine.turn_delay
+
+    @property
+    def showdown_timeout(self):
+        return self.engine.showdown_timeout
 
     async def check_and_unset_current_player(self, player_name):
         is_current_player = await self.table.check_and_unset_current_player(player_name)
         if not is_current_player:
             raise NotYourTurnError('It\'s not your turn')
 
-    async def set_player_active(self, player):
-        token = str(uuid4())
-
-        if self.turn_delay is not None:
-            await sleep(self.turn_delay)
-
-        await self.table.set_current_player(player, token)
-
-        timeout = ServerConfig.get('timeout')
-        if timeout:
-            get_event_loop().create_task(self.current_player_timeout(timeout, player, token))
-
-    async def current_player_timeout(self, timeout, player, token):
-        await sleep(timeout)
-        await self.kick_if_current_player(player, token, 'timeout')
-
-    async def kick_if_current_player(self, player, current_player_token, reason):
-        is_current_player = await self.table.check_and_unset_current_player(player.name, current_player_token)
-        if not is_current_player:
-            return
-
-        self.log(player, "Kicked due to: " + reason)
-        next_player = self.find_next_player(player)
-        if self.table.dealer.name == player.name:
-            await self.table.set_dealer(self.table.player_right_of(self.table.dealer))
-
-        await self.increment_stats_for_player(player)
-        await self.table.remove_player(player)
-
-        if len(self.table.players) > 1:
-            if next_player is None:
-                await self.next_round()
-            else:
-                await self.set_player_active(next_player)
-        else:
-            await self.close_table()
-
     async def join(self, player_name, position):
-        if self.table.is_closed:
-            raise ValueError('Table is closed')
-        if not self.table.is_position_valid(position):
-            raise ValueError('Invalid position')
-        if not self.table.is_position_free(position):
+        action = Join(player_name, position)
+        self.engine.validate(action)
+        try:
+            await self._run(self.engine.execute, action)
+        except DuplicateKeyError:
             raise PositionOccupiedError()
-        if self.table.is_player_at_table(player_name) or player_name in self.table.joined_players:
-            raise ValueError('Player has already joined')
 
+    async def join_all(self, positions):
+        """Join all players at their positions by name, all or none of them. The game starts when all are seated."""
+        if len(set(positions.values())) < len(positions):
+            raise PositionOccupiedError()
+        joins = [Join(player_name, position) for player_name, position in positions.items()]
+        for join in joins:
+            self.engine.validate(join)
         try:
-            await Player.sit_down(self.table, position, player_name, self.table.config.start_balance)
+            await self._run(self.engine.join_all, joins)
         except DuplicateKeyError:
             raise PositionOccupiedError()
 
-        player = await Player.load_by_name(player_name)
-        await self.table.add_player(player)
-
-        self.log(player_name, 'Joined table {} at {}'.format(self.table.name, position))
-
-        if self.table.is_waiting_for_players and len(self.table.players) == self.table.config.min_player_count:
-            await self.start()
-
     async def start(self, dealer=None):
-        await self.table.set_state(TableState.RUNNING_GAME)
-        if dealer is None:
-            dealer = random.choice(self.table.players)
-        await self.table.reset()
-        await self.start_hand(dealer)
+        await self._run(self.engine.start, dealer)
 
     async def start_hand(self, dealer):
-        assert len(self.table.players) >= 2
-        await self.table.set_dealer(dealer)
-        small_blind_player, big_blind_player = self.find_blind_players()
-        under_the_gun = self.find_start_player()
-        await self.pay_blinds(small_blind_player, big_blind_player)
-        await self.distribute_cards()
-        self.log(under_the_gun, "Started table {}".format(self.table.name))
-        await self.set_player_active(under_the_gun)
-
-    def find_blind_players(self):
-        """Returns blind players independent of the progress of a match.
-
-        Only players that are sitting out are ignored.
-        """
-        active_players = [player for player in self.table.players if player.state is not PlayerState.SITTING_OUT]
-        if len(active_players) == 2:
-            small_blind = self.table.dealer
-            big_blind = self.table.player_left_of(small_blind, player_filter=active_players)
-        else:
-            small_blind = self.table.player_left_of(self.table.dealer, player_filter=active_players)
-            big_blind = self.table.player_left_of(small_blind, player_filter=active_players)
-        return small_blind, big_blind
-
-    def find_start_player(self):
-        """Find first player from small blind on that is playing (not sitting out)."""
-        small_blind, big_blind = self.find_blind_players()
-        if len(self.table.players) == 2:
-            return small_blind if self.table.round == Round.PREFLOP else big_blind
-        return self.table.player_left_of(big_blind) if self.table.round == Round.PREFLOP else small_blind
-
-    def find_start_player_postflop(self):
-        """Find first player from small blind on that is still playing (not folded, all in or sitting out)."""
-        small_blind, big_blind = self.find_blind_players()
-        active_players = [player for player in self.table.players if player.state is PlayerState.PLAYING]
-        if len(active_players) == 2:
-            start_player = small_blind if self.table.round == Round.PREFLOP else big_blind
-        else:
-            start_player = self.table.player_left_of(big_blind) if self.table.round == Round.PREFLOP else small_blind
-        if start_player.state is not PlayerState.PLAYING:
-            start_player = self.table.player_left_of(start_player, player_filter=active_players)
-        return start_player
+        await self._run(self.engine.start_hand, dealer)
 
     async def pay_blinds(self, small_blind_player, big_blind_player):
-        assert small_blind_player in self.table.players
-        assert big_blind_player in self.table.players
-        await self.make_player_pay(small_blind_player, self.table.config.small_blind)
-        await self.make_player_pay(big_blind_player, self.table.config.big_blind)
+        await self._run(self.engine.pay_blinds, small_blind_player, big_blind_player)
 
     async def make_player_pay(self, player, amount):
-        assert amount > 0, 'amount to pay must be greater than 0'
-        paid_amount = amount if self.can_pay_amount(player, amount) else player.balance
-        await player.increase_bet(paid_amount)
-        await self.table.increase_pot(player.position, paid_amount)
-
-    @staticmethod
-    def can_pay_amount(player, amount):
-        return player.balance >= amount
+        await self._run(self.engine.make_player_pay, player, amount)
 
     async def distribute_cards(self):
-        cards = get_all_cards()
-        random.shuffle(cards)
-        for player in self.table.players:
-            await player.set_cards([cards.pop(), cards.pop()])
+        await self._run(self.engine.distribute_cards)
 
-        await self.table.set_cards(cards)
-
-    async def fold(self, player_name):
-        await self.check_and_unset_current_player(player_name)
-        player = self.table.find_player(player_name)
-        await player.fold()
-        await self.next_player_or_round(player)
-
-    async def next_player_or_round(self, current_player):
-        next_player = self.find_next_player(current_player)
-        if next_player is None:
-            await self.next_round()
-        else:
-            await self.set_player_active(next_player)
-
-    def find_next_player(self, current_player):
-        active_players = [
-            player for player in self.table.players
-            if player.state not in [PlayerState.FOLDED, PlayerState.SITTING_OUT]
-        ]
-
-        if len(active_players) <= 1:
-            return None
-
-        active_players_not_all_in = [
-            player for player in active_players
-            if player.position == current_player.position or player.state is not PlayerState.ALL_IN
-        ]
-
-        if not active_players_not_all_in:
-            return None
-
-        if len(active_players_not_all_in) == 1 and active_players_not_all_in[0].position == current_player.position:
-            return None
-
-        next_player = self.table.player_left_of(current_player, active_players_not_all_in)
-        if not self._may_make_another_turn(next_player, current_player):
-            return None
-        return next_player
-
-    async def reset_bets(self):
-        for player in self.table.players:
-            await player.set_bet(0)
+    async def set_player_active(self, player):
+        await self._run(self.engine.set_player_active, player)
 
     async def next_round(self):
-        await self.reset_bets()
-        active_players = [player for player in self.table.players if player.state is PlayerState.PLAYING]
-        all_in_players = [player for player in self.table.players if player.state is PlayerState.ALL_IN]
-
-        if len(active_players) < 2:
-            if all_in_players:
-                if self.table.round is Round.PREFLOP:
-                    await self.table.draw_cards(3)
-                if self.table.round is Round.FLOP:
-                    await self.table.draw_cards(1)
-                if self.table.round is Round.TURN:
-                    await self.table.draw_cards(1)
-            await self.finish_hand()
-            return
-
-        if self.table.round is Round.PREFLOP:
-            await self.table.draw_cards(3)
-        elif self.table.round in [Round.FLOP, Round.TURN]:
-            await self.table.draw_cards(1)
-        else:
-            await self.finish_hand()
-            return
-
-        next_player = self.find_start_player_postflop()
-        self.log(next_player, 'Starts new round')
-        await self.set_player_active(next_player)
+        await self._run(self.engine.next_round)
 
     async def finish_hand(self):
-        old_dealer = self.table.dealer
-        await self.distribute_pots()
-        if self.showdown_timeout:
-            await sleep(self.showdown_timeout)
-        await self.table.reset()
-
-        dealer = self.table.player_left_of(old_dealer)
-        while len(self.table.players) > 1:
-            bankrupt_players = self.find_bankrupt_players()
-            if not bankrupt_players:
-                break
-
-            for player in bankrupt_players:
-                self.log(player, 'leaves the game')
-                await self.increment_stats_for_player(player)
-                await self.table.remove_player(player)
-            if dealer in bankrupt_players:
-                dealer = self.table.player_left_of(dealer)
-
-        if len(self.table.players) > 1:
-            await self.start_hand(dealer)
-        else:
-            await self.close_table()
-
-    async def distribute_pots(self):
-        active_players = self.table.active_players()
-
-        for pot in self.table.pots:
-            active_players_for_pot = [player for player in active_players if player.position in pot.bets.keys()]
-            await self.distribute_pot(pot, active_players_for_pot)
-
-    async def distribute_pot(self, pot, players):
-        winning_players = determine_winning_players(players, self.table.open_cards) if len(players) > 1 else players
-
-        for player in winning_players:
-            await player.increase_balance(pot.amount // len(winning_players))
-
-        rest = pot.amount % len(winning_players)
-        if rest != 0:
-            player = self.table.player_left_of(self.table.dealer, player_filter=players)
-            await player.increase_balance(rest)
-
-    def find_bankrupt_players(self):
-        return [player for player in self.table.players if player.balance == 0]
+        await self._run(self.engine.finish_hand)
 
     async def close_table(self):
-        self.log('', 'Closing table {}'.format(self.table.table_id))
-        await gather(*[self.increment_stats_for_player(player) for player in self.table.players])
-        await self.table.close()
+        await self._run(self.engine.close_table)
 
-    async def increment_stats_for_player(self, player):
-        await Statistics.increment_statistics(
-            player.name, matches=1, buy_in=self.table.config.start_balance, gain=player.balance)
+    async def fold(self, player_name):
+        await self._run_turn(Fold(player_name))
 
     async def call(self, player_name):
-        player = self.table.find_player(player_name)
-        highest_bet = self._get_highest_bet()
-        if highest_bet <= player.bet:
-            raise InvalidTurnError('Cannot call without higher bet, use \'check\' instead')
-
-        await self.check_and_unset_current_player(player_name)
-        await self.make_player_pay(player, highest_bet - player.bet)
-        await self.next_player_or_round(player)
+        await self._run_turn(Call(player_name))
 
     async def check(self, player_name):
-        player = self.table.find_player(player_name)
-        if self._get_highest_bet() > player.bet:
-            raise InvalidTurnError('Cannot check after a higher bet was made')
-        await self.check_and_unset_current_player(player_name)
-        await self.next_player_or_round(player)
+        await self._run_turn(Check(player_name))
 
     async def raise_bet(self, player_name, amount):
-        player = self.table.find_player(player_name)
-        highest_bet = self._get_highest_bet()
-        if amount <= highest_bet - player.bet:
-            raise InvalidBetError('Amount too low')
-        if amount > player.balance:
-            raise InsufficientBalanceError('Balance too low')
-        await self.check_and_unset_current_player(player_name)
-        await self.make_player_pay(player, amount)
-        await self.next_player_or_round(player)
-
-    def _get_highest_bet(self):
-        return max([0] + [p.bet for p in self.table.players if p.bet is not None])
-
-    def _may_make_another_turn(self, player, current_player):
-        has_highest_bet = player.bet == self._get_highest_bet()
-        if not has_highest_bet:
-            return True
-        elif player.bet > self._get_initial_bet(player):
-            return False
-        else:
-            start_player = self.find_start_player()
-            has_made_turn = player.position in self.table.player_positions_between(
-                start_player.position, current_player.position)
-            return not has_made_turn
+        await self._run_turn(Raise(player_name, amount))
+
+    async def kick_if_current_player(self, player, current_player_token, reason):
+        is_current_player = await self.table.check_and_unset_current_player(player.name, current_player_token)
+        if is_current_player:
+            await self._run(
+                self.engine.execute, Kick(player.name, current_player_token, reason),
+                finished_timer=TimersRelation.TURN_TIMEOUT
+            )
 
-    def _get_initial_bet(self, player):
-        if self.table.round is not Round.PREFLOP:
-            return 0
+    def find_blind_players(self):
+        return self.engine.find_blind_players()
 
-        small_blind_player, big_blind_player = self.find_blind_players()
+    def find_start_player(self):
+        return self.engine.find_start_player()
 
-        if player.position == small_blind_player.position:
-            return self.table.config.small_blind
-        elif player.position == big_blind_player.position:
-            return self.table.config.big_blind
-        else:
-            return 0
+    def find_start_player_postflop(self):
+        return self.engine.find_start_player_postflop()
+
+    def find_next_player(self, current_player):
+        return self.engine.find_next_player(current_player)
+
+    def find_bankrupt_players(self):
+        return self.engine.find_bankrupt_players()
 
     @staticmethod
-    def log(player_or_name, message):
-        LOG.info('[%s] %s', str(player_or_name), message)
+    def can_pay_amount(player, amount):
+        return MatchEngine.can_pay_amount(player, amount)
+
+    async def _run_turn(self, action):
+        """Validate first, then atomically check the turn in the database so that no turn is played twice."""
+        self.engine.validate(action)
+        await self.check_and_unset_current_player(action.player_name)
+        TimerWheel.instance().cancel(self.table.table_id)
+        await self._run(self.engine.execute, action, finished_timer=TimersRelation.TURN_TIMEOUT)
+
+    async def _run(self, operation, *args, finished_timer=None):
+        operation(*args)
+        effects = self.engine.take_effects()
+        await self.persist(effects, finished_timer)
+
+        for effect in effects:
+            if isinstance(effect, TurnStarted):
+                self._start_timeout(effect)
+            elif isinstance(effect, Scheduled):
+                self._schedule(effect)
+
+    def _schedule(self, scheduled):
+        """Continue the game in the background so that the request which caused the delay can return right away."""
+        self._register_scheduled(scheduled.action, scheduled.delay)
+
+    def _register_scheduled(self, action, delay):
+        TimerWheel.instance().register(
+            scheduled_key(self.table.table_id), delay,
+            partial(self.run_scheduled, self.table.table_id, action, self.turn_delay, self.showdown_timeout)
+        )
+
+    @classmethod
+    async def run_scheduled(cls, table_id, action, turn_delay=None, showdown_timeout=None):
+        """Run a scheduled action on the table as it is now, players may have joined or left during the delay."""
+        try:
+            table = await Table.load_by_id(table_id)
+        except TableNotFoundError:
+            LOG.warning('Table %s of scheduled action was removed', table_id)
+            return
+        match = cls(table, turn_delay, showdown_timeout)
+        try:
+            await match._run(match.engine.execute, action, finished_timer=TimersRelation.SCHEDULED)
+        except ValueError as error:
+            LOG.warning('Scheduled action at table %s failed: %s', table.name, error)
+            await match.persist([], finished_timer=TimersRelation.SCHEDULED)
+
+    def _start_timeout(self, turn_started):
+        """Kick the player unless they act in time. Replaces the timer of the previous turn at this table."""
+        timeout = ServerConfig.get('timeout')
+        if timeout:
+            player = self.table.find_player(turn_started.player_name)
+            self._register_timeout(player, turn_started.token, timeout)
+
+    def _register_timeout(self, player, token, delay):
+        TimerWheel.instance().register(
+            self.table.table_id, delay, partial(self.kick_if_current_player, player, token, 'timeout'))
+
+    def rearm(self, timer, delay):
+        """Register a timer loaded from the timers relation again, e.g. after a restart."""
+        if timer['kind'] == TimersRelation.TURN_TIMEOUT:
+            try:
+                player = self.table.find_player(timer['player_name'])
+            except ValueError:
+                LOG.warning('Player %s of turn timeout has left table %s', timer['player_name'], self.table.name)
+                return
+            self._register_timeout(player, timer['token'], delay)
+        else:
+            self._register_scheduled(decode_scheduled_action(timer['action'], timer['player_name']), delay)
+
+    async def persist(self, effects, finished_timer=None):
+        now = time()
+        statements = collect_statements(self.table.table_id, effects) + collect_timer_statements(
+            self.table.table_id, effects, ServerConfig.get('timeout'), now, finished_timer
+        ) + collect_event_statements(self.table, effects) + await collect_history_statements(
+            self.table.table_id, effects, now)
+        # The statistics of a finished hand are written in the same batch as the hand itself.
+        increments = [effect for effect in effects if isinstance(effect, StatisticsIncremented)]
+        if statements or increments:
+            await Statistics.execute_batch(statements, increments)
+            version = TableVersions.instance().bump(self.table.name)
+            TableFeed.instance().publish(self.table.name, version, effects)
+        PlayerStatsAggregator.instance().observe(self.table.table_id, effects)
+
+
+def scheduled_key(table_id):
+    """Key of the pending continuation of a table in the timer wheel, next to the turn timeout keyed by table id."""
+    return 'scheduled', table_id
+
+
+def encode_scheduled_action(action):
+    if isinstance(action, ActivatePlayer):
+        return ACTIVATE_PLAYER_ACTION, action.player_name
+    assert isinstance(action, StartNextHand), 'Cannot store {}'.format(action)
+    return START_NEXT_HAND_ACTION, None
+
+
+def decode_scheduled_action(name, player_name):
+    if name == ACTIVATE_PLAYER_ACTION:
+        return ActivatePlayer(player_name)
+    assert name == START_NEXT_HAND_ACTION, 'Unknown scheduled action: {}'.format(name)
+    return StartNextHand()
+
+
+# pylint: disable=too-many-arguments
+def collect_timer_statements(table_id, effects, timeout, now, finished_timer=None):
+    """Translate effects into statements that keep the timers relation in line with the timer wheel.
+
+    `finished_timer` is the kind of timer whose deadline was met by the action that caused the effects. Only the last
+    statement per kind of timer is kept. Closing the table removes all of its timers.
+    """
+    statements = OrderedDict()
+    if finished_timer is not None:
+        statements[finished_timer] = TimersRelation.delete_statement(table_id, finished_timer)
+    for effect in effects:
+        if isinstance(effect, TurnStarted) and timeout:
+            statements[TimersRelation.TURN_TIMEOUT] = TimersRelation.set_statement(
+                table_id, TimersRelation.TURN_TIMEOUT, now + timeout, KICK_ACTION, effect.player_name, effect.token)
+        elif isinstance(effect, Scheduled):
+            action, player_name = encode_scheduled_action(effect.action)
+            statements[TimersRelation.SCHEDULED] = TimersRelation.set_statement(
+                table_id, TimersRelation.SCHEDULED, now + effect.delay, action, player_name)
+        elif isinstance(effect, TableUpdated) and effect.fields.get('state') is TableState.CLOSED:
+            statements = OrderedDict([(None, TimersRelation.delete_by_table_statement(table_id))])
+    return list(statements.values())
+
+
+async def recover_timers(turn_delay=None, showdown_timeout=None):
+    """Re-arm the persisted timers of all running games, e.g. after a restart, the earliest deadline first.
+
+    Deadlines that passed while the server was down fire right away. Running games waiting for a player without a
+    turn timeout, e.g. from before timers were persisted or because the timeout was just enabled, get one with the
+    configured timeout. Returns the number of timers armed.
+    """
+    now = time()
+    matches = {}
+    timers = await TimersRelation.load_running()
+    for timer in timers:
+        match = matches.get(timer['table_id'])
+        if match is None:
+            table = await Table.load_by_id(timer['table_id'])
+            match = matches[timer['table_id']] = Match(table, turn_delay, showdown_timeout)
+        match.rearm(timer, max(0, timer['deadline'] - now))
+
+    armed = len(timers)
+    timeout = ServerConfig.get('timeout')
+    if not timeout:
+        return armed
+    timed_tables = {timer['table_id'] for timer in timers if timer['kind'] == TimersRelation.TURN_TIMEOUT}
+    for table in await Table.load_all():
+        waiting = table.state is TableState.RUNNING_GAME and table.current_player is not None
+        if not waiting or table.table_id in timed_tables:
+            continue
+        # `load_all` keeps the current player as a name.
+        table = await Table.load_by_id(table.table_id)
+        match = Match(table, turn_delay, showdown_timeout)
+        await TimersRelation.set_timer(
+            table.table_id, TimersRelation.TURN_TIMEOUT, now + timeout, KICK_ACTION, table.current_player.name,
+            table.current_player_token
+        )
+        match.rearm({
+            'kind': TimersRelation.TURN_TIMEOUT, 'player_name': table.current_player.name,
+            'token': table.current_player_token
+        }, timeout)
+        armed += 1
+    return armed
+
+
+def collect_statements(table_id, effects):
+    """Translate effects into database statements.
+
+    Inserts and deletes keep their order. All updates of a player or of the table are merged into one statement
+    per row, which is executed after the inserts.
+    """
+    statements = []
+    player_fields = OrderedDict()
+    table_fields = {}
+    for effect in effects:
+        if isinstance(effect, PlayerJoined):
+            statements.append(PlayersRelation.insert_statement(**effect.row))
+            statements.append(TablesRelation.add_joined_player_statement(table_id, effect.row['name']))
+        elif isinstance(effect, PlayerUpdated):
+            player_fields.setdefault(effect.name, {}).update(effect.fields)
+        elif isinstance(effect, PlayerRemoved):
+            player_fields.pop(effect.name, None)
+            statements.append(PlayersRelation.delete_statement(table_id, effect.position))
+        elif isinstance(effect, TableUpdated):
+            table_fields.update(effect.fields)
+
+    statements += [
+        PlayersRelation.update_statement(name, table_id, fields) for name, fields in player_fields.items()
+    ]
+    if table_fields:
+        statements.append(TablesRelation.update_statement(table_id, table_fields))
+    return statements
@@ -0,0 +1,55 @@
+from asyncio import Lock
+
+from pokerserver.database import TableState
+from .table import Table, TableNotFoundError
+from .table_index import TableIndex, filter_infos
+
+
+class Matchmaker:
+    """Seats players at the first open table with enough free seats.
+
+    Joins of a table hold its `table_lock`, so a free seat is never given to two players while requests for other
+    tables run concurrently. A group is seated with a single `Match.join_all`, so it is seated completely or not at all.
+    """
+    _instance = None
+
+    def __init__(self):
+        self._locks = {}
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def clear(cls):
+        cls._instance = None
+
+    def table_lock(self, table_name):
+        """The lock to hold while loading and joining the table."""
+        if table_name not in self._locks:
+            self._locks[table_name] = Lock()
+        return self._locks[table_name]
+
+    async def seat(self, player_names, create_match):
+        """Join all players at one table, `create_match(table)` returns the `Match` to join with.
+
+        Returns the table name and the positions by player name, or `(None, {})` if no table has room for all.
+        """
+        for info in filter_infos(await TableIndex.instance().infos(), min_free_seats=len(player_names)):
+            if info['state'] == TableState.CLOSED.value:
+                continue
+            async with self.table_lock(info['name']):
+                try:
+                    table = await Table.load_by_name(info['name'])
+                except TableNotFoundError:
+                    continue
+                positions = [position for position in range(1, table.config.max_player_count + 1)
+                             if table.is_position_free(position)]
+                if len(positions) < len(player_names) or not all(table.can_join(name) for name in player_names):
+                    continue
+                seats = dict(zip(player_names, positions))
+                await create_match(table).join_all(seats)
+                return table.name, seats
+        return None, {}
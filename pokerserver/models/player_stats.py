@@ -0,0 +1,114 @@
+from collections import Counter, defaultdict
+
+from pokerserver.database import Database, PlayerStatsRelation
+from .engine import HandFinished, TableEvent
+
+
+class _Hand:
+    __slots__ = ('players', 'folded', 'voluntary', 'raised', 'winners', 'open_cards')
+
+    def __init__(self, players):
+        self.players = players
+        self.folded = set()
+        self.voluntary = set()
+        self.raised = set()
+        self.winners = set()
+        self.open_cards = 0
+
+
+class PlayerStatsAggregator:
+    """Counts VPIP, PFR and showdowns per player from the events of the hands `Match` persists.
+
+    Counters are kept in memory and added to the player_stats relation by `flush` in one transaction, so playing
+    causes no additional queries. Hands that were running when the server started are not counted.
+    """
+    _instance = None
+
+    def __init__(self):
+        self._hands = {}
+        self._pending = defaultdict(Counter)
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def clear(cls):
+        cls._instance = None
+
+    def observe(self, table_id, effects):
+        for effect in effects:
+            if isinstance(effect, TableEvent):
+                self._observe_event(table_id, effect)
+            elif isinstance(effect, HandFinished):
+                self._finish_hand(table_id)
+
+    def pending(self, player_name):
+        """Counters of a player not flushed yet."""
+        return dict(self._pending.get(player_name, {}))
+
+    async def flush(self):
+        """Add the pending counters to the database. Returns the number of players updated."""
+        pending, self._pending = self._pending, defaultdict(Counter)
+        statements = [
+            statement for player_name, counters in pending.items()
+            for statement in PlayerStatsRelation.increment_statements(player_name, counters)
+        ]
+        if not statements:
+            return 0
+        try:
+            await Database.instance().execute_batch(statements)
+        except Exception:
+            for player_name, counters in pending.items():
+                self._pending[player_name].update(counters)
+            raise
+        return len(pending)
+
+    def _observe_event(self, table_id, event):
+        if event.type == 'hand':
+            self._hands[table_id] = _Hand([player['name'] for player in event.data['players']])
+            return
+        hand = self._hands.get(table_id)
+        if hand is None:
+            return
+        if event.type == 'bet' and hand.open_cards == 0:
+            hand.voluntary.add(event.data['player'])
+            if event.data['action'] == 'raise':
+                hand.raised.add(event.data['player'])
+        elif event.type in ('fold', 'kick'):
+            hand.folded.add(event.data['player'])
+        elif event.type == 'draw':
+            hand.open_cards += len(event.data['cards'])
+        elif event.type == 'payout':
+            hand.winners.add(event.data['player'])
+        elif event.type == 'close':
+            del self._hands[table_id]
+
+    def _finish_hand(self, table_id):
+        hand = self._hands.pop(table_id, None)
+        if hand is None:
+            return
+        showdown_players = [player for player in hand.players if player not in hand.folded]
+        if len(showdown_players) < 2:
+            showdown_players = []
+        for player in hand.players:
+            counters = self._pending[player]
+            counters['hands'] += 1
+            counters['vpip_hands'] += player in hand.voluntary
+            counters['pfr_hands'] += player in hand.raised
+            counters['showdowns'] += player in showdown_players
+            counters['showdown_wins'] += player in showdown_players and player in hand.winners
+
+
+def to_rates(counters):
+    """Add VPIP, PFR and the showdown win rate to the counters of a player."""
+    hands = counters.get('hands', 0)
+    showdowns = counters.get('showdowns', 0)
+    return dict(
+        counters,
+        vpip=counters.get('vpip_hands', 0) / hands if hands else 0.0,
+        pfr=counters.get('pfr_hands', 0) / hands if hands else 0.0,
+        showdown_win_rate=counters.get('showdown_wins', 0) / showdowns if showdowns else 0.0
+    )
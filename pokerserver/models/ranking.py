@@ -1,7 +1,19 @@
 from collections import Counter
 from functools import partial
 
-from .card import parse_card, MAX_RANK, MIN_RANK
+from .card import RANKS, SUITS, parse_card, MAX_RANK, MIN_RANK
+
+CATEGORY_NAMES = [
+    'high card',
+    'pair',
+    'two pairs',
+    'three of a kind',
+    'straight',
+    'flush',
+    'full house',
+    'four of a kind',
+    'straight flush'
+]
 
 
 def find_high_card(cards):
@@ -63,7 +75,9 @@ def _find_flush_cards(cards):
 
 def find_full_house(cards):
     counter = Counter(card.rank for card in cards)
-    if 3 in counter.values() and 2 in counter.values():
+    counts = sorted(counter.values(), reverse=True)
+    # Two triples (e.g. with seven cards) make a full house, too.
+    if len(counts) >= 2 and counts[0] >= 3 and counts[1] >= 2:
         return sort_counter(counter)
     return None
 
@@ -110,7 +124,98 @@ def rank(cards_strings):
     # the last ranking function never returns None
 
 
+# Each suit is represented by a bit mask with bit <rank> set for every card of that suit.
+# The masks of several card sets can simply be or-ed, which allows to evaluate hands incrementally.
+CARD_BITS = {
+    rank_string + suit: (suit_index, 1 << rank_value)
+    for rank_string, rank_value in RANKS.items()
+    for suit_index, suit in enumerate(SUITS)
+}
+
+EMPTY_SUIT_MASKS = (0, 0, 0, 0)
+
+_LOW_ACE_BIT = 1 << (MIN_RANK - 1)
+
+
+def to_suit_masks(cards_strings):
+    masks = [0, 0, 0, 0]
+    for card in cards_strings:
+        suit_index, bit = CARD_BITS[card]
+        masks[suit_index] |= bit
+    return tuple(masks)
+
+
+def combine_suit_masks(masks1, masks2):
+    return masks1[0] | masks2[0], masks1[1] | masks2[1], masks1[2] | masks2[2], masks1[3] | masks2[3]
+
+
+def rank_suit_masks(suit_masks):
+    """Bit mask based equivalent of `rank`. Returns exactly the same rankings as `rank` for valid hands."""
+    # pylint: disable=invalid-name, too-many-return-statements
+    s, h, d, c = suit_masks
+    any_mask = s | h | d | c
+    pairs = (s & h) | (s & d) | (s & c) | (h & d) | (h & c) | (d & c)
+    triples = (s & h & d) | (s & h & c) | (s & d & c) | (h & d & c)
+    quads = s & h & d & c
+
+    flush = 0
+    for mask in suit_masks:
+        if bin(mask).count('1') >= 5:
+            flush = mask
+            break
+
+    if flush:
+        straight_flush = _find_straight_in_mask(flush)
+        if straight_flush is not None:
+            return 8, straight_flush
+    if quads:
+        quad = quads.bit_length() - 1
+        return 7, [quad] + _highest_ranks(any_mask & ~(1 << quad), 1)
+    if triples:
+        triple = triples.bit_length() - 1
+        other_pairs = pairs & ~(1 << triple)
+        if other_pairs:
+            return 6, [triple, other_pairs.bit_length() - 1]
+    if flush:
+        return 5, _highest_ranks(flush, 5)
+    straight = _find_straight_in_mask(any_mask)
+    if straight is not None:
+        return 4, straight
+    if triples:
+        return 3, [triple] + _highest_ranks(any_mask & ~(1 << triple), 2)
+    if pairs:
+        pair1 = pairs.bit_length() - 1
+        other_pairs = pairs & ~(1 << pair1)
+        if other_pairs:
+            pair2 = other_pairs.bit_length() - 1
+            return 2, [pair1, pair2] + _highest_ranks(any_mask & ~(1 << pair1) & ~(1 << pair2), 1)
+        return 1, [pair1] + _highest_ranks(any_mask & ~(1 << pair1), 3)
+    return 0, _highest_ranks(any_mask, 5)
+
+
+def _find_straight_in_mask(mask):
+    if mask & (1 << MAX_RANK):
+        mask |= _LOW_ACE_BIT  # ace can be used at top and bottom
+    straights = mask & (mask >> 1) & (mask >> 2) & (mask >> 3) & (mask >> 4)
+    if straights:
+        return straights.bit_length() - 1 + 4
+    return None
+
+
+def _highest_ranks(mask, number):
+    ranks = []
+    while mask and len(ranks) < number:
+        highest_rank = mask.bit_length() - 1
+        ranks.append(highest_rank)
+        mask ^= 1 << highest_rank
+    return ranks
+
+
+def evaluate(cards_strings):
+    return rank_suit_masks(to_suit_masks(cards_strings))
+
+
 def determine_winning_players(active_players, open_cards):
-    ranks = {player: rank(player.cards + open_cards) for player in active_players}
+    ranks = {player: evaluate(player.cards + open_cards) for player in active_players}
     max_rank = max(ranks.values())
     return [player for player in active_players if ranks[player] == max_rank]
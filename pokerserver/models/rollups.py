@@ -0,0 +1,74 @@
+"""Statistics of recent time windows, e.g. the gain per player in the last hour.
+
+Every statistics increment is added to the per player bucket of the current minute. `downsample_rollups`
+periodically moves minute buckets older than two hours into hour buckets and hour buckets older than two days into day
+buckets, so each increment is in exactly one bucket and the number of buckets stays small. A window is summed up from
+the buckets of each resolution, which takes time proportional to the number of buckets in the window.
+"""
+from collections import namedtuple
+
+from pokerserver.database import Database, StatisticsRollupsRelation
+
+Resolution = namedtuple('Resolution', 'name seconds retention')
+
+# From fine to coarse. Buckets older than the retention are moved into the next resolution.
+RESOLUTIONS = [
+    Resolution('minute', 60, 2 * 60 * 60),
+    Resolution('hour', 60 * 60, 2 * 24 * 60 * 60),
+    Resolution('day', 24 * 60 * 60, None)
+]
+
+WINDOWS = {resolution.name: resolution.seconds for resolution in RESOLUTIONS}
+
+
+def bucket_start(timestamp, seconds):
+    return int(timestamp // seconds * seconds)
+
+
+def increment_statements(player_name, matches, buy_in, gain, now):
+    finest = RESOLUTIONS[0]
+    return StatisticsRollupsRelation.increment_statements(
+        finest.seconds, bucket_start(now, finest.seconds), player_name, matches, buy_in, gain)
+
+
+async def downsample_rollups(now):
+    """Move buckets past their retention into the next coarser resolution. Returns the number of buckets moved."""
+    moved = 0
+    for fine, coarse in zip(RESOLUTIONS, RESOLUTIONS[1:]):
+        # Only move complete coarse buckets, so recent coarse buckets do not overlap with fine ones.
+        cutoff = bucket_start(now - fine.retention, coarse.seconds)
+        buckets = await StatisticsRollupsRelation.load_before(fine.seconds, cutoff)
+        if not buckets:
+            continue
+        sums = {}
+        for bucket in buckets:
+            key = bucket_start(bucket['bucket_start'], coarse.seconds), bucket['player_name']
+            matches, buy_in, gain = sums.get(key, (0, 0, 0))
+            sums[key] = matches + bucket['matches'], buy_in + bucket['buy_in'], gain + bucket['gain']
+        statements = [
+            statement for (start, player_name), values in sorted(sums.items())
+            for statement in StatisticsRollupsRelation.increment_statements(coarse.seconds, start, player_name, *values)
+        ]
+        statements.append(StatisticsRollupsRelation.delete_before_statement(fine.seconds, cutoff))
+        await Database.instance().execute_batch(statements)
+        moved += len(buckets)
+    return moved
+
+
+async def load_statistics_window(window, now, player_name=None):
+    """Sum up the statistics of the last `window` seconds per player.
+
+    A bucket that contains the start of the window counts completely, i.e. the window is extended to the start of
+    that bucket.
+    """
+    start = now - window
+    totals = {}
+    for resolution in RESOLUTIONS:
+        sums = await StatisticsRollupsRelation.sum_since(
+            resolution.seconds, bucket_start(start, resolution.seconds), player_name)
+        for name, values in sums.items():
+            if name in totals:
+                totals[name] = {field: totals[name][field] + value for field, value in values.items()}
+            else:
+                totals[name] = values
+    return totals
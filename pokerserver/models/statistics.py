@@ -1,7 +1,18 @@
-from pokerserver.database import StatisticsRelation
+from asyncio import Condition
+from time import time
+
+from pokerserver.database import Database, StatisticsRelation
+from .leaderboard import Leaderboard
+from .rollups import increment_statements
 
 
 class Statistics:
+    # The leaderboard is loaded from the database once and then kept up to date by `increment_statistics`.
+    _leaderboard = None
+    _condition = None
+    _loading = False
+    _running_increments = 0
+
     def __init__(self, player_statistics):
         self.player_statistics = player_statistics
 
@@ -21,7 +32,83 @@ class Statistics:
 
     @classmethod
     async def increment_statistics(cls, player_name, matches, buy_in, gain):
-        await StatisticsRelation.increment_statistics(player_name, matches, buy_in, gain)
+        await cls.execute_batch([], [(player_name, matches, buy_in, gain)])
+
+    @classmethod
+    async def execute_batch(cls, statements, increments):
+        """Execute the statements and the increments `(player_name, matches, buy_in, gain)` in one batch.
+
+        The leaderboard is updated once the batch is committed.
+        """
+        now = time()
+        for player_name, matches, buy_in, gain in increments:
+            statements = statements + StatisticsRelation.increment_statements(player_name, matches, buy_in, gain)
+            statements += increment_statements(player_name, matches, buy_in, gain, now)
+        if not increments:
+            await Database.instance().execute_batch(statements)
+            return
+        condition = cls._get_condition()
+        # While the leaderboard is loaded no increment may be written: it could be counted twice otherwise.
+        async with condition:
+            await condition.wait_for(lambda: not cls._loading)
+            cls._running_increments += 1
+        try:
+            await Database.instance().execute_batch(statements)
+        except Exception:
+            async with condition:
+                cls._finish_increment()
+            raise
+        async with condition:
+            if cls._leaderboard is not None:
+                for player_name, matches, buy_in, gain in increments:
+                    statistics = cls._leaderboard.get(player_name) or PlayerStatistics(player_name, 0, 0, 0)
+                    cls._leaderboard.update(PlayerStatistics(
+                        player_name, statistics.matches + matches, statistics.buy_in + buy_in,
+                        statistics.gain + gain))
+            cls._finish_increment()
+
+    @classmethod
+    async def leaderboard(cls):
+        condition = cls._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: not cls._loading)
+            if cls._leaderboard is not None:
+                return cls._leaderboard
+            cls._loading = True
+            await condition.wait_for(lambda: cls._running_increments == 0)
+        try:
+            statistics = await cls.load()
+        except Exception:
+            async with condition:
+                cls._finish_loading()
+            raise
+        async with condition:
+            cls._leaderboard = Leaderboard(statistics.player_statistics)
+            cls._finish_loading()
+        return cls._leaderboard
+
+    @classmethod
+    def clear_leaderboard(cls):
+        cls._leaderboard = None
+        cls._condition = None
+        cls._loading = False
+        cls._running_increments = 0
+
+    @classmethod
+    def _finish_increment(cls):
+        cls._running_increments -= 1
+        cls._condition.notify_all()
+
+    @classmethod
+    def _finish_loading(cls):
+        cls._loading = False
+        cls._condition.notify_all()
+
+    @classmethod
+    def _get_condition(cls):
+        if cls._condition is None:
+            cls._condition = Condition()
+        return cls._condition
 
 
 class PlayerStatistics:
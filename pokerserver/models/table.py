@@ -4,6 +4,8 @@ from asyncio import gather
 
 from pokerserver.database import PlayerState, PlayersRelation, TableState, TablesRelation
 from .player import Player
+from .ranking import CATEGORY_NAMES, combine_suit_masks, rank_suit_masks, to_suit_masks
+from .table_versions import TableVersions
 
 
 class TableNotFoundError(Exception):
@@ -18,9 +20,50 @@ class Round(Enum):
     RIVER = 4
 
 
+ROUNDS_BY_OPEN_CARDS = {
+    0: Round.PREFLOP,
+    3: Round.FLOP,
+    4: Round.TURN,
+    5: Round.RIVER
+}
+
+
+class HandRankCache:
+    """Ranks of hole cards with the current open cards of each table.
+
+    Tables are loaded again for every request, so the ranks are kept in the process instead of on the `Table`.
+    Only the latest board of a table is kept, ranks of earlier streets are dropped when the board changes.
+    """
+    _instance = None
+
+    def __init__(self):
+        self._boards = {}
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def clear(cls):
+        cls._instance = None
+
+    def get(self, table_id, board, hole_cards):
+        cached_board, ranks = self._boards.get(table_id, (None, {}))
+        return ranks.get(hole_cards) if cached_board == board else None
+
+    def put(self, table_id, board, hole_cards, hand_rank):
+        cached_board, ranks = self._boards.get(table_id, (None, {}))
+        if cached_board != board:
+            ranks = {}
+            self._boards[table_id] = (board, ranks)
+        ranks[hole_cards] = hand_rank
+
+
 # pylint: disable=too-many-instance-attributes, too-many-public-methods
 class Table:
-    # pylint: disable=too-many-arguments, too-many-locals, unused-argument
+    # pylint: disable=too-many-arguments, too-many-locals
     def __init__(self, table_id, name, config, players=None, remaining_deck=None,
                  open_cards=None, pots=None, current_player=None, current_player_token=None,
                  dealer=None, state=TableState.WAITING_FOR_PLAYERS, joined_players=None):
@@ -32,6 +75,7 @@ class Table:
         self.open_cards = open_cards or []
         self.pots = [Pot(**pot) for pot in pots] if pots else [Pot()]
         self.current_player = current_player
+        self.current_player_token = current_player_token
         self.dealer = dealer
         self.state = state
         self.joined_players = joined_players or []
@@ -52,7 +96,17 @@ class Table:
         table_data = await TablesRelation.load_table_by_name(name)
         if table_data is None:
             raise TableNotFoundError()
+        return await cls._load_with_players(table_data)
+
+    @classmethod
+    async def load_by_id(cls, table_id):
+        table_data = await TablesRelation.load_table_by_id(table_id)
+        if table_data is None:
+            raise TableNotFoundError()
+        return await cls._load_with_players(table_data)
 
+    @classmethod
+    async def _load_with_players(cls, table_data):
         players = await Player.load_by_table_id(table_data['table_id'])
         for player_attribute in ['dealer', 'current_player']:
             if table_data[player_attribute] is not None:
@@ -73,16 +127,21 @@ class Table:
                 pots=[Pot().to_dict()], current_player=None, current_player_token=None, dealer=None,
                 state=TableState.WAITING_FOR_PLAYERS, joined_players=None
             )
+            TableVersions.instance().bump(table_name)
 
     def to_dict(self, player_name):
-        player_names = {player.name for player in self.players}
-        can_join = (
-            player_name not in player_names and
-            player_name not in self.joined_players and
-            len(self.players) < self.config.max_player_count
+        result = dict(
+            self.public_dict(),
+            players=[self.player_to_dict(player, player_name) for player in self.players],
+            can_join=self.can_join(player_name)
         )
-        result = {
-            'players': [player.to_dict(show_cards=player_name == player.name) for player in self.players],
+        if self.current_player is not None and self.current_player.name == player_name:
+            result['turn'] = self.turn_options(self.current_player)
+        return result
+
+    def public_dict(self):
+        """The fields of `to_dict` which are the same for all viewers."""
+        return {
             'small_blind': self.config.small_blind,
             'big_blind': self.config.big_blind,
             'round': self.round.name.lower(),
@@ -90,10 +149,43 @@ class Table:
             'pots': [pot.to_dict() for pot in self.pots],
             'current_player': self.current_player.name if self.current_player else None,
             'dealer': self.dealer.name if self.dealer else None,
-            'state': self.state.value,
-            'can_join': can_join
+            'state': self.state.value
         }
 
+    def can_join(self, player_name):
+        return (
+            player_name not in {player.name for player in self.players} and
+            player_name not in self.joined_players and
+            len(self.players) < self.config.max_player_count
+        )
+
+    def highest_bet(self):
+        return max([0] + [player.bet for player in self.players if player.bet is not None])
+
+    def turn_options(self, player):
+        """The actions the player may take and their amounts, as accepted by `MatchEngine.validate`.
+
+        A raise is the amount the player adds to the bet, so it must exceed `call_amount`. A call pays at most the
+        balance of the player.
+        """
+        to_call = self.highest_bet() - player.bet
+        options = {
+            'actions': ['fold', 'call' if to_call > 0 else 'check'],
+            'call_amount': max(0, min(to_call, player.balance)),
+            'min_raise': None,
+            'max_raise': None
+        }
+        if player.balance > max(to_call, 0):
+            options['actions'].append('raise')
+            options['min_raise'] = max(to_call, 0) + 1
+            options['max_raise'] = player.balance
+        return options
+
+    def player_to_dict(self, player, player_name):
+        is_viewer = player_name == player.name
+        result = player.to_dict(show_cards=is_viewer)
+        if is_viewer and player.cards:
+            result['hand'] = self.hand_category(player)
         return result
 
     def to_dict_for_info(self):
@@ -105,14 +197,42 @@ class Table:
             'state': self.state.value
         }
 
+    @property
+    def open_cards(self):
+        return self._open_cards
+
+    @open_cards.setter
+    def open_cards(self, open_cards):
+        self._open_cards = open_cards
+        self.board_masks = to_suit_masks(open_cards)
+
+    def hand_rank(self, player):
+        """Rank of the player's best hand with the current open cards, see `rank`.
+
+        Ranks are cached in the process per table and board, see `HandRankCache`, so evaluating a hand at the
+        showdown is a dictionary lookup if it has already been evaluated for the river by an earlier request.
+        """
+        cache = HandRankCache.instance()
+        board, hole_cards = tuple(self.open_cards), tuple(player.cards)
+        hand_rank = cache.get(self.table_id, board, hole_cards)
+        if hand_rank is None:
+            hand_rank = rank_suit_masks(combine_suit_masks(to_suit_masks(hole_cards), self.board_masks))
+            cache.put(self.table_id, board, hole_cards, hand_rank)
+        return hand_rank
+
+    def hand_category(self, player):
+        if not player.cards:
+            return None
+        return CATEGORY_NAMES[self.hand_rank(player)[0]]
+
+    def determine_winning_players(self, players):
+        ranks = {player: self.hand_rank(player) for player in players}
+        max_rank = max(ranks.values())
+        return [player for player in players if ranks[player] == max_rank]
+
     @property
     def round(self):
-        return {
-            0: Round.PREFLOP,
-            3: Round.FLOP,
-            4: Round.TURN,
-            5: Round.RIVER
-        }[len(self.open_cards)]
+        return ROUNDS_BY_OPEN_CARDS[len(self.open_cards)]
 
     def is_free(self):
         return len(self.players) < self.config.max_player_count
@@ -199,6 +319,7 @@ class Table:
         assert current_player.state not in [PlayerState.FOLDED, PlayerState.SITTING_OUT]
         player_name = current_player.name if current_player else None
         self.current_player = self.find_player(player_name)
+        self.current_player_token = token
         await TablesRelation.set_current_player(self.table_id, player_name, token)
 
     async def set_cards(self, remaining_deck=None, open_cards=None):
@@ -215,13 +336,21 @@ class Table:
             self.table_id, player_name, token)
         if is_current_player:
             self.current_player = None
+            self.current_player_token = None
         return is_current_player
 
-    async def clear_pots(self):
+    def clear_pot_bets(self):
         self.pots = [Pot()]
+
+    async def clear_pots(self):
+        self.clear_pot_bets()
         await self._set_pots()
 
     async def increase_pot(self, position, bet):
+        self.add_to_pot(position, bet)
+        await self._set_pots()
+
+    def add_to_pot(self, position, bet):
         for index, pot in enumerate(self.pots.copy()):
             existing_bet = pot.bet(position)
             max_bet = pot.max_bet if pot.max_bet > 0 else bet
@@ -240,7 +369,6 @@ class Table:
             if self.has_all_in_players(self.pots[-1], position):
                 self.pots += [Pot()]
             self.pots[-1].add_bet(position, bet)
-        await self._set_pots()
 
     def has_all_in_players(self, pot, excluded_position):
         all_in_positions = {
@@ -262,10 +390,21 @@ class Table:
         await PlayersRelation.delete_player(self.table_id, player.position)
 
     async def draw_cards(self, number):
+        self.reveal_cards(number)
+        await TablesRelation.set_cards(self.table_id, self.remaining_deck, self.open_cards)
+
+    def reveal_cards(self, number):
         assert number <= len(self.remaining_deck)
         self.remaining_deck, cards = self.remaining_deck[:-number], self.remaining_deck[-number:]
-        self.open_cards.extend(cards)
-        await TablesRelation.set_cards(self.table_id, self.remaining_deck, self.open_cards)
+        self._open_cards.extend(cards)
+        self.board_masks = combine_suit_masks(self.board_masks, to_suit_masks(cards))
+        self._update_hand_ranks()
+        return cards
+
+    def _update_hand_ranks(self):
+        for player in self.active_players():
+            if player.cards:
+                self.hand_rank(player)
 
     async def reset(self):
         await self.set_cards([], [])
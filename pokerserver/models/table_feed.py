@@ -0,0 +1,69 @@
+"""Push the events of tables to subscribers, e.g. the WebSocket connections of bots.
+
+`Match` publishes the `TableEvent`s of every change it persisted together with the new table version. Subscribers
+are called synchronously and must not block; connections queue the messages and send them on their own.
+"""
+import logging
+
+from .engine import TableEvent
+
+LOG = logging.getLogger(__name__)
+
+
+class TableFeed:
+    _instance = None
+
+    def __init__(self):
+        self._subscribers = {}
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def clear(cls):
+        cls._instance = None
+
+    def subscribe(self, table_name, callback):
+        """Call `callback(version, events)` for every change of the table until unsubscribed."""
+        self._subscribers.setdefault(table_name, []).append(callback)
+
+    def unsubscribe(self, table_name, callback):
+        callbacks = self._subscribers.get(table_name, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._subscribers[table_name]
+
+    def subscriber_count(self, table_name):
+        return len(self._subscribers.get(table_name, []))
+
+    def publish(self, table_name, version, effects):
+        events = [effect for effect in effects if isinstance(effect, TableEvent)]
+        if not events:
+            return
+        # Copy, callbacks may unsubscribe.
+        for callback in list(self._subscribers.get(table_name, [])):
+            try:
+                callback(version, events)
+            except Exception:  # pylint: disable=broad-except
+                LOG.exception('Subscriber of table %s failed', table_name)
+
+
+def events_for_viewer(events, player_name=None):
+    """Encode events as dicts without what `player_name` must not see: other players' cards, the deck and the turn
+    tokens of other players. The turn of the viewer is followed by a 'your_turn' event with its token.
+    """
+    encoded = []
+    for event in events:
+        data = event.data
+        if event.type == 'deal':
+            data = {'cards': {name: cards for name, cards in data['cards'].items() if name == player_name}}
+        elif event.type == 'turn':
+            data = {'player': data['player']}
+        encoded.append({'type': event.type, 'data': data})
+        if event.type == 'turn' and event.data['player'] == player_name:
+            encoded.append({'type': 'your_turn', 'data': {'token': event.data['token']}})
+    return encoded
@@ -0,0 +1,83 @@
+from asyncio import Lock
+import json
+
+from .table import Table, TableNotFoundError
+from .table_versions import TableVersions
+
+
+class TableIndex:
+    """The table infos of /tables, kept up to date by reloading only the tables whose version changed.
+
+    Filtered listings are encoded once per `TableVersions.total`, so many clients looking for a table at the same
+    time neither load the tables nor encode the listing again.
+    """
+    _instance = None
+
+    RESPONSE_CACHE_SIZE = 64
+
+    def __init__(self):
+        self.total = None
+        self._tables = {}
+        self._infos = []
+        self._responses = {}
+        self._lock = Lock()
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def clear(cls):
+        cls._instance = None
+
+    async def infos(self):
+        """Return the infos of all tables ordered by table id, see `Table.to_dict_for_info`."""
+        versions = TableVersions.instance()
+        async with self._lock:
+            if self.total == versions.total:
+                return self._infos
+            # Read before loading, so the index is at least as recent as `total`.
+            total = versions.total
+            if self.total is None:
+                self._tables = {
+                    table.name: (versions.get(table.name), table.table_id, table.to_dict_for_info())
+                    for table in await Table.load_all()
+                }
+            else:
+                for name in versions.names():
+                    version = versions.get(name)
+                    if name in self._tables and self._tables[name][0] == version:
+                        continue
+                    try:
+                        table = await Table.load_by_name(name)
+                    except TableNotFoundError:
+                        self._tables.pop(name, None)
+                        continue
+                    self._tables[name] = (version, table.table_id, table.to_dict_for_info())
+            self._infos = [info for _, _, info in sorted(self._tables.values(), key=lambda entry: entry[1])]
+            self.total = total
+            self._responses = {}
+            return self._infos
+
+    async def encode(self, state=None, min_free_seats=0, limit=None, offset=0):
+        """Return the JSON response of /tables with the filters applied."""
+        infos = await self.infos()
+        key = (state, min_free_seats, limit, offset)
+        if key not in self._responses:
+            if len(self._responses) >= self.RESPONSE_CACHE_SIZE:
+                self._responses = {}
+            tables = filter_infos(infos, state, min_free_seats)[offset:]
+            if limit is not None:
+                tables = tables[:limit]
+            self._responses[key] = json.dumps({'tables': tables}).encode()
+        return self._responses[key]
+
+
+def filter_infos(infos, state=None, min_free_seats=0):
+    return [
+        info for info in infos
+        if (state is None or info['state'] == state) and
+        info['max_player_count'] - len(info['players']) >= min_free_seats
+    ]
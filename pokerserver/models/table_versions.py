@@ -0,0 +1,65 @@
+from asyncio import TimeoutError as AsyncTimeoutError, get_event_loop, wait_for
+from uuid import uuid4
+
+
+class TableVersions:
+    """Version counters of the tables by name, bumped by `Match` whenever it changed a table.
+
+    Requests can wait for the next change of a table instead of polling it. The counters are kept in memory and
+    start at 0 when the server starts, so clients must only compare them for equality. ETags contain a random epoch
+    as well, so they do not match responses of an earlier server process.
+    """
+    _instance = None
+
+    def __init__(self):
+        self.epoch = uuid4().hex[:12]
+        self.total = 0
+        self._versions = {}
+        self._waiters = {}
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def clear(cls):
+        cls._instance = None
+
+    def get(self, table_name):
+        return self._versions.get(table_name, 0)
+
+    def names(self):
+        """Names of the tables which changed since the server started."""
+        return list(self._versions)
+
+    def etag(self, *parts):
+        """Strong ETag of a response that only depends on `parts`, e.g. the version of a table and the viewer."""
+        return '"{}"'.format('-'.join([self.epoch] + [str(part) for part in parts]))
+
+    def bump(self, table_name):
+        """Increase the version of a table and `total`, the sum of the versions of all tables."""
+        self.total += 1
+        version = self._versions[table_name] = self.get(table_name) + 1
+        for waiter in self._waiters.pop(table_name, []):
+            if not waiter.done():
+                waiter.set_result(version)
+        return version
+
+    async def wait(self, table_name, since, timeout):
+        """Wait until the version of a table differs from `since`, at most `timeout` seconds. Returns the version."""
+        if self.get(table_name) != since:
+            return self.get(table_name)
+        waiter = get_event_loop().create_future()
+        self._waiters.setdefault(table_name, []).append(waiter)
+        try:
+            return await wait_for(waiter, timeout)
+        except AsyncTimeoutError:
+            return self.get(table_name)
+        finally:
+            waiters = self._waiters.get(table_name, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[table_name]
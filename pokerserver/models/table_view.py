@@ -0,0 +1,150 @@
+from asyncio import ensure_future, shield
+from collections import OrderedDict
+import json
+
+from .table import Table
+from .table_versions import TableVersions
+
+
+class TableView:
+    """`Table.to_dict` of one table version for all viewers, encoded as JSON.
+
+    The public part and every player are encoded once. `encode` only splices in the entry of the viewer with the hole
+    cards and whether the viewer can join, so serving N viewers costs one serialization of the table instead of N.
+    """
+
+    def __init__(self, table, version, epoch):
+        self.table = table
+        self.version = version
+        self.fields = dict(table.public_dict(), version=version, epoch=epoch)
+        self.player_names = [player.name for player in table.players]
+        self._public_players = [player.to_dict() for player in table.players]
+        self._private_players = {player.name: table.player_to_dict(player, player.name) for player in table.players}
+        self._encoded_players = [json.dumps(player) for player in self._public_players]
+        # Without the braces, so the fields of the viewer can be appended.
+        self._encoded_fields = json.dumps(self.fields)[1:-1]
+        self._public_patches = {}
+        current_player = table.current_player
+        self.current_player_name = current_player.name if current_player is not None else None
+        self.turn_options = table.turn_options(current_player) if current_player is not None else None
+
+    def encode(self, player_name=None):
+        players = self._encoded_players
+        if player_name in self._private_players:
+            players = list(players)
+            players[self.player_names.index(player_name)] = json.dumps(self._private_players[player_name])
+        turn = ''
+        if player_name is not None and player_name == self.current_player_name:
+            turn = ', "turn": {}'.format(json.dumps(self.turn_options))
+        return '{{"players": [{}], {}, "can_join": {}{}}}'.format(
+            ', '.join(players), self._encoded_fields, json.dumps(self.table.can_join(player_name)), turn
+        ).encode()
+
+    def players(self, player_name=None):
+        return [self._private_players[name] if name == player_name else player
+                for name, player in zip(self.player_names, self._public_players)]
+
+    def diff(self, old, player_name=None):
+        """Return the JSON patch from the view `old` of the same table to this view."""
+        if old.version not in self._public_patches:
+            self._public_patches[old.version] = self._public_diff(old)
+        patch = list(self._public_patches[old.version])
+        if old.player_names != self.player_names:
+            patch = [operation for operation in patch if operation['path'] != '/players']
+            patch.append({'op': 'replace', 'path': '/players', 'value': self.players(player_name)})
+        elif player_name in self._private_players:
+            # The public entry of the viewer lacks the hole cards.
+            index = self.player_names.index(player_name)
+            path = '/players/{}'.format(index)
+            patch = [operation for operation in patch if operation['path'] != path]
+            if old.players(player_name)[index] != self._private_players[player_name]:
+                patch.append({'op': 'replace', 'path': path, 'value': self._private_players[player_name]})
+        can_join = self.table.can_join(player_name)
+        if old.table.can_join(player_name) != can_join:
+            patch.append({'op': 'replace', 'path': '/can_join', 'value': can_join})
+        old_turn, turn = old.turn_for(player_name), self.turn_for(player_name)
+        if old_turn is None and turn is not None:
+            patch.append({'op': 'add', 'path': '/turn', 'value': turn})
+        elif old_turn is not None and turn is None:
+            patch.append({'op': 'remove', 'path': '/turn'})
+        elif old_turn != turn:
+            patch.append({'op': 'replace', 'path': '/turn', 'value': turn})
+        return patch
+
+    def turn_for(self, player_name):
+        """The legal actions and amounts if it is the turn of the viewer, see `Table.turn_options`."""
+        if player_name is None or player_name != self.current_player_name:
+            return None
+        return self.turn_options
+
+    def _public_diff(self, old):
+        patch = [
+            {'op': 'replace', 'path': '/' + field, 'value': value}
+            for field, value in self.fields.items() if old.fields.get(field) != value
+        ]
+        if old.player_names != self.player_names:
+            patch.append({'op': 'replace', 'path': '/players', 'value': self._public_players})
+        else:
+            patch.extend(
+                {'op': 'replace', 'path': '/players/{}'.format(index), 'value': player}
+                for index, (old_player, player) in enumerate(zip(old._public_players, self._public_players))
+                if old_player != player
+            )
+        return patch
+
+
+class TableViews:
+    """The views of the latest versions of each table requested, to serve them and deltas between them."""
+    _instance = None
+
+    HISTORY_SIZE = 16
+
+    def __init__(self):
+        self._views = {}
+        self._loading = {}
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def clear(cls):
+        cls._instance = None
+
+    def get(self, table_name, version):
+        return self._views.get(table_name, {}).get(version)
+
+    def put(self, table_name, view):
+        """Keep the view unless there is one of its version already. Returns the view kept for the version.
+
+        A version must only ever be served with one state, otherwise ETags and patches of its clients would be wrong.
+        """
+        views = self._views.setdefault(table_name, OrderedDict())
+        if view.version in views:
+            return views[view.version]
+        views[view.version] = view
+        while len(views) > self.HISTORY_SIZE:
+            views.popitem(last=False)
+        return view
+
+    async def load(self, table_name, version):
+        """Return the view of the version, loading the table if necessary. Raises `TableNotFoundError`.
+
+        Requests waiting for a change all wake up with the same version. They share one load instead of each loading
+        and encoding the table.
+        """
+        view = self.get(table_name, version)
+        if view is not None:
+            return view
+        key = table_name, version
+        if key not in self._loading:
+            self._loading[key] = ensure_future(self._load(table_name, version))
+            self._loading[key].add_done_callback(lambda _: self._loading.pop(key, None))
+        # A request that is cancelled must not cancel the load of the others.
+        return await shield(self._loading[key])
+
+    async def _load(self, table_name, version):
+        table = await Table.load_by_name(table_name)
+        return self.put(table_name, TableView(table, version, TableVersions.instance().epoch))
@@ -0,0 +1,194 @@
+from asyncio import ensure_future, get_event_loop
+from functools import partial
+from inspect import isawaitable
+import logging
+from math import ceil
+from time import monotonic
+
+LOG = logging.getLogger(__name__)
+
+
+class Timer:
+    __slots__ = ('key', 'expiry', 'callback', 'slot')
+
+    def __init__(self, key, expiry, callback):
+        self.key = key
+        self.expiry = expiry
+        self.callback = callback
+        self.slot = None
+
+
+class TimerWheel:
+    """Hierarchical timing wheel for deadlines such as turn timeouts.
+
+    Time is divided into ticks of `resolution` seconds. Level 0 has one slot per tick, each slot of level n covers
+    `slots ** n` ticks. Timers far in the future sit in a coarse slot and cascade down to finer levels as time passes.
+    Registering and cancelling a timer are O(1) and there is at most one timer per key (e.g. per table). A single
+    callback on the event loop advances the wheel; it only runs while timers are active.
+    """
+    _instance = None
+
+    def __init__(self, resolution=0.05, slots=64, levels=4, clock=monotonic):
+        assert resolution > 0 and slots > 1 and levels > 0
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self.clock = clock
+        self._start = clock()
+        self._tick = 0
+        self._wheel = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._timers = {}
+        self._handle = None
+        self._loop = None
+        self._scheduled_at = None
+        self._registered = 0
+        self._cancelled = 0
+        self._fired = 0
+        self._ticks = 0
+        self._max_lag = 0.0
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def create(cls, **kwargs):
+        cls.clear()
+        cls._instance = cls(**kwargs)
+        return cls._instance
+
+    @classmethod
+    def clear(cls):
+        if cls._instance is not None:
+            cls._instance.stop()
+        cls._instance = None
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def register(self, key, delay, callback):
+        """Call `callback()` after `delay` seconds, replacing any timer registered for `key`.
+
+        If the callback returns an awaitable, it is scheduled on the event loop.
+        """
+        self._remove(key)
+        now = self.clock()
+        if not self._timers:
+            # The wheel does not tick while it is empty, catch up without stepping through every tick.
+            self._tick = max(self._tick, int((now - self._start) / self.resolution))
+        expiry = max(self._tick + 1, ceil((now - self._start + delay) / self.resolution))
+        timer = Timer(key, expiry, callback)
+        self._timers[key] = timer
+        self._place(timer)
+        self._registered += 1
+        self._ensure_running()
+        return timer
+
+    def cancel(self, key):
+        """Cancel the timer of `key`. Returns whether there was one."""
+        if self._remove(key) is None:
+            return False
+        self._cancelled += 1
+        if not self._timers:
+            self.stop()
+        return True
+
+    def deadline(self, key):
+        """Return the time (according to `clock`) at which the timer of `key` fires or None."""
+        timer = self._timers.get(key)
+        return None if timer is None else self._start + timer.expiry * self.resolution
+
+    def advance(self, now=None):
+        """Fire all timers that expired until `now`."""
+        if now is None:
+            now = self.clock()
+        target = int((now - self._start) / self.resolution)
+        fired = 0
+        while self._tick < target and self._timers:
+            self._tick += 1
+            for level in range(self.levels - 1, 0, -1):
+                if self._tick % self.slots ** level == 0:
+                    self._cascade(level)
+            slot = self._wheel[0][self._tick % self.slots]
+            while slot:
+                _, timer = slot.popitem()
+                del self._timers[timer.key]
+                self._fire(timer)
+                fired += 1
+        return fired
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def metrics(self):
+        return {
+            'active': len(self._timers),
+            'registered': self._registered,
+            'cancelled': self._cancelled,
+            'fired': self._fired,
+            'ticks': self._ticks,
+            'max_lag': self._max_lag,
+            'levels': [sum(len(slot) for slot in level) for level in self._wheel]
+        }
+
+    def _place(self, timer):
+        # Timers beyond the range of the wheel wait in the last slot of the top level and are placed again later.
+        ticks = min(timer.expiry - self._tick, self.slots ** self.levels - 1)
+        level = 0
+        while ticks >= self.slots ** (level + 1):
+            level += 1
+        slot = self._wheel[level][(self._tick + ticks) // self.slots ** level % self.slots]
+        slot[timer.key] = timer
+        timer.slot = slot
+
+    def _remove(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            del timer.slot[key]
+        return timer
+
+    def _cascade(self, level):
+        slot = self._wheel[level][self._tick // self.slots ** level % self.slots]
+        timers = list(slot.values())
+        slot.clear()
+        for timer in timers:
+            self._place(timer)
+
+    def _fire(self, timer):
+        self._fired += 1
+        try:
+            result = timer.callback()
+            if isawaitable(result):
+                ensure_future(result).add_done_callback(partial(self._log_failure, timer.key))
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception('Timer for %s failed', timer.key)
+
+    @staticmethod
+    def _log_failure(key, future):
+        if not future.cancelled() and future.exception() is not None:
+            LOG.error('Timer for %s failed', key, exc_info=future.exception())
+
+    def _ensure_running(self):
+        if self._handle is None:
+            self._loop = get_event_loop()
+            self._schedule_tick()
+
+    def _schedule_tick(self):
+        self._scheduled_at = self.clock() + self.resolution
+        self._handle = self._loop.call_later(self.resolution, self._on_tick)
+
+    def _on_tick(self):
+        self._handle = None
+        self._ticks += 1
+        now = self.clock()
+        self._max_lag = max(self._max_lag, now - self._scheduled_at)
+        self.advance(now)
+        if self._timers:
+            self._schedule_tick()
@@ -0,0 +1,167 @@
+"""Headless simulation of tables played by bot strategies.
+
+The simulator drives the `MatchEngine` directly: there is no HTTP server, no database and no waiting.
+A strategy is a callable `strategy(table, position)` like `SimpleClient.make_turn`. It receives the same
+`pokerserver.client.Table` a client would fetch from the server, but instead of sending a request it returns
+its decision: 'fold', 'check', 'call' or ('raise', amount).
+"""
+from collections import OrderedDict, defaultdict, namedtuple
+from importlib import import_module
+from multiprocessing import Pool
+import random
+
+from pokerserver.client import SimpleStrategy, Table as ClientTable
+from pokerserver.database import TableConfig
+from pokerserver.models import InvalidTurnError, MatchEngine, Player, Table, load_equity_table
+from pokerserver.models.engine import Call, Check, Fold, HandStarted, Raise, Start, StatisticsIncremented
+
+TableResult = namedtuple('TableResult', 'seed strategies hands actions invalid_actions gains')
+
+
+def calling_strategy(table, position):
+    """Never folds and never raises."""
+    return 'check' if SimpleStrategy.can_check(table, position) else 'call'
+
+
+def random_strategy(table, position):
+    if SimpleStrategy.can_check(table, position):
+        return 'check'
+    actions = ['fold', 'call']
+    if SimpleStrategy.can_raise(table, position):
+        actions.append('raise')
+    action = random.choice(actions)
+    if action == 'raise':
+        my_bet = next(player.bet for player in table.players if player.position == position)
+        minimum_raise = SimpleStrategy.maximum_bet(table, position) - my_bet + 1
+        return action, random.randint(minimum_raise, SimpleStrategy.get_balance(table, position))
+    return action
+
+
+def load_strategy(name, equity_table=None):
+    """Return a built-in strategy ('simple', 'random', 'calling') or import one given as 'module:callable'."""
+    if name == 'simple':
+        return SimpleStrategy(equity_table).decide_turn
+    if name == 'random':
+        return random_strategy
+    if name == 'calling':
+        return calling_strategy
+    module_name, _, attribute = name.partition(':')
+    if not attribute:
+        raise ValueError('Unknown strategy: {}'.format(name))
+    return getattr(import_module(module_name), attribute)
+
+
+def to_action(player_name, decision):
+    if decision == 'fold':
+        return Fold(player_name)
+    if decision == 'check':
+        return Check(player_name)
+    if decision == 'call':
+        return Call(player_name)
+    action, amount = decision
+    if action != 'raise':
+        raise ValueError('Invalid decision: {}'.format(decision))
+    return Raise(player_name, amount)
+
+
+# pylint: disable=too-many-arguments, too-many-locals
+def simulate_table(strategy_names, seed, start_balance=40, small_blind=1, big_blind=2, max_hands=1000,
+                   equity_table_path=None):
+    """Play one table until a single player is left or `max_hands` hands were played.
+
+    Invalid decisions count as fold, like a bot that sends a bad request and times out would lose its hand.
+    Gains are summed up by strategy name, for unfinished tables players keep their current balance and bet.
+    """
+    # Strategies using the random module are deterministic per table, too.
+    random.seed(seed)
+    equity_table = load_equity_table(equity_table_path) if equity_table_path is not None else None
+
+    config = TableConfig(len(strategy_names), len(strategy_names), small_blind, big_blind, start_balance)
+    players = [
+        Player(0, position, 'player{}'.format(position), start_balance, [], 0)
+        for position in range(1, len(strategy_names) + 1)
+    ]
+    strategy_by_player = {
+        player.name: (name, load_strategy(name, equity_table)) for player, name in zip(players, strategy_names)
+    }
+    table = Table(0, 'simulation', config, players=players)
+    engine = MatchEngine(table, rng=random.Random(seed))
+
+    gains = defaultdict(int)
+    hands = actions = invalid_actions = 0
+    _, effects = engine.apply(Start(None))
+    while True:
+        for effect in effects:
+            if isinstance(effect, HandStarted):
+                hands += 1
+            elif isinstance(effect, StatisticsIncremented):
+                gains[strategy_by_player[effect.player_name][0]] += effect.gain - effect.buy_in
+        if table.is_closed or hands > max_hands:
+            break
+
+        player = table.current_player
+        view = ClientTable(table.name, **table.to_dict(player.name))
+        decision = strategy_by_player[player.name][1](view, player.position)
+        try:
+            _, effects = engine.apply(to_action(player.name, decision))
+        except (InvalidTurnError, ValueError):
+            invalid_actions += 1
+            _, effects = engine.apply(Fold(player.name))
+        actions += 1
+
+    for player in table.players:
+        gains[strategy_by_player[player.name][0]] += player.balance + player.bet - start_balance
+
+    return TableResult(
+        seed=seed, strategies=list(strategy_names), hands=min(hands, max_hands), actions=actions,
+        invalid_actions=invalid_actions, gains=dict(gains)
+    )
+
+
+def _simulate_table(kwargs):
+    return simulate_table(**kwargs)
+
+
+def simulate(strategy_names, tables, seed=0, processes=None, **table_options):
+    """Simulate independent tables, optionally spread over a process pool.
+
+    Seats are rotated from table to table so that every strategy plays every position equally often.
+    Each table gets its own seed derived from `seed`, so results do not depend on the number of processes.
+    """
+    tasks = []
+    for index in range(tables):
+        rotation = index % len(strategy_names)
+        tasks.append(dict(
+            table_options,
+            strategy_names=strategy_names[rotation:] + strategy_names[:rotation],
+            seed='{}:{}'.format(seed, index)
+        ))
+
+    if processes == 1:
+        return list(map(_simulate_table, tasks))
+    with Pool(processes) as pool:
+        return pool.map(_simulate_table, tasks, chunksize=max(1, tables // (8 * (processes or 1))))
+
+
+def summarize(results):
+    summary = OrderedDict([
+        ('tables', len(results)),
+        ('hands', sum(result.hands for result in results)),
+        ('actions', sum(result.actions for result in results)),
+        ('invalid_actions', sum(result.invalid_actions for result in results)),
+        ('strategies', OrderedDict())
+    ])
+    seats = defaultdict(int)
+    gains = defaultdict(int)
+    for result in results:
+        for name in result.strategies:
+            seats[name] += 1
+        for name, gain in result.gains.items():
+            gains[name] += gain
+    for name in sorted(seats, key=lambda name: -gains[name]):
+        summary['strategies'][name] = OrderedDict([
+            ('seats', seats[name]),
+            ('gain', gains[name]),
+            ('gain_per_seat', gains[name] / seats[name])
+        ])
+    return summary
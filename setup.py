@@ -24,9 +24,15 @@ setup(
             'clearpokerdb=pokerserver.applications.clear_database:main',
             'simpleclient=pokerserver.applications.simple_client:main',
             'pokercli=pokerserver.applications.poker_cli:main',
+            'benchmarkranking=pokerserver.applications.benchmark_ranking:main',
+            'createequitytable=pokerserver.applications.create_equity_table:main',
+            'simulatetournament=pokerserver.applications.simulate_tournament:main',
         ]
     },
     include_package_data=True,
     install_requires=requirements,
+    extras_require={
+        'analytics': ['numpy']
+    },
     test_suite='nose.collector'
 )
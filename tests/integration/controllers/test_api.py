@@ -0,0 +1,46 @@
+import gzip
+from http import HTTPStatus
+import json
+from unittest.mock import patch
+
+from pokerserver.api import API_SPECIFICATION
+from tests.utils import IntegrationHttpTestCase
+
+
+class TestApiController(IntegrationHttpTestCase):
+    SETUP_DB_CONNECTION = False
+
+    def test_get(self):
+        response = self.fetch('/swagger.json', decompress_response=False)
+        self.assertEqual(HTTPStatus.OK.value, response.code)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertIn('/matchmaking', json.loads(response.body.decode())['paths'])
+
+    def test_get_compressed(self):
+        response = self.fetch('/swagger.json', headers={'Accept-Encoding': 'gzip'}, decompress_response=False)
+        self.assertEqual('gzip', response.headers['Content-Encoding'])
+        self.assertEqual(API_SPECIFICATION.encoded, gzip.decompress(response.body))
+        uncompressed_response = self.fetch('/swagger.json', decompress_response=False)
+        self.assertNotEqual(uncompressed_response.headers['Etag'], response.headers['Etag'])
+
+    def test_get_compression_refused(self):
+        for accept_encoding in ['gzip;q=0', 'deflate, gzip; q=0.0', 'br, *;q=0', '']:
+            response = self.fetch('/swagger.json', headers={'Accept-Encoding': accept_encoding},
+                                  decompress_response=False)
+            self.assertNotIn('Content-Encoding', response.headers)
+        for accept_encoding in ['GZIP', 'deflate, gzip;q=0.5', '*']:
+            response = self.fetch('/swagger.json', headers={'Accept-Encoding': accept_encoding},
+                                  decompress_response=False)
+            self.assertEqual('gzip', response.headers['Content-Encoding'])
+
+    def test_get_not_modified(self):
+        etag = self.fetch('/swagger.json').headers['Etag']
+        response = self.fetch('/swagger.json', headers={'If-None-Match': etag})
+        self.assertEqual(HTTPStatus.NOT_MODIFIED.value, response.code)
+
+    def test_built_once(self):
+        self.fetch('/swagger.json')
+        with patch.object(API_SPECIFICATION, 'to_dict') as to_dict_mock:
+            response = self.fetch('/swagger.json')
+        self.assertEqual(HTTPStatus.OK.value, response.code)
+        to_dict_mock.assert_not_called()
@@ -1,3 +1,4 @@
+from asyncio import sleep
 import json
 from http import HTTPStatus
 from unittest.mock import Mock
@@ -5,7 +6,9 @@ from tornado.testing import gen_test
 from tornado.web import Application
 
 from pokerserver.controllers import HANDLERS
-from pokerserver.models import Player
+from pokerserver.controllers.frontend import Spectator, SpectatorBroadcast
+from pokerserver.database import Database
+from pokerserver.models import Player, TableEvent, TableFeed, TableVersions
 from tests.utils import IntegrationHttpTestCase, create_table
 
 
@@ -70,6 +73,7 @@ class TestFrontendDataController(IntegrationHttpTestCase):
                     'balance': player.balance,
                     'bet': player.bet,
                     'cards': player.cards,
+                    'hand': 'pair',
                     'current': False,
                     'dealer': False,
                     'state': 'playing',
@@ -78,10 +82,90 @@ class TestFrontendDataController(IntegrationHttpTestCase):
                 } for player in self.players
             ],
             'openCards': [],
-            'pot': 0
+            'pot': 0,
+            'version': 0
         }
         self.assertEqual(expected_data, data)
 
+    @gen_test
+    async def test_get_not_modified(self):
+        await self.async_setup()
+        headers = {'Cookie': 'devcookie=secret'}
+        response = await self.fetch_async('/fedata/Table1', headers=headers)
+        headers['If-None-Match'] = response.headers['Etag']
+        response = await self.fetch_async('/fedata/Table1', headers=headers, raise_error=False)
+        self.assertEqual(HTTPStatus.NOT_MODIFIED.value, response.code)
+
+    @gen_test
+    async def test_get_not_modified_unknown_table(self):
+        headers = {'Cookie': 'devcookie=secret', 'If-None-Match': TableVersions.instance().etag(0)}
+        response = await self.fetch_async('/fedata/unknown', headers=headers, raise_error=False)
+        self.assertEqual(HTTPStatus.NOT_FOUND.value, response.code)
+
+
+class TestFrontendEventsController(IntegrationHttpTestCase):
+    def get_app(self):
+        return Application(HANDLERS, args=Mock(password=None))
+
+    async def async_setup(self):
+        players = [Player(1, 1, 'a', 10, ['Ah', 'Ac'], 2), Player(1, 2, 'b', 20, ['Kh', 'Kc'], 3)]
+        await create_table(table_id=1, name='Table1', players=players)
+
+    @staticmethod
+    def change_table():
+        version = TableVersions.instance().bump('Table1')
+        TableFeed.instance().publish('Table1', version, [TableEvent('check', {'player': 'a'})])
+
+    @staticmethod
+    async def wait_for(condition):
+        for _ in range(100):
+            if condition():
+                return
+            await sleep(0.01)
+        raise AssertionError('Timed out')
+
+    @gen_test
+    async def test_broadcast_serializes_once_per_change(self):
+        await self.async_setup()
+        spectators = [Spectator(), Spectator()]
+        for spectator in spectators:
+            SpectatorBroadcast.join('Table1', spectator)
+        messages = [await spectator.receive(1) for spectator in spectators]
+        self.assertIs(messages[0], messages[1])
+        self.assertEqual(0, json.loads(messages[0][len('data: '):])['version'])
+
+        self.change_table()
+        self.change_table()
+        messages = [await spectator.receive(1) for spectator in spectators]
+        self.assertIs(messages[0], messages[1])
+        self.assertEqual(2, json.loads(messages[0][len('data: '):])['version'])
+
+        for spectator in spectators:
+            SpectatorBroadcast.leave('Table1', spectator)
+        self.assertEqual(0, TableFeed.instance().subscriber_count('Table1'))
+
+    @gen_test
+    async def test_event_stream(self):
+        await self.async_setup()
+        chunks = []
+        response_future = self.http_client.fetch(
+            self.get_url('/fedata/Table1/events'), streaming_callback=chunks.append, request_timeout=5)
+        await self.wait_for(lambda: chunks)
+        data = json.loads(chunks[0].decode()[len('data: '):])
+        self.assertEqual(['a', 'b'], [player['name'] for player in data['players']])
+
+        await Database.instance().execute('DELETE FROM tables')
+        self.change_table()
+        response = await response_future
+        self.assertEqual('text/event-stream', response.headers['Content-Type'])
+        self.assertEqual(1, len(chunks))
+
+    @gen_test
+    async def test_event_stream_no_table(self):
+        await self.async_setup()
+        response = await self.fetch_async('/fedata/Table2/events', raise_error=False)
+        self.assertEqual(HTTPStatus.NOT_FOUND.value, response.code)
+
 
 class TestIndexController(IntegrationHttpTestCase):
     def get_app(self):
@@ -0,0 +1,71 @@
+from http import HTTPStatus
+import json
+from unittest.mock import Mock, patch
+
+from tornado.testing import gen_test
+from tornado.web import Application
+
+from pokerserver.controllers import HANDLERS
+from pokerserver.database import Database, HandHistoryRelation
+from tests.utils import IntegrationHttpTestCase, create_table
+
+
+class TestHistoryController(IntegrationHttpTestCase):
+    def get_app(self):
+        return Application(HANDLERS, args=Mock(password='secret'))
+
+    async def async_setup(self):
+        await create_table(table_id=1, name='one')
+        await create_table(table_id=2, name='two')
+        statements = [
+            HandHistoryRelation.insert_statement(1 + hand % 2, 100.0 + hand, json.dumps({'dealer': str(hand)}))
+            for hand in range(5)
+        ]
+        await Database.instance().execute_batch(statements)
+
+    async def fetch_hands(self, query=''):
+        response = await self.fetch_async('/history' + query, headers={'Cookie': 'devcookie=secret'})
+        self.assertEqual(HTTPStatus.OK.value, response.code)
+        self.assertEqual('application/x-ndjson', response.headers['Content-Type'])
+        return [json.loads(line) for line in response.body.decode().splitlines()]
+
+    @gen_test
+    async def test_history_unauthorized(self):
+        await self.async_setup()
+        response = await self.fetch_async('/history', raise_error=False)
+        self.assertEqual(HTTPStatus.UNAUTHORIZED.value, response.code)
+
+    @gen_test
+    async def test_history(self):
+        await self.async_setup()
+        hands = await self.fetch_hands()
+        self.assertEqual([1, 2, 3, 4, 5], [hand['hand_id'] for hand in hands])
+        self.assertEqual({'hand_id': 2, 'table_id': 2, 'finished_at': 101.0, 'dealer': '1'}, hands[1])
+
+    @gen_test
+    async def test_history_pages(self):
+        await self.async_setup()
+        with patch('pokerserver.controllers.history.PAGE_SIZE', 2):
+            self.assertEqual([1, 2, 3, 4, 5], [hand['hand_id'] for hand in await self.fetch_hands()])
+            self.assertEqual([3, 4, 5], [hand['hand_id'] for hand in await self.fetch_hands('?after=2')])
+            self.assertEqual([2, 3, 4], [hand['hand_id'] for hand in await self.fetch_hands('?after=1&limit=3')])
+            self.assertEqual([2, 4], [hand['hand_id'] for hand in await self.fetch_hands('?table=two')])
+            self.assertEqual([3, 5], [hand['hand_id'] for hand in await self.fetch_hands('?table=one&after=1')])
+
+    @gen_test
+    async def test_history_empty(self):
+        self.assertEqual([], await self.fetch_hands())
+        await self.async_setup()
+        self.assertEqual([], await self.fetch_hands('?after=5'))
+        self.assertEqual([], await self.fetch_hands('?limit=0'))
+
+    @gen_test
+    async def test_history_invalid_arguments(self):
+        await self.async_setup()
+        for query in ['?after=x', '?limit=-1']:
+            response = await self.fetch_async(
+                '/history' + query, headers={'Cookie': 'devcookie=secret'}, raise_error=False)
+            self.assertEqual(HTTPStatus.BAD_REQUEST.value, response.code)
+        response = await self.fetch_async(
+            '/history?table=unknown', headers={'Cookie': 'devcookie=secret'}, raise_error=False)
+        self.assertEqual(HTTPStatus.NOT_FOUND.value, response.code)
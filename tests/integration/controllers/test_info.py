@@ -14,4 +14,4 @@ class TestInfoController(IntegrationHttpTestCase):
         response = self.fetch('/info')
         assert_equals(response.code, HTTPStatus.OK.value)
         response_body = response.body.decode('utf-8')
-        assert_equals(json.loads(response_body).keys(), {'name', 'description', 'version'})
+        assert_equals(json.loads(response_body).keys(), {'name', 'description', 'version', 'timers'})
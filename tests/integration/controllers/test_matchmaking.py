@@ -0,0 +1,81 @@
+from asyncio import ensure_future, gather
+from http import HTTPStatus
+from json import loads
+from uuid import uuid4
+
+from tornado.testing import gen_test
+
+from pokerserver.database import UUIDsRelation
+from pokerserver.models import Matchmaker, Player, Table
+from tests.utils import IntegrationHttpTestCase, create_table
+
+
+class TestMatchmakingController(IntegrationHttpTestCase):
+    async def async_setup(self):
+        self.uuids = {}
+        for player_name in ['a', 'b', 'c']:
+            self.uuids[player_name] = uuid4()
+            await UUIDsRelation.add_uuid(self.uuids[player_name], player_name)
+        await create_table(table_id=1, name='full', max_player_count=1, players=[Player(1, 1, 'x', 10, [], 0)])
+        await create_table(table_id=2, name='small', max_player_count=2, players=[Player(2, 2, 'y', 10, [], 0)])
+        await create_table(table_id=3, name='large', max_player_count=4)
+
+    async def find_seats(self, player_name, *group, raise_error=True):
+        return await self.post_with_uuid(
+            '/matchmaking', self.uuids[player_name], body={'uuids': [str(self.uuids[name]) for name in group]},
+            raise_error=raise_error
+        )
+
+    @gen_test
+    async def test_find_seat(self):
+        await self.async_setup()
+        response = await self.find_seats('a')
+        self.assertEqual({'table': 'small', 'positions': {'a': 1}}, loads(response.body.decode()))
+        table = await Table.load_by_name('small')
+        self.assertEqual(['a', 'y'], [player.name for player in table.players])
+
+    @gen_test
+    async def test_find_seats_for_group(self):
+        await self.async_setup()
+        response = await self.find_seats('a', 'b', 'c')
+        self.assertEqual({'table': 'large', 'positions': {'a': 1, 'b': 2, 'c': 3}}, loads(response.body.decode()))
+
+    @gen_test
+    async def test_find_seats_concurrently(self):
+        await self.async_setup()
+        responses = await gather(*[self.find_seats(name) for name in ['a', 'b', 'c']])
+        seats = {(body['table'], position) for body in [loads(response.body.decode()) for response in responses]
+                 for position in body['positions'].values()}
+        self.assertEqual({('small', 1), ('large', 1), ('large', 2)}, seats)
+
+    @gen_test
+    async def test_find_seats_locks_single_tables(self):
+        await self.async_setup()
+        async with Matchmaker.instance().table_lock('small'):
+            waiting = ensure_future(self.find_seats('a'))
+            response = await self.find_seats('b', 'c')
+            self.assertEqual('large', loads(response.body.decode())['table'])
+            self.assertFalse(waiting.done())
+        self.assertEqual({'table': 'small', 'positions': {'a': 1}}, loads((await waiting).body.decode()))
+
+    @gen_test
+    async def test_find_seats_without_room(self):
+        await self.async_setup()
+        await self.find_seats('a', 'b')
+        response = await self.find_seats('c', 'a', 'b', raise_error=False)
+        self.assertEqual(HTTPStatus.CONFLICT.value, response.code)
+
+    @gen_test
+    async def test_find_seats_invalid_group(self):
+        await self.async_setup()
+        response = await self.post_with_uuid(
+            '/matchmaking', self.uuids['a'], body={'uuids': [str(uuid4())]}, raise_error=False)
+        self.assertEqual(HTTPStatus.BAD_REQUEST.value, response.code)
+        response = await self.find_seats('a', 'a', raise_error=False)
+        self.assertEqual(HTTPStatus.BAD_REQUEST.value, response.code)
+
+    @gen_test
+    async def test_find_seats_unauthenticated(self):
+        await self.async_setup()
+        response = await self.post('/matchmaking', raise_error=False)
+        self.assertEqual(HTTPStatus.UNAUTHORIZED.value, response.code)
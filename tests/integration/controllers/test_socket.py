@@ -0,0 +1,107 @@
+import json
+from uuid import uuid4
+
+from tornado.testing import gen_test
+from tornado.websocket import websocket_connect
+
+from pokerserver.controllers import socket
+from pokerserver.database import TableConfig, UUIDsRelation
+from pokerserver.models import Match, Table, TableEvent, TableFeed
+from tests.utils import IntegrationHttpTestCase
+
+
+class TestTableSocketController(IntegrationHttpTestCase):
+    async def async_setup(self):
+        config = TableConfig(min_player_count=2, max_player_count=2, small_blind=1, big_blind=2, start_balance=10)
+        await Table.create_tables(1, config)
+        self.table = (await Table.load_all())[0]
+        self.uuids = {'a': uuid4(), 'b': uuid4()}
+        for name, uuid in self.uuids.items():
+            await UUIDsRelation.add_uuid(uuid, name)
+
+    async def connect(self, player_name=None):
+        url = self.get_url('/table/{}/socket'.format(self.table.name)).replace('http', 'ws', 1)
+        if player_name is not None:
+            url += '?uuid={}'.format(self.uuids[player_name])
+        return await websocket_connect(url)
+
+    @staticmethod
+    async def read(connection):
+        return json.loads(await connection.read_message())
+
+    async def read_events(self, connection):
+        message = await self.read(connection)
+        self.assertEqual('events', message['type'])
+        return message['events']
+
+    @gen_test
+    async def test_events_and_actions(self):
+        await self.async_setup()
+        connections = {name: await self.connect(name) for name in self.uuids}
+        spectator = await self.connect()
+        for connection in list(connections.values()) + [spectator]:
+            message = await self.read(connection)
+            self.assertEqual('table', message['type'])
+            self.assertEqual([], message['table']['players'])
+
+        match = Match(self.table)
+        await match.join('a', 1)
+        await match.join('b', 2)
+        self.assertEqual(['join'], [event['type'] for event in await self.read_events(spectator)])
+        events = await self.read_events(spectator)
+        self.assertIn('deal', [event['type'] for event in events])
+        deal = next(event for event in events if event['type'] == 'deal')
+        self.assertEqual({}, deal['data']['cards'])
+        self.assertNotIn('your_turn', [event['type'] for event in events])
+        turn = next(event for event in events if event['type'] == 'turn')
+        self.assertNotIn('token', turn['data'])
+
+        current_player = turn['data']['player']
+        connection = connections[current_player]
+        for _ in range(2):
+            events = await self.read_events(connection)
+        deal = next(event for event in events if event['type'] == 'deal')
+        self.assertEqual([current_player], list(deal['data']['cards']))
+        self.assertEqual({'token': self.table.current_player_token},
+                         next(event for event in events if event['type'] == 'your_turn')['data'])
+
+        connection.write_message(json.dumps({'action': 'fold'}))
+        events = await self.read_events(connection)
+        self.assertEqual({'type': 'fold', 'data': {'player': current_player}}, events[0])
+
+    @gen_test
+    async def test_invalid_actions(self):
+        await self.async_setup()
+        spectator = await self.connect()
+        await self.read(spectator)
+        spectator.write_message(json.dumps({'action': 'fold'}))
+        self.assertEqual({'type': 'error', 'message': 'Not authenticated'}, await self.read(spectator))
+
+        connection = await self.connect('a')
+        await self.read(connection)
+        for message, error in [('x', 'Invalid message'), ({'action': 'dance'}, 'Invalid action'),
+                               ({'action': 'raise'}, 'Invalid amount')]:
+            connection.write_message(json.dumps(message) if isinstance(message, dict) else message)
+            self.assertEqual({'type': 'error', 'message': error}, await self.read(connection))
+        connection.write_message(json.dumps({'action': 'check'}))
+        self.assertEqual('error', (await self.read(connection))['type'])
+
+    @gen_test
+    async def test_unknown_table(self):
+        await self.async_setup()
+        url = self.get_url('/table/unknown/socket').replace('http', 'ws', 1)
+        connection = await websocket_connect(url)
+        self.assertIsNone(await connection.read_message())
+        self.assertEqual(socket.CLOSE_TABLE_NOT_FOUND, connection.close_code)
+
+    @gen_test
+    async def test_slow_client_is_disconnected(self):
+        await self.async_setup()
+        connection = await self.connect()
+        await self.read(connection)
+        feed = TableFeed.instance()
+        self.assertEqual(1, feed.subscriber_count(self.table.name))
+        # Without yielding to the event loop nothing is sent, so the queue fills up.
+        for version in range(1, socket.SEND_QUEUE_SIZE + 2):
+            feed.publish(self.table.name, version, [TableEvent('check', {'player': 'a'})])
+        self.assertEqual(0, feed.subscriber_count(self.table.name))
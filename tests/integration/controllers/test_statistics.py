@@ -1,12 +1,16 @@
 from http import HTTPStatus
 import json
+from time import time
 from unittest.mock import Mock
 
 from tornado.testing import gen_test
 from tornado.web import Application
 
 from pokerserver.controllers import HANDLERS
-from pokerserver.models import Statistics
+from pokerserver.database import Database, PlayerStatsRelation, StatisticsRollupsRelation
+from pokerserver.models import PlayerStatsAggregator, Statistics
+from pokerserver.models.engine import HandFinished, TableEvent
+from pokerserver.models.rollups import bucket_start
 from tests.utils import IntegrationHttpTestCase
 
 
@@ -43,3 +47,73 @@ class TestStatisticsController(IntegrationHttpTestCase):
                 'gain': 300
             }
         })
+
+    async def fetch_json(self, query):
+        response = await self.fetch_async('/statistics' + query)
+        self.assertEqual(response.code, HTTPStatus.OK.value)
+        return json.loads(response.body.decode('utf-8'))
+
+    @gen_test
+    async def test_leaderboard_page(self):
+        await self.create_statistics()
+        response_data = await self.fetch_json('?limit=2')
+        self.assertEqual('gain', response_data['order'])
+        self.assertEqual(3, response_data['total'])
+        self.assertEqual([
+            {'rank': 1, 'name': 'player 3', 'matches': 100, 'buy_in': 200, 'gain': 300},
+            {'rank': 2, 'name': 'player 2', 'matches': 10, 'buy_in': 20, 'gain': 30}
+        ], response_data['players'])
+        response_data = await self.fetch_json('?offset=2&limit=2')
+        self.assertEqual(['player 1'], [player['name'] for player in response_data['players']])
+
+    @gen_test
+    async def test_leaderboard_is_updated(self):
+        await self.create_statistics()
+        await self.fetch_json('?limit=1')
+        await Statistics.increment_statistics('player 1', 1, 1, 1000)
+        response_data = await self.fetch_json('?player=player%201&order=gain_per_match')
+        response_data['player'].pop('advanced')
+        self.assertEqual({'rank': 1, 'name': 'player 1', 'matches': 2, 'buy_in': 3, 'gain': 1003},
+                         response_data['player'])
+
+    @gen_test
+    async def test_leaderboard_invalid_arguments(self):
+        await self.create_statistics()
+        for query, status in [('?order=x', HTTPStatus.BAD_REQUEST), ('?limit=-1', HTTPStatus.BAD_REQUEST),
+                              ('?player=unknown', HTTPStatus.NOT_FOUND)]:
+            response = await self.fetch_async('/statistics' + query, raise_error=False)
+            self.assertEqual(status.value, response.code)
+
+    @gen_test
+    async def test_advanced_statistics(self):
+        await self.create_statistics()
+        await Database.instance().execute_batch(PlayerStatsRelation.increment_statements(
+            'player 1', {'hands': 3, 'vpip_hands': 2, 'pfr_hands': 1, 'showdowns': 1}))
+        PlayerStatsAggregator.instance().observe(1, [
+            TableEvent('hand', {'dealer': 'player 1', 'players': [
+                {'name': 'player 1', 'position': 1, 'balance': 10}, {'name': 'player 2', 'position': 2, 'balance': 10}
+            ]}),
+            TableEvent('payout', {'player': 'player 1', 'amount': 4}),
+            HandFinished()
+        ])
+        response_data = await self.fetch_json('?player=player%201')
+        self.assertEqual({
+            'hands': 4, 'vpip_hands': 2, 'pfr_hands': 1, 'showdowns': 2, 'showdown_wins': 1,
+            'vpip': 0.5, 'pfr': 0.25, 'showdown_win_rate': 0.5
+        }, response_data['player']['advanced'])
+
+    @gen_test
+    async def test_window(self):
+        await self.create_statistics()
+        await Database.instance().execute_batch(StatisticsRollupsRelation.increment_statements(
+            60, bucket_start(time() - 2 * 60 * 60, 60), 'player 1', 5, 5, 5))
+        response_data = await self.fetch_json('?window=hour')
+        self.assertEqual(60 * 60, response_data['window'])
+        self.assertEqual({'matches': 1, 'buy_in': 2, 'gain': 3}, response_data['players']['player 1'])
+        self.assertEqual(3, len(response_data['players']))
+
+        response_data = await self.fetch_json('?window=86400&player=player%201')
+        self.assertEqual({'player 1': {'matches': 6, 'buy_in': 7, 'gain': 8}}, response_data['players'])
+
+        response = await self.fetch_async('/statistics?window=week', raise_error=False)
+        self.assertEqual(HTTPStatus.BAD_REQUEST.value, response.code)
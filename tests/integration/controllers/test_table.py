@@ -1,3 +1,4 @@
+from asyncio import ensure_future, gather, sleep
 from http import HTTPStatus
 from json import loads
 from unittest.mock import Mock, patch
@@ -6,7 +7,7 @@ from uuid import uuid4
 from tornado.testing import gen_test
 
 from pokerserver.database import PlayerState, UUIDsRelation
-from pokerserver.models import InvalidTurnError, NotYourTurnError, Player, PositionOccupiedError
+from pokerserver.models import InvalidTurnError, NotYourTurnError, Player, PositionOccupiedError, Table, TableVersions
 from tests.utils import IntegrationHttpTestCase, create_table, return_done_future
 
 
@@ -61,6 +62,7 @@ class TestTableController(IntegrationHttpTestCase):
                 'table_id': 1,
                 'balance': 0,
                 'cards': ['Qh', 'Qc'],
+                'hand': 'pair',
                 'name': 'c',
                 'bet': 0,
                 'position': 5,
@@ -69,7 +71,9 @@ class TestTableController(IntegrationHttpTestCase):
             'pots': [{
                 'bets': {}
             }],
-            'small_blind': 1
+            'small_blind': 1,
+            'version': 0,
+            'epoch': TableVersions.instance().epoch
         })
 
     @gen_test
@@ -114,7 +118,9 @@ class TestTableController(IntegrationHttpTestCase):
             'pots': [{
                 'bets': {}
             }],
-            'small_blind': 1
+            'small_blind': 1,
+            'version': 0,
+            'epoch': TableVersions.instance().epoch
         })
 
     @gen_test
@@ -159,9 +165,119 @@ class TestTableController(IntegrationHttpTestCase):
             'pots': [{
                 'bets': {}
             }],
-            'small_blind': 1
+            'small_blind': 1,
+            'version': 0,
+            'epoch': TableVersions.instance().epoch
         })
 
+    @gen_test
+    async def test_get_since_waits_for_change(self):
+        await self.async_setup()
+        response = await self.fetch_async('/table/{}'.format(self.table_name))
+        version = loads(response.body.decode())['version']
+
+        async def bump_later():
+            await sleep(0.05)
+            TableVersions.instance().bump(self.table_name)
+
+        ensure_future(bump_later())
+        response = await self.fetch_async('/table/{}?since={}'.format(self.table_name, version))
+        self.assertEqual(version + 1, loads(response.body.decode())['version'])
+
+    @gen_test
+    async def test_get_since_timeout(self):
+        await self.async_setup()
+        response = await self.fetch_async('/table/{}?since=0&timeout=0'.format(self.table_name))
+        self.assertEqual(0, loads(response.body.decode())['version'])
+
+    @gen_test
+    async def test_get_since_invalid(self):
+        await self.async_setup()
+        response = await self.fetch_async('/table/{}?since=x'.format(self.table_name), raise_error=False)
+        self.assertEqual(HTTPStatus.BAD_REQUEST.value, response.code)
+
+    @gen_test
+    async def test_get_since_loads_once(self):
+        await self.async_setup()
+        url = '/table/{}?since=0'.format(self.table_name)
+        with patch('pokerserver.models.table_view.Table.load_by_name', wraps=Table.load_by_name) as load_mock:
+            polls = [ensure_future(self.fetch_async(url)) for _ in range(20)]
+            await sleep(0.1)
+            TableVersions.instance().bump(self.table_name)
+            responses = await gather(*polls)
+        load_mock.assert_called_once_with(self.table_name)
+        self.assertEqual({1}, {loads(response.body.decode())['version'] for response in responses})
+
+    @gen_test
+    async def test_get_delta(self):
+        await self.async_setup()
+        url = '/table/{}?uuid={}'.format(self.table_name, self.uuid)
+        await self.fetch_async(url)
+        TableVersions.instance().bump(self.table_name)
+        response = await self.fetch_async(url + '&delta_from={}-0'.format(TableVersions.instance().epoch))
+        self.assertEqual({'version': 1, 'patch': [{'op': 'replace', 'path': '/version', 'value': 1}]},
+                         loads(response.body.decode()))
+
+    @gen_test
+    async def test_get_delta_from_unknown_version(self):
+        await self.async_setup()
+        response = await self.fetch_async('/table/{}?delta_from={}-5'.format(
+            self.table_name, TableVersions.instance().epoch))
+        table = loads(response.body.decode())
+        self.assertNotIn('patch', table)
+        self.assertEqual(0, table['version'])
+
+    @gen_test
+    async def test_get_delta_from_other_epoch(self):
+        await self.async_setup()
+        url = '/table/{}'.format(self.table_name)
+        await self.fetch_async(url)
+        for delta_from in ['0', 'abc-0']:
+            table = loads((await self.fetch_async(url + '?delta_from=' + delta_from)).body.decode())
+            self.assertNotIn('patch', table)
+            self.assertEqual(TableVersions.instance().epoch, table['epoch'])
+
+    @gen_test
+    async def test_get_delta_from_invalid(self):
+        await self.async_setup()
+        response = await self.fetch_async('/table/{}?delta_from=abc-x'.format(self.table_name), raise_error=False)
+        self.assertEqual(HTTPStatus.BAD_REQUEST.value, response.code)
+
+    @gen_test
+    async def test_get_not_modified(self):
+        await self.async_setup()
+        url = '/table/{}?uuid={}'.format(self.table_name, self.uuid)
+        response = await self.fetch_async(url)
+        etag = response.headers['Etag']
+        response = await self.fetch_async(url, headers={'If-None-Match': etag}, raise_error=False)
+        self.assertEqual(HTTPStatus.NOT_MODIFIED.value, response.code)
+
+        response = await self.fetch_async('/table/{}?uuid={}'.format(self.table_name, self.uuid2))
+        self.assertNotEqual(etag, response.headers['Etag'])
+
+        TableVersions.instance().bump(self.table_name)
+        response = await self.fetch_async(url, headers={'If-None-Match': etag})
+        self.assertEqual(HTTPStatus.OK.value, response.code)
+        self.assertNotEqual(etag, response.headers['Etag'])
+
+    @gen_test
+    async def test_get_not_modified_delta(self):
+        await self.async_setup()
+        url = '/table/{}?uuid={}'.format(self.table_name, self.uuid)
+        await self.fetch_async(url)
+        TableVersions.instance().bump(self.table_name)
+        etag = (await self.fetch_async(url)).headers['Etag']
+        delta_from = '{}-0'.format(TableVersions.instance().epoch)
+        response = await self.fetch_async(url + '&delta_from=' + delta_from, headers={'If-None-Match': etag})
+        self.assertEqual(HTTPStatus.OK.value, response.code)
+        self.assertIn('patch', loads(response.body.decode()))
+
+    @gen_test
+    async def test_get_not_modified_unknown_table(self):
+        etag = TableVersions.instance().etag(0, '', '')
+        response = await self.fetch_async('/table/unknown', headers={'If-None-Match': etag}, raise_error=False)
+        self.assertEqual(HTTPStatus.NOT_FOUND.value, response.code)
+
 
 class TestJoinController(IntegrationHttpTestCase):
     async def async_setup(self):
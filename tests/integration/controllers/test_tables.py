@@ -1,7 +1,7 @@
 from datetime import datetime
 from http import HTTPStatus
 import json
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from tornado.testing import gen_test
 from tornado.web import Application
@@ -9,6 +9,7 @@ from tornado.web import Application
 from pokerserver.controllers import HANDLERS
 from pokerserver.database import PlayerState, PlayersRelation, TableConfig, TablesRelation
 from pokerserver.database import TableState
+from pokerserver.models import Table, TableVersions
 from tests.utils import IntegrationHttpTestCase
 
 
@@ -59,3 +60,50 @@ class TestTablesController(IntegrationHttpTestCase):
                 'state': 'running game'
             }
         ])
+
+    @gen_test
+    async def test_tables_not_modified(self):
+        await self.create_tables()
+        response = await self.fetch_async('/tables')
+        etag = response.headers['Etag']
+        response = await self.fetch_async('/tables', headers={'If-None-Match': etag}, raise_error=False)
+        self.assertEqual(HTTPStatus.NOT_MODIFIED.value, response.code)
+
+        await Table.create_tables(1, TableConfig(4, 9, 1, 2, 10))
+        response = await self.fetch_async('/tables', headers={'If-None-Match': etag})
+        self.assertEqual(3, len(json.loads(response.body.decode('utf-8'))['tables']))
+
+    @gen_test
+    async def test_tables_filters(self):
+        await self.create_tables()
+        await Table.create_tables(2, TableConfig(2, 3, 1, 2, 10))
+
+        async def names(query):
+            response = await self.fetch_async('/tables?' + query)
+            return [table['name'] for table in json.loads(response.body.decode('utf-8'))['tables']]
+
+        self.assertEqual(['Table1', 'Table2'], await names('state=waiting+for+players'))
+        self.assertEqual(['table1', 'table2'], await names('state=running+game'))
+        self.assertEqual(['table1', 'table2', 'Table1', 'Table2'], await names('has_free_seats=true'))
+        self.assertEqual(['table1', 'table2'], await names('min_free_seats=4'))
+        self.assertEqual(['table2', 'Table1'], await names('limit=2&offset=1'))
+
+    @gen_test
+    async def test_tables_invalid_filter(self):
+        for query in ['state=open', 'has_free_seats=yes', 'min_free_seats=-1', 'limit=x']:
+            response = await self.fetch_async('/tables?' + query, raise_error=False)
+            self.assertEqual(HTTPStatus.BAD_REQUEST.value, response.code)
+
+    @gen_test
+    async def test_tables_reloads_changed_tables(self):
+        await self.create_tables()
+        await self.fetch_async('/tables')
+        await PlayersRelation.add_player(
+            1, 3, 'sam', 10, [], 0, datetime.now(), PlayerState.PLAYING)
+        TableVersions.instance().bump('table1')
+        with patch('pokerserver.models.table_index.Table.load_all') as load_all_mock:
+            response = await self.fetch_async('/tables')
+        load_all_mock.assert_not_called()
+        tables = json.loads(response.body.decode('utf-8'))['tables']
+        self.assertEqual({'1': 'frodo', '2': 'pippin', '3': 'sam'}, tables[0]['players'])
+        self.assertEqual({'1': 'gandalf', '2': 'bilbo'}, tables[1]['players'])
@@ -1,9 +1,11 @@
 from http import HTTPStatus
 from unittest.mock import patch
+from uuid import uuid4
 
 from tornado.testing import gen_test
 
-from pokerserver.database import DuplicateKeyError
+from pokerserver.controllers import UUIDCache
+from pokerserver.database import DuplicateKeyError, UUIDsRelation
 from tests.utils import IntegrationHttpTestCase, return_done_future
 
 
@@ -16,6 +18,7 @@ class TestUUIDController(IntegrationHttpTestCase):
         self.assertEqual(response.code, HTTPStatus.OK.value)
         self.assertEqual(response.body.decode(), '123-456')
         add_uuid_mock.assert_called_once_with('123-456', 'hans')
+        self.assertEqual('hans', UUIDCache.get('123-456'))
 
     @gen_test
     async def test_uuid_invalid_name(self):
@@ -28,3 +31,11 @@ class TestUUIDController(IntegrationHttpTestCase):
     async def test_uuid_fail_on_duplicate(self, *_):
         response = await self.post('/uuid', body={'player_name': 'hans'}, raise_error=False)
         self.assertEqual(response.code, HTTPStatus.BAD_REQUEST.value)
+
+    @gen_test
+    async def test_load_cache(self):
+        await UUIDsRelation.add_uuid(uuid4(), 'hans')
+        uuid = uuid4()
+        await UUIDsRelation.add_uuid(uuid, 'franz')
+        self.assertEqual(2, await UUIDCache.load())
+        self.assertEqual('franz', UUIDCache.get(uuid))
@@ -0,0 +1,46 @@
+from tornado.testing import gen_test
+
+from pokerserver.database import Database, TableState, TimersRelation
+from tests.utils import IntegrationTestCase, create_table
+
+
+class TestTimersRelation(IntegrationTestCase):
+    @gen_test
+    async def test_load_running(self):
+        await create_table(table_id=1, name='running', state=TableState.RUNNING_GAME)
+        await create_table(table_id=2, name='closed', state=TableState.CLOSED)
+        await create_table(table_id=3, name='also running', state=TableState.RUNNING_GAME)
+        await TimersRelation.set_timer(1, TimersRelation.TURN_TIMEOUT, 200.5, 'kick', 'a', 'token')
+        await TimersRelation.set_timer(2, TimersRelation.TURN_TIMEOUT, 50, 'kick', 'b', 'token')
+        await TimersRelation.set_timer(3, TimersRelation.SCHEDULED, 100, 'start next hand')
+
+        timers = await TimersRelation.load_running()
+        self.assertEqual([
+            {'table_id': 3, 'kind': 'scheduled', 'deadline': 100, 'action': 'start next hand', 'player_name': None,
+             'token': None},
+            {'table_id': 1, 'kind': 'turn timeout', 'deadline': 200.5, 'action': 'kick', 'player_name': 'a',
+             'token': 'token'}
+        ], timers)
+
+    @gen_test
+    async def test_set_replaces_timer_of_same_kind(self):
+        await create_table(table_id=1, state=TableState.RUNNING_GAME)
+        await TimersRelation.set_timer(1, TimersRelation.TURN_TIMEOUT, 100, 'kick', 'a', 'token1')
+        await TimersRelation.set_timer(1, TimersRelation.TURN_TIMEOUT, 110, 'kick', 'b', 'token2')
+        await TimersRelation.set_timer(1, TimersRelation.SCHEDULED, 105, 'activate player', 'c')
+        self.assertEqual(
+            [('scheduled', 'c'), ('turn timeout', 'b')],
+            [(timer['kind'], timer['player_name']) for timer in await TimersRelation.load_running()]
+        )
+
+    @gen_test
+    async def test_delete(self):
+        await create_table(table_id=1, state=TableState.RUNNING_GAME)
+        await TimersRelation.set_timer(1, TimersRelation.TURN_TIMEOUT, 100, 'kick', 'a', 'token')
+        await TimersRelation.set_timer(1, TimersRelation.SCHEDULED, 105, 'start next hand')
+        query, args = TimersRelation.delete_statement(1, TimersRelation.SCHEDULED)
+        await Database.instance().execute(query, *args)
+        self.assertEqual(1, len(await TimersRelation.load_running()))
+        query, args = TimersRelation.delete_by_table_statement(1)
+        await Database.instance().execute(query, *args)
+        self.assertEqual([], await TimersRelation.load_running())
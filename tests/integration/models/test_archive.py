@@ -0,0 +1,33 @@
+import json
+import os
+from tempfile import TemporaryDirectory
+from unittest import skipIf
+
+from tornado.testing import gen_test
+
+from pokerserver.database import Database, HandHistoryRelation
+from pokerserver.models import HandArchive, HandArchiveReader, compact_hand_history
+from pokerserver.models.archive import numpy
+from tests.utils import IntegrationTestCase
+
+
+@skipIf(numpy is None, 'NumPy is not installed')
+class TestCompactHandHistory(IntegrationTestCase):
+    async def insert_hands(self, count):
+        record = {'dealer': 'a', 'players': [], 'board': [], 'actions': [], 'results': []}
+        await Database.instance().execute_batch([
+            HandHistoryRelation.insert_statement(1, 100.0, json.dumps(record)) for _ in range(count)
+        ])
+
+    @gen_test
+    async def test_compact(self):
+        with TemporaryDirectory() as directory:
+            archive = HandArchive(os.path.join(directory, 'archive'))
+            await self.insert_hands(5)
+            self.assertEqual(5, await compact_hand_history(archive, page_size=2))
+            self.assertEqual(0, await compact_hand_history(archive, page_size=2))
+            await self.insert_hands(1)
+            self.assertEqual(1, await compact_hand_history(archive, page_size=2))
+
+            reader = HandArchiveReader(archive.path)
+            self.assertEqual([1, 2, 3, 4, 5, 6], reader.hands['hand_id'].tolist())
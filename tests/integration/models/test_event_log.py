@@ -0,0 +1,76 @@
+import json
+
+from tornado.testing import gen_test
+
+from pokerserver.database import EventsRelation, SnapshotsRelation, TableConfig
+from pokerserver.models import Match, Table, TableNotFoundError, rebuild_table, snapshot
+from tests.utils import IntegrationTestCase
+
+
+class TestRebuildTable(IntegrationTestCase):
+    async def async_setup(self):
+        config = TableConfig(min_player_count=2, max_player_count=4, small_blind=1, big_blind=2, start_balance=10)
+        await Table.create_tables(1, config)
+        self.table = (await Table.load_all())[0]
+        self.match = Match(self.table)
+
+    async def assert_rebuilt(self):
+        stored_table = await Table.load_by_id(self.table.table_id)
+        rebuilt_table = await rebuild_table(self.table.table_id)
+        self.assertEqual(snapshot(stored_table), snapshot(rebuilt_table))
+        self.assertEqual(snapshot(self.table), snapshot(rebuilt_table))
+
+    @gen_test
+    async def test_rebuild_empty_table(self):
+        await self.async_setup()
+        await self.assert_rebuilt()
+
+    @gen_test
+    async def test_rebuild_running_table(self):
+        await self.async_setup()
+        for position, name in enumerate(['a', 'b', 'c'], start=1):
+            await self.match.join(name, position)
+            await self.assert_rebuilt()
+        for _ in range(8):
+            player = self.table.current_player
+            if player.bet < max(other.bet for other in self.table.players):
+                await self.match.call(player.name)
+            else:
+                await self.match.check(player.name)
+            await self.assert_rebuilt()
+
+    @gen_test
+    async def test_snapshot_on_hand_start(self):
+        await self.async_setup()
+        await self.match.join('a', 1)
+        self.assertIsNone(await SnapshotsRelation.load_latest(self.table.table_id))
+        await self.match.join('b', 2)
+
+        latest_snapshot = await SnapshotsRelation.load_latest(self.table.table_id)
+        self.assertEqual(self.table.dealer.name, json.loads(latest_snapshot['data'])['dealer'])
+        self.assertEqual([], await EventsRelation.load_since(self.table.table_id, latest_snapshot['sequence']))
+        events = await EventsRelation.load_since(self.table.table_id)
+        self.assertEqual(latest_snapshot['sequence'], events[-1]['sequence'])
+        self.assertEqual(
+            ['join', 'join', 'start', 'reset', 'hand', 'blind', 'blind', 'deal', 'turn'],
+            [event['type'] for event in events]
+        )
+
+    @gen_test
+    async def test_rebuild_unknown_table(self):
+        await self.async_setup()
+        with self.assertRaises(TableNotFoundError):
+            await rebuild_table(42)
+
+
+class TestEventsRelation(IntegrationTestCase):
+    @gen_test
+    async def test_sequences_per_table(self):
+        await EventsRelation.append(1, 'join', '{}')
+        await EventsRelation.append(2, 'join', '{}')
+        await EventsRelation.append(1, 'start', '{}')
+        self.assertEqual([(1, 'join'), (2, 'start')], [
+            (event['sequence'], event['type']) for event in await EventsRelation.load_since(1)
+        ])
+        self.assertEqual([2], [event['sequence'] for event in await EventsRelation.load_since(1, 1)])
+        self.assertEqual([1], [event['sequence'] for event in await EventsRelation.load_since(2)])
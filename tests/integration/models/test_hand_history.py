@@ -0,0 +1,35 @@
+import json
+
+from tornado.testing import gen_test
+
+from pokerserver.database import HandHistoryRelation, TableConfig
+from pokerserver.models import Match, Table
+from tests.utils import IntegrationTestCase
+
+
+class TestHandHistory(IntegrationTestCase):
+    @gen_test
+    async def test_one_record_per_hand(self):
+        config = TableConfig(min_player_count=2, max_player_count=2, small_blind=1, big_blind=2, start_balance=10)
+        await Table.create_tables(1, config)
+        table = (await Table.load_all())[0]
+        match = Match(table)
+        await match.join('a', 1)
+        await match.join('b', 2)
+        hand_cards = {player.name: player.cards for player in table.players}
+
+        # Each action is a separate request, the record needs the events of the earlier ones.
+        await match.fold(table.current_player.name)
+
+        hands = await HandHistoryRelation.load_page()
+        self.assertEqual(1, len(hands))
+        record = json.loads(hands[0]['data'])
+        self.assertEqual(hand_cards, {player['name']: player['cards'] for player in record['players']})
+        self.assertEqual(['blind', 'blind', 'fold'], [action['action'] for action in record['actions']])
+        self.assertEqual([], record['board'])
+        self.assertEqual(3, sum(result['amount'] for result in record['results']))
+
+        await match.fold(table.current_player.name)
+        self.assertEqual([1, 2], [hand['hand_id'] for hand in await HandHistoryRelation.load_page()])
+        self.assertEqual([2], [hand['hand_id'] for hand in await HandHistoryRelation.load_page(after=1)])
+        self.assertEqual([], await HandHistoryRelation.load_page(table_id=table.table_id + 1))
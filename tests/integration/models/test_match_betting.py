@@ -5,7 +5,7 @@ from tornado.testing import gen_test
 from pokerserver.database import PlayerState, PlayersRelation
 from pokerserver.models import (InsufficientBalanceError, InvalidBetError, InvalidTurnError, Match, NotYourTurnError,
                                 Player, Table)
-from tests.utils import IntegrationTestCase, PotChecker, create_table, return_done_future
+from tests.utils import IntegrationTestCase, PotChecker, create_table
 
 
 class BettingTestCase(IntegrationTestCase, PotChecker):
@@ -147,7 +147,7 @@ class TestCall(BettingTestCase):
         await self.assert_pots(self.table.name, amounts=[4])
         await self.assert_current_player('John1')
 
-    @patch('pokerserver.models.match.Match.next_round', side_effect=return_done_future())
+    @patch('pokerserver.models.engine.MatchEngine.next_round')
     @gen_test
     async def test_call_heads_up_big_blind(self, next_round_mock):
         await self.async_setup(balances=[9, 8], bets=[1, 2])
@@ -117,6 +117,27 @@ class TestJoin(IntegrationTestCase):
         self.assertEqual(PlayerState.PLAYING, self.table.players[1].state)
         self.assertEqual(PlayerState.SITTING_OUT, self.table.players[2].state)
 
+    @gen_test
+    async def test_join_all(self):
+        await self.async_setup()
+        await self.match.join_all({'a': 1, 'b': 2, 'c': 3})
+        await self.load_match_and_table()
+        await self.check_players({1: 'a', 2: 'b', 3: 'c'})
+        self.assertEqual(TableState.RUNNING_GAME, self.table.state)
+        self.assertEqual([PlayerState.PLAYING] * 3, [player.state for player in self.table.players])
+
+    @gen_test
+    async def test_join_all_or_none(self):
+        await self.async_setup()
+        await self.match.join(self.player_name, 3)
+        await self.load_match_and_table()
+        for positions in [{'a': 1, 'b': 3}, {'a': 1, 'b': 1}]:
+            with self.assertRaises(PositionOccupiedError):
+                await self.match.join_all(positions)
+        await self.load_match_and_table()
+        await self.check_players({3: self.player_name})
+        self.assertEqual(TableState.WAITING_FOR_PLAYERS, self.table.state)
+
     @gen_test
     async def test_join_two_tables(self):
         await self.async_setup(table_count=2)
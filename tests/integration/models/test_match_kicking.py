@@ -1,10 +1,11 @@
-from unittest.mock import patch
+import asyncio
 
 from tornado.testing import gen_test
 
-from pokerserver.database import TablesRelation
-from pokerserver.models import Match, Player, Round
-from tests.utils import IntegrationTestCase, create_table, return_done_future
+from pokerserver.configuration import ServerConfig
+from pokerserver.database import StatisticsRelation, TableState, TablesRelation, TimersRelation
+from pokerserver.models import Match, Player, Round, Table, TimerWheel, recover_timers
+from tests.utils import IntegrationTestCase, create_table
 
 
 class TestKickCurrentPlayer(IntegrationTestCase):
@@ -48,14 +49,14 @@ class TestKickCurrentPlayer(IntegrationTestCase):
         await match.kick_if_current_player(match.table.players[2], 'thisisnotthetoken', 'reason')
         self.assertEqual(4, len(match.table.players))
 
-    @patch('pokerserver.database.statistics.StatisticsRelation.increment_statistics', side_effect=return_done_future())
     @gen_test
-    async def test_kick_increments_stats(self, increment_stats_mock):
+    async def test_kick_increments_stats(self):
         match = await self.create_match()
         await match.start(match.table.players[0])
         token = await TablesRelation.get_current_player_token(match.table.table_id)
         await match.kick_if_current_player(match.table.players[3], token, 'reason')
-        increment_stats_mock.assert_called_once_with('d', 1, 20, 10)
+        self.assertEqual([{'player_name': 'd', 'matches': 1, 'buy_in': 20, 'gain': 10}],
+                         await StatisticsRelation.load_all())
 
     @gen_test
     async def test_kick_sets_next_player(self):
@@ -100,3 +101,52 @@ class TestKickCurrentPlayer(IntegrationTestCase):
         token = await TablesRelation.get_current_player_token(match.table.table_id)
         await match.kick_if_current_player(players_to_kick[-1], token, 'reason')
         self.assertTrue(match.table.is_closed)
+
+
+class TestRecoverTimers(IntegrationTestCase):
+    timeout = 0.01
+
+    @gen_test
+    async def test_kicks_player_after_restart(self):
+        ServerConfig.set(timeout=self.timeout)
+        players = [Player(1, position, name, 10, [], 0) for position, name in enumerate('abc', start=1)]
+        await create_table(table_id=1, players=players, state=TableState.RUNNING_GAME)
+        match = Match(await Table.load_by_id(1))
+        await match.start(match.table.players[0])
+        current_player = match.table.current_player.name
+
+        TimerWheel.create(resolution=0.001)  # the restart loses all timers in memory
+        ServerConfig.set(timeout=100)  # the recovered timer keeps its persisted deadline
+        self.assertEqual(1, await recover_timers())
+        self.assertIn(1, TimerWheel.instance())
+
+        await asyncio.sleep(10 * self.timeout)
+        table = await Table.load_by_id(1)
+        self.assertNotIn(current_player, [player.name for player in table.players])
+        timers = await TimersRelation.load_running()
+        self.assertEqual([table.current_player.name], [timer['player_name'] for timer in timers])
+
+    @gen_test
+    async def test_ignores_closed_tables(self):
+        await create_table(table_id=1, state=TableState.CLOSED)
+        await TimersRelation.set_timer(1, TimersRelation.SCHEDULED, 0, 'start next hand')
+        self.assertEqual(0, await recover_timers())
+        self.assertEqual(0, len(TimerWheel.instance()))
+
+    @gen_test
+    async def test_arms_timeout_of_tables_without_timer(self):
+        players = [Player(1, position, name, 10, [], 0) for position, name in enumerate('abc', start=1)]
+        await create_table(table_id=1, players=players, state=TableState.RUNNING_GAME)
+        match = Match(await Table.load_by_id(1))
+        await match.start(match.table.players[0])
+        current_player = match.table.current_player.name
+        self.assertEqual([], await TimersRelation.load_running())  # no timeout when the game started
+
+        TimerWheel.create(resolution=0.001)
+        ServerConfig.set(timeout=self.timeout)
+        self.assertEqual(1, await recover_timers())
+        self.assertEqual([current_player], [timer['player_name'] for timer in await TimersRelation.load_running()])
+
+        await asyncio.sleep(10 * self.timeout)
+        table = await Table.load_by_id(1)
+        self.assertNotIn(current_player, [player.name for player in table.players])
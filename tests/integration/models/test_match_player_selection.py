@@ -5,8 +5,9 @@ from uuid import uuid4
 from tornado.testing import gen_test
 
 from pokerserver.configuration import ServerConfig
-from pokerserver.database import TablesRelation
-from pokerserver.models import Match, Player
+from pokerserver.database import PlayersRelation, TableState, TablesRelation, TimersRelation
+from pokerserver.models import Match, Player, TimerWheel
+from pokerserver.models.match import scheduled_key
 from tests.utils import IntegrationTestCase, create_table, return_done_future
 
 
@@ -36,7 +37,7 @@ class TestSetPlayerActive(IntegrationTestCase):
         match = await self.create_match()
         uuid = uuid4()
 
-        with patch('pokerserver.models.match.uuid4', return_value=uuid):
+        with patch('pokerserver.models.engine.uuid4', return_value=uuid):
             await match.set_player_active(match.table.players[0])
 
         table = await TablesRelation.load_table_by_id(match.table.table_id)
@@ -63,3 +64,34 @@ class TestSetPlayerActive(IntegrationTestCase):
         await match.set_player_active(match.table.players[0])
         await asyncio.sleep(self.wait_timeout)
         match.kick_if_current_player.assert_not_called()
+
+
+class TestTurnDelay(IntegrationTestCase):
+    turn_delay = 0.01
+
+    @gen_test
+    async def test_activates_player_in_background(self):
+        players = [Player(1, 1, 'a', 10, [], 0), Player(1, 2, 'b', 10, [], 0)]
+        table = await create_table(table_id=1, players=players)
+        match = Match(table, turn_delay=self.turn_delay)
+
+        await match.set_player_active(match.table.players[0])
+        self.assertIsNone((await TablesRelation.load_table_by_id(1))['current_player'])
+        self.assertIn(scheduled_key(1), TimerWheel.instance())
+
+        await asyncio.sleep(10 * self.turn_delay)
+        self.assertEqual('a', (await TablesRelation.load_table_by_id(1))['current_player'])
+        self.assertNotIn(scheduled_key(1), TimerWheel.instance())
+
+    @gen_test
+    async def test_activation_uses_current_table(self):
+        players = [Player(1, 1, 'a', 10, [], 0), Player(1, 2, 'b', 10, [], 0)]
+        table = await create_table(table_id=1, players=players, state=TableState.RUNNING_GAME)
+        match = Match(table, turn_delay=self.turn_delay)
+
+        await match.set_player_active(match.table.players[0])
+        await PlayersRelation.delete_player(1, 1)  # 'a' leaves during the delay
+
+        await asyncio.sleep(10 * self.turn_delay)
+        self.assertIsNone((await TablesRelation.load_table_by_id(1))['current_player'])
+        self.assertEqual([], await TimersRelation.load_running())
@@ -1,10 +1,10 @@
-from unittest.mock import ANY, call, patch
+from unittest.mock import ANY, patch
 
 from tornado.testing import gen_test
 
-from pokerserver.database import PlayerState, PlayersRelation, clear_relations
+from pokerserver.database import PlayerState, PlayersRelation, StatisticsRelation, clear_relations
 from pokerserver.models import Match, Player, Round, Table
-from tests.utils import IntegrationTestCase, PotChecker, create_table, return_done_future
+from tests.utils import IntegrationTestCase, PotChecker, create_table
 
 
 class TestNextRound(IntegrationTestCase, PotChecker):
@@ -75,7 +75,7 @@ class TestNextRound(IntegrationTestCase, PotChecker):
         self.assertEqual(match.table.players[1].name, table.current_player.name)
         await self.assert_pots(match.table.name, amounts=[30, 20, 10])
 
-    @patch('pokerserver.models.match.Match.finish_hand', side_effect=return_done_future())
+    @patch('pokerserver.models.engine.MatchEngine.finish_hand')
     @gen_test
     async def test_trigger_showdown(self, show_down_mock):
         match = await self.create_match(open_cards=['2h'] * 5)
@@ -107,7 +107,7 @@ class TestShowDown(IntegrationTestCase, PotChecker):
         )
         return Match(table)
 
-    @patch('pokerserver.models.match.Match.start_hand', side_effect=return_done_future())
+    @patch('pokerserver.models.engine.MatchEngine.start_hand')
     @gen_test
     async def test_distribute_pots_single_winner(self, start_hand_mock):
         match = await self.create_match()
@@ -118,7 +118,7 @@ class TestShowDown(IntegrationTestCase, PotChecker):
         await self.assert_pots(match.table.name)
         start_hand_mock.assert_called_once_with(ANY)
 
-    @patch('pokerserver.models.match.Match.start_hand', side_effect=return_done_future())
+    @patch('pokerserver.models.engine.MatchEngine.start_hand')
     @gen_test
     async def test_distribute_pots_several_winners(self, start_hand_mock):
         match = await self.create_match(cards=[['Kc', '2c'], ['Ah', '2h'], ['As', '2s'], ['Ad', '2d']])
@@ -129,7 +129,7 @@ class TestShowDown(IntegrationTestCase, PotChecker):
         await self.assert_pots(match.table.name)
         start_hand_mock.assert_called_once_with(ANY)
 
-    @patch('pokerserver.models.match.Match.start_hand', side_effect=return_done_future())
+    @patch('pokerserver.models.engine.MatchEngine.start_hand')
     @gen_test
     async def test_reset(self, _):
         match = await self.create_match()
@@ -141,8 +141,8 @@ class TestShowDown(IntegrationTestCase, PotChecker):
             self.assertEqual(0, player.bet)
             self.assertEqual(PlayerState.PLAYING, player.state)
 
-    @patch('pokerserver.models.match.Match.close_table', side_effect=return_done_future())
-    @patch('pokerserver.models.match.Match.find_bankrupt_players')
+    @patch('pokerserver.models.engine.MatchEngine.close_table')
+    @patch('pokerserver.models.engine.MatchEngine.find_bankrupt_players')
     @gen_test
     async def test_close_table(self, bankrupt_players_mock, close_mock):
         match = await self.create_match()
@@ -175,7 +175,7 @@ class TestShowDownWithSidePots(IntegrationTestCase, PotChecker):
         )
         return Match(table)
 
-    @patch('pokerserver.models.match.Match.start_hand', side_effect=return_done_future())
+    @patch('pokerserver.models.engine.MatchEngine.start_hand')
     @gen_test
     async def test_distribute_pots_single_winner(self, start_hand_mock):
         match = await self.create_match()
@@ -186,7 +186,7 @@ class TestShowDownWithSidePots(IntegrationTestCase, PotChecker):
         await self.assert_pots(match.table.name)
         start_hand_mock.assert_called_once_with(ANY)
 
-    @patch('pokerserver.models.match.Match.start_hand', side_effect=return_done_future())
+    @patch('pokerserver.models.engine.MatchEngine.start_hand')
     @gen_test
     async def test_distribute_pots_several_winners(self, start_hand_mock):
         match = await self.create_match(cards=[['Kc', '2c'], ['Ah', '2h'], ['As', '2s'], ['Ad', '2d']])
@@ -197,10 +197,9 @@ class TestShowDownWithSidePots(IntegrationTestCase, PotChecker):
         await self.assert_pots(match.table.name)
         start_hand_mock.assert_called_once_with(ANY)
 
-    @patch('pokerserver.models.match.Match.start_hand', side_effect=return_done_future())
-    @patch('pokerserver.models.statistics.Statistics.increment_statistics', side_effect=return_done_future())
+    @patch('pokerserver.models.engine.MatchEngine.start_hand')
     @gen_test
-    async def test_remove_bankrupt_players(self, increment_stats_mock, _):
+    async def test_remove_bankrupt_players(self, _):
         match = await self.create_match()
         await match.finish_hand()
 
@@ -210,6 +209,5 @@ class TestShowDownWithSidePots(IntegrationTestCase, PotChecker):
         self.assertIsNotNone(await PlayersRelation.load_by_position(match.table.table_id, 2))
         self.assertIsNone(await PlayersRelation.load_by_position(match.table.table_id, 3))
 
-        increment_stats_mock.assert_has_calls([
-            call('c', matches=1, buy_in=self.start_balance, gain=0),
-        ], any_order=True)
+        self.assertIn({'player_name': 'c', 'matches': 1, 'buy_in': self.start_balance, 'gain': 0},
+                      await StatisticsRelation.load_all())
@@ -0,0 +1,33 @@
+from tornado.testing import gen_test
+
+from pokerserver.database import PlayerStatsRelation, TableConfig
+from pokerserver.models import Match, PlayerStatsAggregator, Table
+from tests.utils import IntegrationTestCase
+
+
+class TestPlayerStats(IntegrationTestCase):
+    @gen_test
+    async def test_counted_while_playing_and_flushed_in_batch(self):
+        config = TableConfig(min_player_count=2, max_player_count=2, small_blind=1, big_blind=2, start_balance=10)
+        await Table.create_tables(1, config)
+        table = (await Table.load_all())[0]
+        match = Match(table)
+        await match.join('a', 1)
+        await match.join('b', 2)
+        first_player = table.current_player.name
+        await match.raise_bet(first_player, 4)
+        await match.fold(table.current_player.name)
+
+        aggregator = PlayerStatsAggregator.instance()
+        self.assertEqual(1, aggregator.pending(first_player)['pfr_hands'])
+        self.assertIsNone(await PlayerStatsRelation.load_by_name(first_player))
+
+        self.assertEqual(2, await aggregator.flush())
+        self.assertEqual({}, aggregator.pending(first_player))
+        self.assertEqual(
+            {'player_name': first_player, 'hands': 1, 'vpip_hands': 1, 'pfr_hands': 1, 'showdowns': 0,
+             'showdown_wins': 0},
+            await PlayerStatsRelation.load_by_name(first_player))
+
+        aggregator.observe(table.table_id, [])
+        self.assertEqual(0, await aggregator.flush())
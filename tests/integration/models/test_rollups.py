@@ -0,0 +1,45 @@
+from tornado.testing import gen_test
+
+from pokerserver.database import Database
+from pokerserver.models import downsample_rollups, load_statistics_window
+from pokerserver.models.rollups import increment_statements
+from tests.utils import IntegrationTestCase
+
+DAY = 24 * 60 * 60
+NOW = 100 * DAY + 12 * 60 * 60
+
+
+class TestRollups(IntegrationTestCase):
+    async def increment(self, player_name, gain, timestamp):
+        await Database.instance().execute_batch(increment_statements(player_name, 1, 10, gain, timestamp))
+
+    async def create_rollups(self):
+        await self.increment('a', 1, NOW - 30)
+        await self.increment('a', 2, NOW - 30 * 60)
+        await self.increment('b', 4, NOW - 3 * 60 * 60)
+        await self.increment('a', 8, NOW - 3 * DAY)
+        await self.increment('a', 16, NOW - 3 * DAY - 60)
+
+    @gen_test
+    async def test_load_statistics_window(self):
+        await self.create_rollups()
+        self.assertEqual({'a': {'matches': 1, 'buy_in': 10, 'gain': 1}}, await load_statistics_window(60, NOW))
+        self.assertEqual({'a': {'matches': 2, 'buy_in': 20, 'gain': 3}}, await load_statistics_window(3600, NOW))
+        self.assertEqual({
+            'a': {'matches': 4, 'buy_in': 40, 'gain': 27},
+            'b': {'matches': 1, 'buy_in': 10, 'gain': 4}
+        }, await load_statistics_window(7 * DAY, NOW))
+        self.assertEqual({'b': {'matches': 1, 'buy_in': 10, 'gain': 4}},
+                         await load_statistics_window(DAY, NOW, 'b'))
+
+    @gen_test
+    async def test_downsample_keeps_totals(self):
+        await self.create_rollups()
+        before = await load_statistics_window(7 * DAY, NOW)
+        # three minute buckets become hour buckets, two of these become a day bucket
+        self.assertEqual(5, await downsample_rollups(NOW))
+        self.assertEqual(before, await load_statistics_window(7 * DAY, NOW))
+        self.assertEqual({'a': {'matches': 2, 'buy_in': 20, 'gain': 3}}, await load_statistics_window(3600, NOW))
+        self.assertEqual(0, await downsample_rollups(NOW))
+
+        self.assertEqual(4, await Database.instance().find_one('SELECT COUNT(*) FROM statistics_rollups'))
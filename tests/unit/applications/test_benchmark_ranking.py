@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+from pokerserver.applications.benchmark_ranking import generate_hands, run_benchmark
+from pokerserver.models import CATEGORY_NAMES, rank
+
+
+class TestGenerateHands(TestCase):
+    def test_categories_are_split_evenly(self):
+        hands = generate_hands(seed=1, hands_per_category=5, sizes=(5, 7))
+        self.assertEqual(2 * len(CATEGORY_NAMES), len(hands))
+        for (size, category), category_hands in hands.items():
+            self.assertEqual(5, len(category_hands))
+            for cards in category_hands:
+                self.assertEqual(size, len(set(cards)))
+                self.assertEqual(category, rank(cards)[0])
+
+    def test_reproducible(self):
+        self.assertEqual(generate_hands(seed=3, hands_per_category=2), generate_hands(seed=3, hands_per_category=2))
+
+
+class TestRunBenchmark(TestCase):
+    def test_result(self):
+        result = run_benchmark(seed=1, hands_per_category=2, sizes=(7,), repeat=1)
+        self.assertEqual({'rank', 'evaluate'}, set(result['evaluators']))
+        for evaluator_result in result['evaluators'].values():
+            self.assertEqual(0, evaluator_result['mismatches'])
+            self.assertGreater(evaluator_result['hands_per_second'], 0)
+            self.assertEqual(set(CATEGORY_NAMES), set(evaluator_result['categories']))
+        self.assertEqual(1.0, result['evaluators']['rank']['speedup'])
+
+    def test_mismatches_are_reported(self):
+        evaluators = {'rank': rank, 'broken': lambda cards: (0, [])}
+        result = run_benchmark(seed=1, hands_per_category=1, sizes=(5,), repeat=1, evaluators=evaluators)
+        self.assertEqual(len(CATEGORY_NAMES), result['evaluators']['broken']['mismatches'])
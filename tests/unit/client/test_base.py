@@ -29,7 +29,8 @@ class TestTableInfo(TestCase):
 
 class TestBaseClient(TestCase):
     def setUp(self):
-        self.response = Mock(status_code=200, json=Mock(return_value={'response': 'ok'}), text='{ "response": "ok" }')
+        self.response = Mock(status_code=200, json=Mock(return_value={'response': 'ok'}), text='{ "response": "ok" }',
+                             headers={})
         self.base_client = BaseClient('localhost', 55555)
 
     @patch('pokerserver.client.base.Session.get')
@@ -67,6 +68,43 @@ class TestBaseClient(TestCase):
         assert_equal('preflop', table.round)
         get_mock.assert_called_once_with('http://localhost:55555/table/table 1')
 
+    @patch('pokerserver.client.base.Session.get')
+    def test_fetch_table_since(self, get_mock):
+        self.response.json.return_value = {'players': [], 'current_player': None, 'version': 4}
+        get_mock.return_value = self.response
+        table = self.base_client.fetch_table('table 1', 'uuid', since=3)
+        assert_equal(4, table.version)
+        get_mock.assert_called_once_with('http://localhost:55555/table/table 1?uuid=uuid&since=3')
+
+    @patch('pokerserver.client.base.Session.get')
+    def test_fetch_table_not_modified(self, get_mock):
+        self.response.json.return_value = {'players': [], 'current_player': None, 'version': 4, 'epoch': 'abc'}
+        self.response.headers = {'Etag': '"abc-4-"'}
+        get_mock.return_value = self.response
+        table = self.base_client.fetch_table('table 1')
+        not_modified_response = Mock(status_code=304, headers={'Etag': '"abc-4-"'})
+        get_mock.return_value = not_modified_response
+        self.assertIs(table, self.base_client.fetch_table('table 1', since=4))
+        get_mock.assert_called_with('http://localhost:55555/table/table 1?since=4&delta_from=abc-4',
+                                    headers={'If-None-Match': '"abc-4-"'})
+        not_modified_response.json.assert_not_called()
+
+    @patch('pokerserver.client.base.Session.get')
+    def test_fetch_table_delta(self, get_mock):
+        self.response.json.return_value = {
+            'players': [], 'current_player': None, 'round': 'preflop', 'version': 4, 'epoch': 'abc'
+        }
+        get_mock.return_value = self.response
+        self.base_client.fetch_table('table 1', 'uuid')
+        self.response.json.return_value = {'version': 6, 'patch': [
+            {'op': 'replace', 'path': '/round', 'value': 'flop'},
+            {'op': 'replace', 'path': '/version', 'value': 6}
+        ]}
+        table = self.base_client.fetch_table('table 1', 'uuid', since=4)
+        get_mock.assert_called_with('http://localhost:55555/table/table 1?uuid=uuid&since=4&delta_from=abc-4')
+        assert_equal('flop', table.round)
+        assert_equal(6, table.version)
+
     @patch('pokerserver.client.base.Session.get')
     def test_fetch_tables(self, get_mock):
         self.response.json.return_value = {
@@ -85,6 +123,13 @@ class TestBaseClient(TestCase):
         assert_equal(1, len(tables_infos))
         get_mock.assert_called_once_with('http://localhost:55555/tables')
 
+    @patch('pokerserver.client.base.Session.get')
+    def test_fetch_tables_filters(self, get_mock):
+        self.response.json.return_value = {'tables': []}
+        get_mock.return_value = self.response
+        self.base_client.fetch_tables(min_free_seats=2, limit=10)
+        get_mock.assert_called_once_with('http://localhost:55555/tables?limit=10&min_free_seats=2')
+
     def test_find_free_table(self):  # pylint: disable=no-self-use
         tables = [
             TableInfo('table 1', 1, 3, {1: 'lynn', 2: 'brian'}, 'waiting for players')
@@ -99,6 +144,13 @@ class TestBaseClient(TestCase):
             json={'position': 42}
         )
 
+    @patch('pokerserver.client.base.Session.post')
+    def test_find_seats(self, post_mock):
+        self.response.json.return_value = {'table': 'table 1', 'positions': {'a': 1, 'b': 3}}
+        post_mock.return_value = self.response
+        self.assertEqual(('table 1', {'a': 1, 'b': 3}), self.base_client.find_seats('uuid a', 'uuid b'))
+        post_mock.assert_called_once_with('http://localhost:55555/matchmaking?uuid=uuid a', json={'uuids': ['uuid b']})
+
     @patch('pokerserver.client.base.Session.post')
     def test_fold(self, post_mock):
         self.base_client.fold("table 1", "uuid")
@@ -0,0 +1,48 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from pokerserver.client import SimpleClient, Table
+
+
+class TestSimpleClient(TestCase):
+    def setUp(self):
+        self.table = Table('table 1', 'player', [
+            {'name': 'player', 'position': 1, 'balance': 10, 'bet': 1, 'cards': ['Ah', 'Ad'], 'state': 'playing',
+             'table_id': 1},
+            {'name': 'other', 'position': 2, 'balance': 10, 'bet': 2, 'cards': [], 'state': 'playing', 'table_id': 1}
+        ], round='preflop')
+        self.equity_table = Mock()
+        self.client = SimpleClient('localhost', 55555, 'player', 'uuid', equity_table=self.equity_table)
+
+    def test_choose_action_strong_hand(self):
+        self.equity_table.equity_of_cards.return_value = 0.85
+        self.assertEqual('raise', self.client.choose_action(self.table, 1, ['fold', 'call', 'raise']))
+        self.equity_table.equity_of_cards.assert_called_once_with(['Ah', 'Ad'])
+
+    def test_choose_action_weak_hand(self):
+        self.equity_table.equity_of_cards.return_value = 0.3
+        self.assertEqual('fold', self.client.choose_action(self.table, 1, ['fold', 'call', 'raise']))
+
+    def test_choose_action_without_equity_table(self):
+        self.client.equity_table = None
+        self.assertIn(self.client.choose_action(self.table, 1, ['fold', 'call']), ['fold', 'call'])
+
+    def test_choose_action_after_preflop(self):
+        self.table.round = 'flop'
+        self.client.choose_action(self.table, 1, ['fold', 'call'])
+        self.equity_table.equity_of_cards.assert_not_called()
+
+    def test_decide_turn_raise(self):
+        self.equity_table.equity_of_cards.return_value = 0.85
+        self.assertEqual(('raise', 6), self.client.decide_turn(self.table, 1))
+
+    def test_decide_turn_with_turn_options(self):
+        self.equity_table.equity_of_cards.return_value = 0.85
+        self.table.turn = {'actions': ['fold', 'call', 'raise'], 'call_amount': 1, 'min_raise': 2, 'max_raise': 4}
+        self.assertEqual(('raise', 4), self.client.decide_turn(self.table, 1))
+        self.table.turn = {'actions': ['fold', 'call'], 'call_amount': 1, 'min_raise': None, 'max_raise': None}
+        self.assertEqual('call', self.client.decide_turn(self.table, 1))
+
+    def test_decide_turn_check(self):
+        self.table.players[0].bet = 2
+        self.assertEqual('check', self.client.decide_turn(self.table, 1))
@@ -1,8 +1,9 @@
 from unittest.mock import Mock, patch
+from uuid import uuid4
 
 from tornado.testing import AsyncTestCase, gen_test
 
-from pokerserver.controllers import BaseController
+from pokerserver.controllers import BaseController, UUIDCache
 from tests.utils import return_done_future
 
 
@@ -13,6 +14,8 @@ class TestBaseController(AsyncTestCase):
         mock_application.ui_methods = {}
         mock_application.settings = {'args': Mock(turn_delay=1000)}
         self.controller = BaseController(mock_application, Mock())
+        UUIDCache.clear()
+        self.addCleanup(UUIDCache.clear)
 
     @patch('pokerserver.models.table.Table.load_by_name')
     @gen_test
@@ -21,3 +24,42 @@ class TestBaseController(AsyncTestCase):
         match = await self.controller.load_match('table name')
         self.assertEqual(1000, match.turn_delay)
         load_by_name_mock.assert_called_once_with('table name')
+
+    @gen_test
+    async def test_authenticate_from_cache(self):
+        uuid = uuid4()
+        UUIDCache.add(uuid, 'player')
+        queries = []
+
+        async def load_by_uuid(uuid):
+            queries.append(uuid)
+
+        with patch('pokerserver.database.UUIDsRelation.load_by_uuid', new=load_by_uuid), \
+                patch.object(self.controller, 'get_query_argument', return_value=str(uuid)):
+            await self.controller.authenticate()
+        self.assertEqual('player', self.controller.player_name)
+        self.assertEqual([], queries)
+
+    @gen_test
+    async def test_authenticate_fills_cache(self):
+        uuid = uuid4()
+
+        async def load_by_uuid(_):
+            return {'uuid': str(uuid), 'player_name': 'player'}
+
+        with patch('pokerserver.database.UUIDsRelation.load_by_uuid', new=load_by_uuid), \
+                patch.object(self.controller, 'get_query_argument', return_value=str(uuid)):
+            await self.controller.authenticate()
+        self.assertEqual('player', self.controller.player_name)
+        self.assertEqual('player', UUIDCache.get(uuid))
+
+    def test_uuid_cache_evicts_least_recently_used(self):
+        uuids = [uuid4() for _ in range(3)]
+        with patch.object(UUIDCache, 'MAX_SIZE', 2):
+            UUIDCache.add(uuids[0], 'a')
+            UUIDCache.add(uuids[1], 'b')
+            self.assertEqual('a', UUIDCache.get(uuids[0]))
+            UUIDCache.add(uuids[2], 'c')
+        self.assertEqual('a', UUIDCache.get(uuids[0]))
+        self.assertIsNone(UUIDCache.get(uuids[1]))
+        self.assertEqual('c', UUIDCache.get(uuids[2]))
@@ -0,0 +1,124 @@
+import json
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+from pokerserver.models import (ArchiveError, HandArchive, HandArchiveReader, decode_card, encode_card,
+                                get_all_cards)
+from pokerserver.models.archive import ACTION_CODES, numpy
+
+
+def make_hand(hand_id, dealer='a', board=('2s', '3h', 'Ac'), winner='b'):
+    record = {
+        'dealer': dealer,
+        'players': [
+            {'name': 'a', 'position': 1, 'balance': 10, 'cards': ['Kd', 'Kh']},
+            {'name': 'b', 'position': 2, 'balance': 8, 'cards': ['10s', '2d']}
+        ],
+        'board': list(board),
+        'actions': [
+            {'round': 'preflop', 'player': 'a', 'action': 'blind', 'amount': 1},
+            {'round': 'preflop', 'player': 'b', 'action': 'blind', 'amount': 2},
+            {'round': 'preflop', 'player': 'a', 'action': 'call', 'amount': 1},
+            {'round': 'flop', 'player': 'a', 'action': 'fold'}
+        ],
+        'results': [{'player': winner, 'amount': 4}]
+    }
+    return {'hand_id': hand_id, 'table_id': 7, 'finished_at': 100.0 + hand_id, 'data': json.dumps(record)}
+
+
+class TestCards(TestCase):
+    def test_encode_card(self):
+        self.assertEqual(0, encode_card('2s'))
+        self.assertEqual(51, encode_card('Ac'))
+        codes = [encode_card(card) for card in get_all_cards()]
+        self.assertEqual(list(range(52)), sorted(codes))
+        self.assertEqual(get_all_cards(), [decode_card(code) for code in codes])
+
+
+@skipIf(numpy is None, 'NumPy is not installed')
+class TestHandArchive(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'archive')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_append_and_read(self):
+        archive = HandArchive(self.path)
+        self.assertEqual(2, archive.append([make_hand(1), make_hand(2, dealer='b', board=[], winner='a')]))
+
+        reader = HandArchiveReader(self.path)
+        self.assertEqual(2, len(reader))
+        self.assertEqual(['a', 'b'], reader.players)
+        self.assertEqual([1, 2], reader.hands['hand_id'].tolist())
+        self.assertEqual([7, 7], reader.hands['table_id'].tolist())
+        self.assertEqual([101.0, 102.0], reader.hands['finished_at'].tolist())
+        self.assertEqual([0, 1], reader.hands['dealer'].tolist())
+        self.assertEqual(['2s', '3h', 'Ac'], [decode_card(code) for code in reader.hands['board'][0] if code >= 0])
+        self.assertEqual([-1] * 5, reader.hands['board'][1].tolist())
+        self.assertEqual([0, 2], reader.hands['first_seat'].tolist())
+        self.assertEqual([0, 4], reader.hands['first_action'].tolist())
+
+        self.assertEqual([0, 0, 1, 1], reader.seats['hand'].tolist())
+        self.assertEqual([0, 4, 4, 0], reader.seats['won'].tolist())
+        self.assertEqual(['Kd', 'Kh'], [decode_card(code) for code in reader.seats['cards'][0]])
+
+        folds = reader.actions['action'] == ACTION_CODES['fold']
+        self.assertEqual(2, int(folds.sum()))
+        self.assertEqual(8, len(reader.actions['amount']))
+        self.assertEqual(0, reader.player_id('a'))
+
+    def test_append_continues_archive(self):
+        HandArchive(self.path).append([make_hand(1)])
+        archive = HandArchive(self.path)
+        self.assertEqual(1, archive.last_hand_id)
+        self.assertEqual(1, archive.append([make_hand(1), make_hand(3)]))
+
+        reader = HandArchiveReader(self.path)
+        self.assertEqual([1, 3], reader.hands['hand_id'].tolist())
+        self.assertEqual([0, 2], reader.hands['first_seat'].tolist())
+        self.assertEqual([1, 1], reader.seats['hand'].tolist()[2:])
+
+    def test_interrupted_append_is_discarded(self):
+        HandArchive(self.path).append([make_hand(1)])
+        with open(os.path.join(self.path, 'hands.hand_id.bin'), 'ab') as file:
+            file.write(b'garbage')
+        self.assertEqual(1, len(HandArchiveReader(self.path)))
+
+        archive = HandArchive(self.path)
+        archive.append([make_hand(2)])
+        self.assertEqual([1, 2], HandArchiveReader(self.path).hands['hand_id'].tolist())
+
+    def test_failed_append_is_rolled_back(self):
+        archive = HandArchive(self.path)
+        archive.append([make_hand(1)])
+        failing_column = archive._append_column  # pylint: disable=protected-access
+
+        def append_column(table, column, values):
+            if table == 'actions':
+                raise OSError('No space left on device')
+            failing_column(table, column, values)
+
+        with patch.object(archive, '_append_column', side_effect=append_column):
+            with self.assertRaises(OSError):
+                archive.append([make_hand(2, dealer='c')])
+        self.assertEqual(1, archive.last_hand_id)
+        self.assertEqual(8, os.path.getsize(os.path.join(self.path, 'hands.hand_id.bin')))
+
+        archive.append([make_hand(3, dealer='d')])
+        reader = HandArchiveReader(self.path)
+        self.assertEqual([1, 3], reader.hands['hand_id'].tolist())
+        self.assertEqual(['a', 'b', 'd'], reader.players)
+        self.assertEqual([0, 2], reader.hands['first_seat'].tolist())
+        self.assertEqual([1, 1], reader.seats['hand'].tolist()[2:])
+
+    def test_empty_archive(self):
+        self.assertEqual(0, HandArchive(self.path).append([]))
+        reader = HandArchiveReader(self.path)
+        self.assertEqual(0, len(reader))
+        self.assertEqual((0, 5), reader.hands['board'].shape)
+        with self.assertRaises(ArchiveError):
+            HandArchiveReader(os.path.join(self.directory.name, 'missing'))
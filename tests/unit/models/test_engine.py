@@ -0,0 +1,198 @@
+import random
+from unittest import TestCase
+from unittest.mock import call, patch
+
+from pokerserver.database import PlayerState, TableConfig, TableState
+from pokerserver.models import MatchEngine, NotYourTurnError, Player, Table
+from pokerserver.models.engine import (ActivatePlayer, Call, Check, Fold, HandStarted, Join, Kick, PlayerJoined,
+                                       PlayerRemoved, PlayerUpdated, Scheduled, Start, StartNextHand,
+                                       StatisticsIncremented, TableEvent, TableUpdated, TurnStarted, apply)
+
+
+def create_table(balances=(10, 10, 10), min_player_count=2):
+    config = TableConfig(
+        min_player_count=min_player_count, max_player_count=4, small_blind=1, big_blind=2, start_balance=10)
+    players = [Player(1, index + 1, 'p{}'.format(index + 1), balance, [], 0) for index, balance in enumerate(balances)]
+    return Table(1, 'table', config, players=players)
+
+
+@patch('pokerserver.models.engine.MatchEngine.start')
+class TestJoin(TestCase):
+    def setUp(self):
+        self.table = create_table(balances=(10,))
+        self.engine = MatchEngine(self.table)
+
+    def test_join_starts_game_if_not_running(self, start_mock):
+        _, effects = self.engine.apply(Join('horst', 2))
+        start_mock.assert_called_once_with()
+        self.assertEqual(2, len(effects))
+        self.assertIsInstance(effects[0], PlayerJoined)
+        self.assertEqual('horst', effects[0].row['name'])
+        self.assertEqual(PlayerState.SITTING_OUT, effects[0].row['state'])
+        self.assertEqual(TableEvent('join', {'player': 'horst', 'position': 2, 'balance': 10}), effects[1])
+        self.assertEqual(['horst'], self.table.joined_players)
+
+    def test_join_does_not_restart_running_games(self, start_mock):
+        self.table.state = TableState.RUNNING_GAME
+        self.engine.apply(Join('horst', 2))
+        start_mock.assert_not_called()
+
+    def test_join_occupied_position(self, _):
+        with self.assertRaises(ValueError):
+            self.engine.apply(Join('p1', 2))
+
+    def test_join_all_starts_game_once(self, start_mock):
+        start_mock.side_effect = lambda: self.assertEqual(3, len(self.table.players))
+        self.engine.join_all([Join('horst', 2), Join('heinz', 3)])
+        start_mock.assert_called_once_with()
+        self.assertEqual(['horst', 'heinz'], self.table.joined_players)
+
+
+class TestPayments(TestCase):
+    def setUp(self):
+        self.table = create_table(balances=(10, 10, 3))
+        self.players = self.table.players
+        self.engine = MatchEngine(self.table)
+
+    @patch('pokerserver.models.engine.MatchEngine.make_player_pay')
+    def test_pay_blinds(self, mock_make_player_pay):
+        self.engine.pay_blinds(self.players[2], self.players[0])
+        mock_make_player_pay.assert_has_calls([
+            call(self.players[2], 1),
+            call(self.players[0], 2)
+        ])
+
+    def test_make_player_pay(self):
+        self.engine.make_player_pay(self.players[1], 5)
+        self.assertEqual(5, self.players[1].balance)
+        self.assertEqual(5, self.players[1].bet)
+        self.assertEqual(PlayerState.PLAYING, self.players[1].state)
+        self.assertEqual({2: 5}, self.table.pots[0].bets)
+        self.assertEqual([
+            PlayerUpdated('p2', {'balance': 5, 'bet': 5}),
+            TableUpdated({'pots': [{'bets': {2: 5}}]})
+        ], self.engine.take_effects())
+
+    def test_make_player_pay_all_in(self):
+        self.engine.make_player_pay(self.players[2], 5)
+        self.assertEqual(0, self.players[2].balance)
+        self.assertEqual(3, self.players[2].bet)
+        self.assertEqual(PlayerState.ALL_IN, self.players[2].state)
+
+    def test_make_player_pay_negative_amount(self):
+        with self.assertRaises(AssertionError):
+            self.engine.make_player_pay(self.players[2], -5)
+
+
+class TestApply(TestCase):
+    def setUp(self):
+        self.table = create_table()
+        self.engine = MatchEngine(self.table, rng=random.Random(0))
+        self.engine.start(self.table.players[0])
+        self.engine.take_effects()
+
+    def test_start(self):
+        table = create_table()
+        _, effects = MatchEngine(table, rng=random.Random(0)).apply(Start(None))
+        self.assertIs(TableState.RUNNING_GAME, table.state)
+        self.assertIsNotNone(table.dealer)
+        self.assertIsNotNone(table.current_player)
+        self.assertEqual(TurnStarted(table.current_player.name, table.current_player_token), effects[-1])
+
+    def test_current_player_after_start(self):
+        self.assertEqual('p1', self.table.current_player.name)
+        self.assertEqual(3, sum(pot.amount for pot in self.table.pots))
+        self.assertEqual(46, len(self.table.remaining_deck))
+
+    def test_not_your_turn(self):
+        with self.assertRaises(NotYourTurnError):
+            self.engine.apply(Fold('p2'))
+        self.assertEqual([], self.engine.take_effects())
+
+    def test_without_turn_check(self):
+        self.engine.apply(Fold('p2'), check_turn=False)
+        self.assertIs(PlayerState.FOLDED, self.table.get_player_at(2).state)
+
+    def test_fold(self):
+        table, effects = self.engine.apply(Fold('p1'))
+        self.assertIs(self.table, table)
+        self.assertIs(PlayerState.FOLDED, table.get_player_at(1).state)
+        self.assertEqual('p2', table.current_player.name)
+        self.assertEqual([
+            TableUpdated({'current_player': None, 'current_player_token': None}),
+            PlayerUpdated('p1', {'state': PlayerState.FOLDED}),
+            TableEvent('fold', {'player': 'p1'}),
+            TableUpdated({'current_player': 'p2', 'current_player_token': table.current_player_token}),
+            TableEvent('turn', {'player': 'p2', 'token': table.current_player_token}),
+            TurnStarted('p2', table.current_player_token)
+        ], effects)
+
+    def test_betting_round(self):
+        apply(self.table, Call('p1'))
+        apply(self.table, Call('p2'))
+        apply(self.table, Check('p3'))
+        self.assertEqual(3, len(self.table.open_cards))
+        self.assertEqual(6, self.table.pots[0].amount)
+        self.assertEqual({0}, {player.bet for player in self.table.players})
+
+    def test_kick_with_wrong_token(self):
+        _, effects = self.engine.apply(Kick('p1', 'not the token', 'timeout'))
+        self.assertEqual([], effects)
+        self.assertEqual(3, len(self.table.players))
+
+    def test_kick(self):
+        _, effects = self.engine.apply(Kick('p1', self.table.current_player_token, 'timeout'))
+        self.assertEqual(['p2', 'p3'], [player.name for player in self.table.players])
+        self.assertIn(StatisticsIncremented('p1', matches=1, buy_in=10, gain=10), effects)
+        self.assertIn(PlayerRemoved('p1', 1), effects)
+
+    def test_turn_delay(self):
+        self.engine.turn_delay = 0.5
+        _, effects = self.engine.apply(Fold('p1'))
+        self.assertIsNone(self.table.current_player)
+        self.assertEqual(Scheduled(0.5, ActivatePlayer('p2')), effects[-1])
+
+        _, effects = self.engine.apply(effects[-1].action)
+        self.assertEqual('p2', self.table.current_player.name)
+        self.assertIsInstance(effects[-1], TurnStarted)
+
+    def test_showdown_timeout(self):
+        self.engine.showdown_timeout = 2
+        self.engine.apply(Fold('p1'))
+        _, effects = self.engine.apply(Fold('p2'))
+        self.assertEqual(Scheduled(2, StartNextHand()), effects[-1])
+        self.assertEqual(11, self.table.get_player_at(3).balance)
+
+        self.engine.apply(StartNextHand())
+        self.assertEqual('p2', self.table.dealer.name)
+        self.assertIsNotNone(self.table.current_player)
+
+    def test_deterministic(self):
+        gains = self.play_until_closed(seed=1)
+        self.assertEqual(30, sum(gain for _, gain in gains))
+        self.assertEqual(gains, self.play_until_closed(seed=1))
+
+    @staticmethod
+    def play_until_closed(seed, max_actions=10000):
+        table = create_table()
+        engine = MatchEngine(table, rng=random.Random(seed))
+        engine.apply(Start('p1'))
+        gains = []
+        for _ in range(max_actions):
+            player = table.current_player
+            highest_bet = max(p.bet for p in table.players)
+            action = Call(player.name) if highest_bet > player.bet else Check(player.name)
+            _, effects = engine.apply(action)
+            gains += [(effect.player_name, effect.gain) for effect in effects
+                      if isinstance(effect, StatisticsIncremented)]
+            if table.is_closed:
+                return gains
+        raise AssertionError('Match did not finish')
+
+    def test_blind_all_in_does_not_act(self):
+        table = create_table(balances=(10, 1))
+        _, effects = MatchEngine(table, rng=random.Random(0)).apply(Start('p2'))
+        turns = [effect.player_name for effect in effects if isinstance(effect, TurnStarted)]
+        hands = [effect for effect in effects if isinstance(effect, HandStarted)]
+        self.assertNotIn('p2', turns[:1])
+        self.assertTrue(table.is_closed or len(hands) == 2)
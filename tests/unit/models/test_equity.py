@@ -0,0 +1,63 @@
+import os
+import random
+import tempfile
+from unittest import TestCase
+
+from pokerserver.models import HAND_CLASSES, EquityTableError, PreflopEquityTable, hand_class, write_equity_table
+from pokerserver.models.equity import compute_equity, hand_class_combinations
+
+
+class TestHandClass(TestCase):
+    def test_hand_classes(self):
+        self.assertEqual(169, len(HAND_CLASSES))
+        self.assertEqual(1326, sum(len(hand_class_combinations(name)) for name in HAND_CLASSES))
+
+    def test_hand_class(self):
+        self.assertEqual('AKs', hand_class(['Kd', 'Ad']))
+        self.assertEqual('AKo', hand_class(['Ah', 'Kd']))
+        self.assertEqual('T2o', hand_class(['2c', '10d']))
+        self.assertEqual('77', hand_class(['7c', '7d']))
+
+    def test_hand_class_combinations(self):
+        self.assertEqual(6, len(hand_class_combinations('TT')))
+        self.assertEqual(4, len(hand_class_combinations('T9s')))
+        self.assertEqual(12, len(hand_class_combinations('T9o')))
+        for cards in hand_class_combinations('T9o'):
+            self.assertEqual('T9o', hand_class(cards))
+
+    def test_compute_equity(self):
+        equity = compute_equity('AA', '72o', 500, random.Random(0))
+        self.assertGreater(equity, 0.75)
+        self.assertLess(equity, 0.95)
+
+
+class TestPreflopEquityTable(TestCase):
+    def setUp(self):
+        _, self.path = tempfile.mkstemp()
+        size = len(HAND_CLASSES)
+        self.matrix = [[0.5 + (column - row) / (2 * size) for column in range(size)] for row in range(size)]
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_write_and_read(self):
+        write_equity_table(self.path, self.matrix, samples=10)
+        table = PreflopEquityTable(self.path)
+        try:
+            self.assertEqual(10, table.samples)
+            self.assertAlmostEqual(0.5, table.equity('AA', 'AA'), places=4)
+            self.assertAlmostEqual(self.matrix[0][2], table.equity('AA', 'AKo'), places=4)
+            self.assertAlmostEqual(self.matrix[2][0], table.equity_of_cards(['Ah', 'Kd'], ['As', 'Ac']), places=4)
+            self.assertGreater(table.equity_against_random_hand('AA'), table.equity_against_random_hand('32o'))
+        finally:
+            table.close()
+
+    def test_invalid_file(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'no equity table')
+        with self.assertRaises(EquityTableError):
+            PreflopEquityTable(self.path)
+
+    def test_empty_file(self):
+        with self.assertRaises(EquityTableError):
+            PreflopEquityTable(self.path)
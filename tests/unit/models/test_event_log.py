@@ -0,0 +1,91 @@
+import json
+import random
+from unittest import TestCase
+
+from pokerserver.client import Table as ClientTable
+from pokerserver.database import TableConfig
+from pokerserver.models import MatchEngine, Table
+from pokerserver.models.engine import Fold, HandStarted, Join, Kick, TableEvent
+from pokerserver.models.event_log import EVENT_TYPES, collect_event_statements, replay, restore, snapshot
+from pokerserver.simulator import random_strategy, to_action
+
+CONFIG = TableConfig(min_player_count=3, max_player_count=4, small_blind=1, big_blind=2, start_balance=20)
+
+
+def play(engine, seed, actions=300):
+    """Let random players act and yield the effects of each action until the table is closed."""
+    rng = random.Random(seed)
+    table = engine.table
+    for _ in range(actions):
+        if table.is_closed:
+            return
+        player = table.current_player
+        if rng.random() < 0.05:
+            action = Kick(player.name, table.current_player_token, 'timeout')
+        else:
+            action = to_action(player.name, random_strategy(ClientTable(table.name, **table.to_dict(player.name)),
+                                                            player.position))
+        try:
+            _, effects = engine.apply(action)
+        except ValueError:
+            _, effects = engine.apply(Fold(player.name))
+        yield effects
+
+
+class TestReplay(TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.table = Table(1, 'table', CONFIG)
+        self.engine = MatchEngine(self.table, rng=random.Random(0))
+        self.events = []
+        for position, name in enumerate(['a', 'b', 'c', 'd'], start=1):
+            self.events.extend(self.engine.apply(Join(name, position))[1])
+
+    def replayed(self, events):
+        return replay(Table(1, 'table', CONFIG), [event for event in events if isinstance(event, TableEvent)])
+
+    def test_replay_matches_engine_after_every_action(self):
+        for seed in range(5):
+            self.setUp()
+            random.seed(seed)
+            for effects in play(self.engine, seed):
+                self.events.extend(effects)
+                self.assertEqual(snapshot(self.table), snapshot(self.replayed(self.events)))
+            self.assertTrue(self.table.is_closed)
+
+    def test_replay_from_snapshot(self):
+        data = None
+        tail = []
+        for effects in play(self.engine, 1, actions=100):
+            tail.extend(effects)
+            if any(isinstance(effect, HandStarted) for effect in effects):
+                data, tail = json.loads(json.dumps(snapshot(self.table))), []
+        self.assertIsNotNone(data)
+        table = replay(restore(1, 'table', CONFIG, data), [event for event in tail if isinstance(event, TableEvent)])
+        self.assertEqual(snapshot(self.table), snapshot(table))
+
+    def test_events_are_json_serializable(self):
+        for effects in play(self.engine, 2, actions=100):
+            self.events.extend(effects)
+        events = [event for event in self.events if isinstance(event, TableEvent)]
+        self.assertTrue({event.type for event in events} <= EVENT_TYPES)
+        decoded = [TableEvent(event.type, json.loads(json.dumps(event.data))) for event in events]
+        self.assertEqual(snapshot(self.table), snapshot(self.replayed(decoded)))
+
+
+class TestCollectEventStatements(TestCase):
+    def test_appends_events_and_snapshots_on_hand_start(self):
+        table = Table(1, 'table', CONFIG)
+        effects = [
+            TableEvent('hand', {'dealer': 'a', 'players': []}), HandStarted('a'),
+            TableEvent('turn', {'player': 'b', 'token': 't'})
+        ]
+        statements = collect_event_statements(table, effects)
+        self.assertEqual(3, len(statements))
+        self.assertIn('INSERT INTO events', statements[0][0])
+        self.assertEqual((1, 'hand', '{"dealer": "a", "players": []}', 1), statements[0][1])
+        self.assertIn('INTO snapshots', statements[2][0])
+        self.assertEqual(snapshot(table), json.loads(statements[2][1][1]))
+
+    def test_no_statements_without_events(self):
+        self.assertEqual([], collect_event_statements(Table(1, 'table', CONFIG), []))
@@ -0,0 +1,68 @@
+import json
+import random
+from unittest import TestCase
+
+from tornado.testing import AsyncTestCase, gen_test
+
+from pokerserver.database import TableConfig
+from pokerserver.models import MatchEngine, Player, Table, build_hand_record, to_ndjson_line
+from pokerserver.models.engine import Call, Check, Fold, HandFinished, Raise, Start, TableEvent
+from pokerserver.models.hand_history import collect_history_statements
+
+
+def play_hand():
+    config = TableConfig(min_player_count=2, max_player_count=3, small_blind=1, big_blind=2, start_balance=10)
+    players = [Player(1, position, name, 10, [], 0) for position, name in enumerate(['a', 'b', 'c'], start=1)]
+    table = Table(1, 'table', config, players=players)
+    engine = MatchEngine(table, rng=random.Random(0))
+    _, effects = engine.apply(Start('a'))
+    for action in [Call('a'), Raise('b', 4), Fold('c'), Call('a')]:
+        effects += engine.apply(action)[1]
+    while not any(isinstance(effect, HandFinished) for effect in effects):
+        effects += engine.apply(Check(table.current_player.name))[1]
+    return table, effects
+
+
+class TestBuildHandRecord(TestCase):
+    def test_record(self):
+        table, effects = play_hand()
+        events = [effect for effect in effects if isinstance(effect, TableEvent)]
+        record = build_hand_record(events[events.index(next(e for e in events if e.type == 'hand')):])
+
+        self.assertEqual('a', record['dealer'])
+        self.assertEqual(['a', 'b', 'c'], [player['name'] for player in record['players']])
+        self.assertEqual([10, 10, 10], [player['balance'] for player in record['players']])
+        self.assertTrue(all(len(player['cards']) == 2 for player in record['players']))
+        self.assertEqual(5, len(record['board']))
+        self.assertEqual([
+            {'round': 'preflop', 'player': 'b', 'action': 'blind', 'amount': 1},
+            {'round': 'preflop', 'player': 'c', 'action': 'blind', 'amount': 2},
+            {'round': 'preflop', 'player': 'a', 'action': 'call', 'amount': 2},
+            {'round': 'preflop', 'player': 'b', 'action': 'raise', 'amount': 4},
+            {'round': 'preflop', 'player': 'c', 'action': 'fold'},
+            {'round': 'preflop', 'player': 'a', 'action': 'call', 'amount': 3},
+            {'round': 'flop', 'player': 'a', 'action': 'check'},
+        ], record['actions'][:7])
+        self.assertEqual('river', record['actions'][-1]['round'])
+        self.assertEqual(12, sum(result['amount'] for result in record['results']))
+        self.assertEqual(30, sum(player.balance + player.bet for player in table.players))
+
+
+class TestCollectHistoryStatements(AsyncTestCase):
+    @gen_test
+    async def test_one_insert_per_finished_hand(self):
+        _, effects = play_hand()
+        self.assertEqual(1, sum(isinstance(effect, HandFinished) for effect in effects))
+        statements = await collect_history_statements(1, effects, 123.5)
+        self.assertEqual(1, len(statements))
+        query, (table_id, finished_at, data) = statements[0]
+        self.assertIn('INSERT INTO hand_history', query)
+        self.assertEqual((1, 123.5), (table_id, finished_at))
+        self.assertEqual('a', json.loads(data)['dealer'])
+
+
+class TestToNdjsonLine(TestCase):
+    def test_line(self):
+        line = to_ndjson_line({'hand_id': 3, 'table_id': 1, 'finished_at': 1.5, 'data': '{"dealer": "a"}'})
+        self.assertTrue(line.endswith('\n'))
+        self.assertEqual({'hand_id': 3, 'table_id': 1, 'finished_at': 1.5, 'dealer': 'a'}, json.loads(line))
@@ -0,0 +1,69 @@
+import random
+from unittest import TestCase
+
+from pokerserver.models import Leaderboard, PlayerStatistics, RankedIndex
+
+
+class TestRankedIndex(TestCase):
+    def test_matches_sorted_list(self):
+        rng = random.Random(0)
+        index = RankedIndex(rng=rng)
+        keys = []
+        for _ in range(2000):
+            if keys and rng.random() < 0.4:
+                key = rng.choice(keys)
+                keys.remove(key)
+                index.remove(key)
+            else:
+                key = rng.randint(0, 10000)
+                if key not in keys:
+                    keys.append(key)
+                index.add(key)
+            keys.sort()
+            self.assertEqual(len(keys), len(index))
+            if keys:
+                position = rng.randrange(len(keys))
+                self.assertEqual(keys[position], index[position])
+                self.assertEqual(position, index.rank(keys[position]))
+        self.assertEqual(keys, list(index))
+        self.assertEqual(keys[10:15], index.slice(10, 5))
+
+    def test_missing_keys(self):
+        index = RankedIndex()
+        index.add(1)
+        with self.assertRaises(KeyError):
+            index.remove(2)
+        with self.assertRaises(KeyError):
+            index.rank(0)
+        with self.assertRaises(IndexError):
+            index[1]  # pylint: disable=pointless-statement
+        self.assertEqual([], index.slice(1, 10))
+
+
+class TestLeaderboard(TestCase):
+    def setUp(self):
+        self.leaderboard = Leaderboard([
+            PlayerStatistics('a', 1, 40, 10),
+            PlayerStatistics('b', 4, 160, 30),
+            PlayerStatistics('c', 2, 80, 30),
+            PlayerStatistics('d', 0, 0, 0)
+        ])
+
+    def test_rank(self):
+        self.assertEqual([1, 2, 3, 4], [self.leaderboard.rank(name) for name in 'bcad'])
+        self.assertEqual([1, 2, 3, 4], [self.leaderboard.rank(name, 'gain_per_match') for name in 'cabd'])
+        with self.assertRaises(KeyError):
+            self.leaderboard.rank('unknown')
+
+    def test_page(self):
+        self.assertEqual(
+            [(2, 'c'), (3, 'a')],
+            [(rank, statistics.player_name) for rank, statistics in self.leaderboard.page('gain', 1, 2)]
+        )
+        self.assertEqual([], self.leaderboard.page('gain', 4, 2))
+
+    def test_update(self):
+        self.leaderboard.update(PlayerStatistics('d', 1, 40, 100))
+        self.assertEqual(1, self.leaderboard.rank('d'))
+        self.assertEqual(4, len(self.leaderboard))
+        self.assertEqual(['d', 'b', 'c', 'a'], [statistics.player_name for _, statistics in self.leaderboard.page()])
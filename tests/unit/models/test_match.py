@@ -1,75 +1,88 @@
+from datetime import datetime
 from unittest import TestCase
-from unittest.mock import Mock, call, patch
+from unittest.mock import Mock
 
-from nose.tools import assert_raises
-from tornado.testing import AsyncTestCase, gen_test
-
-from pokerserver.database import PlayerState, TableConfig, TableState
+from pokerserver.database import (PlayerState, PlayersRelation, TableConfig, TableState, TablesRelation,
+                                  TimersRelation)
 from pokerserver.models import Match, Player, Table
-from tests.utils import return_done_future
-
-
-@patch('pokerserver.models.player.Player.sit_down', side_effect=return_done_future())
-@patch('pokerserver.models.player.Player.load_by_name', side_effect=return_done_future(Mock()))
-@patch('pokerserver.database.tables.TablesRelation.add_joined_player', side_effect=return_done_future())
-@patch('pokerserver.models.match.Match.start', side_effect=return_done_future())
-class TestJoin(AsyncTestCase):
-    def setUp(self):
-        super().setUp()
-        self.players = [Mock(position=1)]
-        self.config = Mock(min_player_count=2, max_player_count=4, big_blind=2, small_blind=1, start_balance=10)
-        self.table = Table(1, 'table', self.config, players=self.players)
-        self.match = Match(self.table)
-
-    @gen_test
-    async def test_join_starts_game_if_not_running(self, start_mock, *_):
-        await self.match.join('horst', 2)
-        start_mock.assert_called_once_with()
-
-    @gen_test
-    async def test_join_does_not_restart_running_games(self, start_mock, *_):
-        self.table.state = TableState.RUNNING_GAME
-        await self.match.join('horst', 2)
-        start_mock.assert_not_called()
-
-
-class TestPayments(AsyncTestCase):
-    def setUp(self):
-        super().setUp()
-        self.players = [
-            Mock(
-                position=position,
-                balance=balance,
-                increase_bet=Mock(side_effect=return_done_future()),
-                all_in=Mock(side_effect=return_done_future())
-            )
-            for position, balance in [(1, 10), (2, 10), (5, 10)]
-        ]
-        self.config = Mock(min_player_count=2, max_player_count=4, big_blind=2, small_blind=1, start_balance=10)
-        self.table = Table(1, 'table', self.config, players=self.players)
-        self.table.increase_pot = Mock(side_effect=return_done_future())
-        self.match = Match(self.table)
-
-    @patch('pokerserver.models.match.Match.make_player_pay', side_effect=return_done_future())
-    @gen_test
-    async def test_pay_blinds(self, mock_make_player_pay):
-        await self.match.pay_blinds(self.players[2], self.players[0])
-        mock_make_player_pay.assert_has_calls([
-            call(self.players[2], 1),
-            call(self.players[0], 2)
+from pokerserver.models.engine import (ActivatePlayer, PlayerJoined, PlayerRemoved, PlayerUpdated, Scheduled,
+                                       StartNextHand, StatisticsIncremented, TableUpdated, TurnStarted)
+from pokerserver.models.match import (collect_statements, collect_timer_statements, decode_scheduled_action,
+                                      encode_scheduled_action)
+
+
+class TestCollectStatements(TestCase):
+    def test_merges_updates(self):
+        statements = collect_statements(1, [
+            PlayerUpdated('a', {'bet': 1}),
+            TableUpdated({'pots': [{'bets': {1: 1}}]}),
+            PlayerUpdated('b', {'bet': 2}),
+            PlayerUpdated('a', {'bet': 3, 'state': PlayerState.ALL_IN}),
+            TableUpdated({'pots': [{'bets': {1: 3}}], 'dealer': 'a'})
         ])
-
-    @gen_test
-    async def test_make_player_pay(self):
-        await self.match.make_player_pay(self.players[2], 5)
-        self.players[2].increase_bet.assert_called_once_with(5)
-        self.players[2].all_in.assert_not_called()
-        self.table.increase_pot.assert_called_once_with(5, 5)
-
-    @gen_test
-    async def test_make_player_pay_negative_amount(self):
-        with assert_raises(AssertionError):
-            await self.match.make_player_pay(self.players[2], -5)
+        self.assertEqual([
+            ('UPDATE players SET bet = ?, state = ? WHERE name = ? AND table_id = ?', (3, 'all in', 'a', 1)),
+            ('UPDATE players SET bet = ? WHERE name = ? AND table_id = ?', (2, 'b', 1)),
+            ('UPDATE tables SET dealer = ?, pots = ? WHERE table_id = ?', ('a', '1:3', 1))
+        ], statements)
+
+    def test_inserts_and_deletes(self):
+        last_seen = datetime(2017, 1, 1)
+        statements = collect_statements(1, [
+            PlayerUpdated('a', {'balance': 10}),
+            PlayerRemoved('a', 2),
+            PlayerJoined({
+                'table_id': 1, 'position': 3, 'name': 'b', 'balance': 10, 'cards': [], 'bet': 0,
+                'last_seen': last_seen, 'state': PlayerState.SITTING_OUT
+            }),
+            PlayerUpdated('b', {'state': PlayerState.PLAYING})
+        ])
+        self.assertEqual([
+            PlayersRelation.delete_statement(1, 2),
+            PlayersRelation.insert_statement(1, 3, 'b', 10, [], 0, last_seen, PlayerState.SITTING_OUT),
+            TablesRelation.add_joined_player_statement(1, 'b'),
+            ('UPDATE players SET state = ? WHERE name = ? AND table_id = ?', ('playing', 'b', 1))
+        ], statements)
+
+    def test_no_effects(self):
+        self.assertEqual([], collect_statements(1, [StatisticsIncremented('a', 1, 10, 0)]))
+
+
+class TestCollectTimerStatements(TestCase):
+    def test_turn_timeout(self):
+        statements = collect_timer_statements(1, [TurnStarted('a', 'token')], timeout=5, now=100)
+        self.assertEqual([
+            TimersRelation.set_statement(1, TimersRelation.TURN_TIMEOUT, 105, 'kick', 'a', 'token')
+        ], statements)
+
+    def test_without_timeout(self):
+        self.assertEqual([], collect_timer_statements(1, [TurnStarted('a', 'token')], timeout=None, now=100))
+
+    def test_finished_timer_is_replaced(self):
+        statements = collect_timer_statements(
+            1, [TurnStarted('b', 'token')], timeout=5, now=100, finished_timer=TimersRelation.TURN_TIMEOUT)
+        self.assertEqual([
+            TimersRelation.set_statement(1, TimersRelation.TURN_TIMEOUT, 105, 'kick', 'b', 'token')
+        ], statements)
+
+    def test_finished_timer_is_deleted(self):
+        statements = collect_timer_statements(
+            1, [Scheduled(2, ActivatePlayer('b'))], timeout=5, now=100, finished_timer=TimersRelation.TURN_TIMEOUT)
+        self.assertEqual([
+            TimersRelation.delete_statement(1, TimersRelation.TURN_TIMEOUT),
+            TimersRelation.set_statement(1, TimersRelation.SCHEDULED, 102, 'activate player', 'b')
+        ], statements)
+
+    def test_closed_table(self):
+        statements = collect_timer_statements(1, [
+            TurnStarted('a', 'token'),
+            TableUpdated({'state': TableState.CLOSED})
+        ], timeout=5, now=100, finished_timer=TimersRelation.SCHEDULED)
+        self.assertEqual([TimersRelation.delete_by_table_statement(1)], statements)
+
+    def test_encode_scheduled_actions(self):
+        for action in [ActivatePlayer('a'), StartNextHand()]:
+            self.assertEqual(action, decode_scheduled_action(*encode_scheduled_action(action)))
 
 
 class TestFindNextPlayer(TestCase):
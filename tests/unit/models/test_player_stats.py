@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from pokerserver.models import PlayerStatsAggregator, to_rates
+from pokerserver.models.engine import HandFinished, TableEvent
+
+
+def hand(*players):
+    return TableEvent('hand', {'dealer': players[0], 'players': [
+        {'name': name, 'position': position, 'balance': 10} for position, name in enumerate(players, start=1)
+    ]})
+
+
+def bet(player, action='call'):
+    return TableEvent('bet', {'player': player, 'amount': 2, 'action': action})
+
+
+class TestPlayerStatsAggregator(TestCase):
+    def setUp(self):
+        self.aggregator = PlayerStatsAggregator()
+
+    def test_vpip_pfr_and_showdown(self):
+        self.aggregator.observe(1, [
+            hand('a', 'b', 'c'),
+            TableEvent('blind', {'player': 'b', 'amount': 1}),
+            TableEvent('blind', {'player': 'c', 'amount': 2}),
+            bet('a', 'raise'), bet('b'), TableEvent('fold', {'player': 'c'}),
+            TableEvent('draw', {'cards': ['2s', '3s', '4s']}),
+            bet('a', 'raise'), bet('b'),
+        ])
+        self.assertEqual({}, self.aggregator.pending('a'))
+        self.aggregator.observe(1, [TableEvent('payout', {'player': 'b', 'amount': 11}), HandFinished()])
+
+        self.assertEqual(
+            {'hands': 1, 'vpip_hands': 1, 'pfr_hands': 1, 'showdowns': 1, 'showdown_wins': 0},
+            self.aggregator.pending('a'))
+        self.assertEqual(
+            {'hands': 1, 'vpip_hands': 1, 'pfr_hands': 0, 'showdowns': 1, 'showdown_wins': 1},
+            self.aggregator.pending('b'))
+        self.assertEqual(
+            {'hands': 1, 'vpip_hands': 0, 'pfr_hands': 0, 'showdowns': 0, 'showdown_wins': 0},
+            self.aggregator.pending('c'))
+
+    def test_hand_without_showdown(self):
+        self.aggregator.observe(1, [
+            hand('a', 'b'), bet('a', 'raise'), TableEvent('fold', {'player': 'b'}),
+            TableEvent('payout', {'player': 'a', 'amount': 5}), HandFinished(),
+            hand('b', 'a')
+        ])
+        self.assertEqual(0, self.aggregator.pending('a')['showdowns'])
+        self.assertEqual(1, self.aggregator.pending('b')['hands'])
+
+    def test_hands_running_at_startup_are_ignored(self):
+        self.aggregator.observe(1, [bet('a'), HandFinished()])
+        self.aggregator.observe(2, [hand('a', 'b'), HandFinished()])
+        self.assertEqual(1, self.aggregator.pending('a')['hands'])
+
+
+class TestToRates(TestCase):
+    def test_rates(self):
+        rates = to_rates({'hands': 4, 'vpip_hands': 2, 'pfr_hands': 1, 'showdowns': 0, 'showdown_wins': 0})
+        self.assertEqual((0.5, 0.25, 0.0), (rates['vpip'], rates['pfr'], rates['showdown_win_rate']))
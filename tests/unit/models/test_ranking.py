@@ -1,9 +1,10 @@
 from unittest import TestCase
 from unittest.mock import Mock
 
-from pokerserver.models import (determine_winning_players, find_flush, find_full_house, find_high_card,
-                                find_n_of_a_kind,
-                                find_straight, find_straight_flush, find_two_pairs, parse_card, rank as rank_function)
+from pokerserver.applications.benchmark_ranking import generate_hands
+from pokerserver.models import (combine_suit_masks, determine_winning_players, evaluate, find_flush, find_full_house,
+                                find_high_card, find_n_of_a_kind, find_straight, find_straight_flush, find_two_pairs,
+                                parse_card, rank as rank_function, rank_suit_masks, to_suit_masks)
 
 
 def parse_cards(card_strings):
@@ -116,6 +117,10 @@ class TestFindFullHouse(TestCase):
         cards = parse_cards(['10d', '10s', '3d', 'Qd', '3h', '3c', 'Qs'])
         self.assertEqual([3, 12], find_full_house(cards))
 
+    def test_two_triples(self):
+        cards = parse_cards(['10d', '10s', '3d', '10h', '3h', '3c', 'Qs'])
+        self.assertEqual([10, 3], find_full_house(cards))
+
 
 class TestFindStraightFlush(TestCase):
     def test_no_flush(self):
@@ -189,3 +194,23 @@ class TestRanking(TestCase):
 
         winning_players = determine_winning_players(active_players, open_cards)
         self.assertEqual(set(active_players), set(winning_players))
+
+
+class TestEvaluate(TestCase):
+    def test_same_result_as_rank(self):
+        for (size, category), hands in generate_hands(seed=42, hands_per_category=20).items():
+            for cards in hands:
+                with self.subTest(size=size, category=category, cards=cards):
+                    self.assertEqual(rank_function(cards), evaluate(cards))
+
+    def test_less_than_five_cards(self):
+        self.assertEqual((0, [13, 2]), evaluate(['Kc', '2c']))
+        self.assertEqual((1, [13, 2]), evaluate(['Kc', 'Kd', '2c']))
+
+    def test_low_ace_straight_flush(self):
+        self.assertEqual((8, 5), evaluate(['2d', '3d', '4d', '5d', '6c', '7c', 'Ad']))
+
+    def test_combine_suit_masks(self):
+        masks = combine_suit_masks(to_suit_masks(['Ah', 'Kh']), to_suit_masks(['Qh', 'Jh', '10h', '2c']))
+        self.assertEqual(to_suit_masks(['Ah', 'Kh', 'Qh', 'Jh', '10h', '2c']), masks)
+        self.assertEqual((8, 14), rank_suit_masks(masks))
@@ -0,0 +1,23 @@
+from unittest import TestCase
+
+from pokerserver.database import StatisticsRollupsRelation
+from pokerserver.models.rollups import RESOLUTIONS, WINDOWS, bucket_start, increment_statements
+
+
+class TestRollups(TestCase):
+    def test_bucket_start(self):
+        self.assertEqual(120, bucket_start(179.9, 60))
+        self.assertEqual(180, bucket_start(180, 60))
+        self.assertEqual(0, bucket_start(3599, 3600))
+
+    def test_resolutions_get_coarser(self):
+        for fine, coarse in zip(RESOLUTIONS, RESOLUTIONS[1:]):
+            self.assertEqual(0, coarse.seconds % fine.seconds)
+            self.assertGreaterEqual(fine.retention, coarse.seconds)
+        self.assertEqual({'minute': 60, 'hour': 3600, 'day': 86400}, WINDOWS)
+
+    def test_increment_statements_use_minute_buckets(self):
+        self.assertEqual(
+            StatisticsRollupsRelation.increment_statements(60, 600, 'player', 1, 2, 3),
+            increment_statements('player', 1, 2, 3, 659.5)
+        )
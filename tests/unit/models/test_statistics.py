@@ -1,7 +1,9 @@
-from unittest.mock import patch
+from asyncio import Future, ensure_future, sleep
+from unittest.mock import Mock, patch
 
 from tornado.testing import AsyncTestCase, gen_test
 
+from pokerserver.database import StatisticsRelation, StatisticsRollupsRelation
 from pokerserver.models import PlayerStatistics, Statistics
 from tests.utils import return_done_future
 
@@ -9,10 +11,20 @@ from tests.utils import return_done_future
 class TestStatistics(AsyncTestCase):
     def setUp(self):
         super().setUp()
+        Statistics.clear_leaderboard()
         self.player_statistics = [
             PlayerStatistics('player {}'.format(index + 1), index + 1, index + 11, index + 21) for index in range(3)
         ]
         self.statistics = Statistics(self.player_statistics)
+        self.batches = []
+
+        async def execute_batch(statements):
+            self.batches.append(statements)
+
+        database_patch = patch('pokerserver.models.statistics.Database.instance',
+                               return_value=Mock(execute_batch=execute_batch))
+        database_patch.start()
+        self.addCleanup(database_patch.stop)
 
     def test_to_dict(self):
         result = self.statistics.to_dict()
@@ -46,9 +58,65 @@ class TestStatistics(AsyncTestCase):
         await Statistics.init_statistics('player xyz')
         init_statistics_mock.assert_called_once_with('player xyz')
 
-    @patch('pokerserver.database.statistics.StatisticsRelation.increment_statistics',
-           side_effect=return_done_future([]))
     @gen_test
-    async def test_increment_statistics(self, increment_statistics_mock):
+    async def test_increment_statistics(self):
         await Statistics.increment_statistics('player xyz', 1, 2, 3)
-        increment_statistics_mock.assert_called_once_with('player xyz', 1, 2, 3)
+        self.assertEqual(1, len(self.batches))
+        queries = [query for query, _ in self.batches[0]]
+        self.assertIn(StatisticsRelation.INCREMENT_STATS_QUERY, queries)
+        self.assertIn(StatisticsRollupsRelation.INCREMENT_QUERY, queries)
+        self.assertTrue(all('player xyz' in args for _, args in self.batches[0]))
+
+    @gen_test
+    async def test_execute_batch(self):
+        statement = ('UPDATE tables SET round = ?', ('river',))
+        await Statistics.execute_batch([statement], [('player 1', 1, 10, 5), ('player 2', 1, 10, -5)])
+        self.assertEqual(1, len(self.batches))
+        self.assertEqual(statement, self.batches[0][0])
+        queries = [query for query, _ in self.batches[0]]
+        self.assertEqual(2, queries.count(StatisticsRelation.INCREMENT_STATS_QUERY))
+        self.assertEqual(2, queries.count(StatisticsRollupsRelation.INCREMENT_QUERY))
+
+    @gen_test
+    async def test_increment_statistics_updates_leaderboard(self):
+        calls = []
+
+        async def load_all():
+            calls.append(None)
+            return [{'player_name': 'player 1', 'matches': 1, 'buy_in': 40, 'gain': 10}]
+
+        with patch('pokerserver.database.statistics.StatisticsRelation.load_all', new=load_all):
+            leaderboard = await Statistics.leaderboard()
+            self.assertIs(leaderboard, await Statistics.leaderboard())
+        self.assertEqual(1, len(calls))
+
+        await Statistics.increment_statistics('player 1', 1, 40, 5)
+        await Statistics.increment_statistics('player 2', 1, 40, 20)
+        self.assertEqual(15, leaderboard.get('player 1').gain)
+        self.assertEqual(2, leaderboard.get('player 1').matches)
+        self.assertEqual(1, leaderboard.rank('player 2'))
+
+    @gen_test
+    async def test_leaderboard_waits_for_running_increments(self):
+        written = Future()
+        rows = {'player_name': 'player 1', 'matches': 0, 'buy_in': 0, 'gain': 0}
+
+        async def execute_batch(_):
+            rows['gain'] += 5
+            await written
+
+        async def load_all():
+            return [dict(rows)]
+
+        with patch('pokerserver.models.statistics.Database.instance', return_value=Mock(execute_batch=execute_batch)), \
+                patch('pokerserver.database.statistics.StatisticsRelation.load_all', new=load_all):
+            increment = ensure_future(Statistics.increment_statistics('player 1', 0, 0, 5))
+            await sleep(0)
+            loading = ensure_future(Statistics.leaderboard())
+            await sleep(0)
+            self.assertFalse(loading.done())
+            written.set_result(None)
+            await increment
+            leaderboard = await loading
+            await Statistics.increment_statistics('player 1', 0, 0, 5)
+        self.assertEqual(10, leaderboard.get('player 1').gain)
@@ -1,12 +1,12 @@
 from unittest import TestCase
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 
 from nose.tools import assert_equal
 from tornado.testing import AsyncTestCase, gen_test
 
 from pokerserver.database import PlayerState, TableConfig
 from pokerserver.database import TableState
-from pokerserver.models import Player, Pot, Table
+from pokerserver.models import HandRankCache, Player, Pot, Table, rank, rank_suit_masks, to_suit_masks
 from tests.utils import return_done_future
 
 
@@ -17,6 +17,7 @@ class TestTable(AsyncTestCase):
             Mock(
                 position=position,
                 balance=balance,
+                cards=[],
                 is_all_in=Mock(return_value=False),
                 to_dict=Mock(return_value={})
             )
@@ -313,6 +314,98 @@ class TestTable(AsyncTestCase):
         create_tables.assert_called_once_with(5, config)
 
 
+class TestHandTracking(AsyncTestCase):
+    def setUp(self):
+        super().setUp()
+        HandRankCache.clear()
+        self.players = [
+            Player(42, 1, 'a', 10, ['Ah', 'Ac'], 0),
+            Player(42, 2, 'b', 10, ['Kh', 'Qh'], 0),
+            Player(42, 3, 'c', 10, ['7d', '2s'], 0, state=PlayerState.FOLDED)
+        ]
+        self.table = Table(
+            42, 'Table1',
+            TableConfig(min_player_count=2, max_player_count=8, small_blind=1, big_blind=2, start_balance=10),
+            players=self.players, remaining_deck=['9h', '3h', 'Jh', '10h', '3d']
+        )
+
+    def test_preflop(self):
+        self.assertEqual('pair', self.table.hand_category(self.players[0]))
+        self.assertEqual('high card', self.table.hand_category(self.players[1]))
+        self.assertIsNone(self.table.hand_category(Player(42, 4, 'd', 10, [], 0)))
+
+    @patch('pokerserver.database.tables.TablesRelation.set_cards', side_effect=return_done_future())
+    @gen_test
+    async def test_draw_cards_updates_ranks(self, _):
+        await self.table.draw_cards(3)
+        self.assertEqual(to_suit_masks(['Jh', '10h', '3d']), self.table.board_masks)
+        self.assertEqual('pair', self.table.hand_category(self.players[0]))
+        self.assertEqual('high card', self.table.hand_category(self.players[1]))
+
+        await self.table.draw_cards(1)
+        self.assertEqual('two pairs', self.table.hand_category(self.players[0]))
+        self.assertEqual('flush', self.table.hand_category(self.players[1]))
+
+        await self.table.draw_cards(1)
+        cards = self.table.open_cards
+        for player in self.players:
+            self.assertEqual(rank(player.cards + cards), self.table.hand_rank(player))
+        self.assertEqual('straight flush', self.table.hand_category(self.players[1]))
+        self.assertEqual([self.players[1]], self.table.determine_winning_players(self.players[:2]))
+
+    @patch('pokerserver.database.tables.TablesRelation.set_cards', side_effect=return_done_future())
+    @gen_test
+    async def test_ranks_are_shared_by_loaded_tables(self, _):
+        await self.table.draw_cards(3)
+        reloaded_table = Table(42, 'Table1', self.table.config, players=self.players, open_cards=self.table.open_cards)
+        with patch('pokerserver.models.table.rank_suit_masks', wraps=rank_suit_masks) as rank_mock:
+            self.assertEqual('pair', reloaded_table.hand_category(self.players[0]))
+            rank_mock.assert_not_called()
+            # Folded players are not ranked when the cards are drawn.
+            reloaded_table.hand_rank(self.players[2])
+            rank_mock.assert_called_once_with(ANY)
+
+    def test_set_open_cards_resets_ranks(self):
+        self.assertEqual('pair', self.table.hand_category(self.players[0]))
+        self.table.open_cards = ['As', '2c', '7h']
+        self.assertEqual('three of a kind', self.table.hand_category(self.players[0]))
+
+    def test_changed_hole_cards(self):
+        self.assertEqual('pair', self.table.hand_category(self.players[0]))
+        self.players[0].cards = ['2c', '5d']
+        self.assertEqual('high card', self.table.hand_category(self.players[0]))
+
+    def test_to_dict_contains_own_hand(self):
+        players = self.table.to_dict('a')['players']
+        self.assertEqual('pair', players[0]['hand'])
+        self.assertNotIn('hand', players[1])
+
+
+class TestTurnOptions(TestCase):
+    def setUp(self):
+        self.players = [Player(42, 1, 'player1', 10, [], 2), Player(42, 2, 'player2', 10, [], 5)]
+        config = TableConfig(min_player_count=2, max_player_count=3, small_blind=1, big_blind=2, start_balance=10)
+        self.table = Table(42, 'table', config, players=self.players, current_player=self.players[0])
+
+    def test_call_and_raise(self):
+        self.assertEqual({'actions': ['fold', 'call', 'raise'], 'call_amount': 3, 'min_raise': 4, 'max_raise': 10},
+                         self.table.turn_options(self.players[0]))
+
+    def test_check(self):
+        self.assertEqual({'actions': ['fold', 'check', 'raise'], 'call_amount': 0, 'min_raise': 1, 'max_raise': 10},
+                         self.table.turn_options(self.players[1]))
+
+    def test_call_all_in(self):
+        self.players[0].balance = 3
+        self.assertEqual({'actions': ['fold', 'call'], 'call_amount': 3, 'min_raise': None, 'max_raise': None},
+                         self.table.turn_options(self.players[0]))
+
+    def test_to_dict_of_current_player(self):
+        self.assertEqual(self.table.turn_options(self.players[0]), self.table.to_dict('player1')['turn'])
+        self.assertNotIn('turn', self.table.to_dict('player2'))
+        self.assertNotIn('turn', self.table.to_dict(None))
+
+
 class TestPot(TestCase):
     def setUp(self):
         self.pot = Pot(bets={1: 1, 2: 2, 3: 0})
@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from pokerserver.models import TableEvent, TableFeed, events_for_viewer
+from pokerserver.models.engine import TableUpdated
+
+
+class TestTableFeed(TestCase):
+    def setUp(self):
+        self.feed = TableFeed()
+        self.published = []
+
+    def callback(self, version, events):
+        self.published.append((version, events))
+
+    def test_publish_table_events(self):
+        self.feed.subscribe('table', self.callback)
+        event = TableEvent('check', {'player': 'a'})
+        self.feed.publish('table', 3, [TableUpdated({}), event])
+        self.feed.publish('table', 4, [TableUpdated({})])
+        self.feed.publish('other table', 5, [event])
+        self.assertEqual([(3, [event])], self.published)
+
+        self.feed.unsubscribe('table', self.callback)
+        self.feed.publish('table', 6, [event])
+        self.assertEqual(1, len(self.published))
+        self.assertEqual(0, self.feed.subscriber_count('table'))
+
+    def test_failing_subscriber(self):
+        def fail(*_):
+            raise RuntimeError()
+
+        self.feed.subscribe('table', fail)
+        self.feed.subscribe('table', self.callback)
+        self.feed.publish('table', 1, [TableEvent('start', {})])
+        self.assertEqual(1, len(self.published))
+
+    def test_events_for_viewer(self):
+        events = [
+            TableEvent('deal', {'cards': {'a': ['As', 'Ah'], 'b': ['2c', '2d']}, 'deck': ['3c']}),
+            TableEvent('turn', {'player': 'a', 'token': 'token'})
+        ]
+        self.assertEqual([
+            {'type': 'deal', 'data': {'cards': {'a': ['As', 'Ah']}}},
+            {'type': 'turn', 'data': {'player': 'a'}},
+            {'type': 'your_turn', 'data': {'token': 'token'}}
+        ], events_for_viewer(events, 'a'))
+        self.assertEqual([
+            {'type': 'deal', 'data': {'cards': {}}},
+            {'type': 'turn', 'data': {'player': 'a'}}
+        ], events_for_viewer(events))
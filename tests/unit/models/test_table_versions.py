@@ -0,0 +1,38 @@
+from asyncio import sleep
+
+from tornado.testing import AsyncTestCase, gen_test
+
+from pokerserver.models import TableVersions
+
+
+class TestTableVersions(AsyncTestCase):
+    def setUp(self):
+        super().setUp()
+        self.versions = TableVersions()
+
+    def test_bump(self):
+        self.assertEqual(0, self.versions.get('table'))
+        self.assertEqual(1, self.versions.bump('table'))
+        self.assertEqual(2, self.versions.bump('table'))
+        self.assertEqual(0, self.versions.get('other table'))
+
+    @gen_test
+    async def test_wait_returns_immediately_for_other_version(self):
+        self.versions.bump('table')
+        self.assertEqual(1, await self.versions.wait('table', 0, timeout=10))
+        self.assertEqual(1, await self.versions.wait('table', 5, timeout=10))
+
+    @gen_test
+    async def test_wait_for_bump(self):
+        async def bump_later():
+            await sleep(0.01)
+            self.versions.bump('table')
+
+        self.io_loop.asyncio_loop.create_task(bump_later())
+        self.assertEqual(1, await self.versions.wait('table', 0, timeout=10))
+        self.assertEqual({}, self.versions._waiters)  # pylint: disable=protected-access
+
+    @gen_test
+    async def test_wait_timeout(self):
+        self.assertEqual(0, await self.versions.wait('table', 0, timeout=0.01))
+        self.assertEqual({}, self.versions._waiters)  # pylint: disable=protected-access
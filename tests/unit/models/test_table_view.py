@@ -0,0 +1,111 @@
+from asyncio import Future, ensure_future, gather, sleep
+import json
+from unittest import TestCase
+from unittest.mock import patch
+
+from tornado.testing import AsyncTestCase, gen_test
+
+from pokerserver.database import TableConfig
+from pokerserver.client.base import apply_patch
+from pokerserver.models import Player, Table, TableNotFoundError, TableView, TableViews
+
+
+class TestTableView(TestCase):
+    def setUp(self):
+        players = [
+            Player(42, 1, 'player1', 10, ['Ah', 'Ac'], 0),
+            Player(42, 2, 'player2', 10, ['Kh', 'Kc'], 0)
+        ]
+        config = TableConfig(min_player_count=2, max_player_count=3, small_blind=1, big_blind=2, start_balance=10)
+        self.table = Table(42, 'table', config, players=players, open_cards=['2s', '3s', '4s'])
+        self.view = TableView(self.table, 7, 'abc')
+
+    def test_encode_equals_to_dict(self):
+        for viewer in ['player1', 'player2', 'player3', None]:
+            self.assertEqual(dict(self.table.to_dict(viewer), version=7, epoch='abc'),
+                             json.loads(self.view.encode(viewer).decode()))
+
+    def test_only_viewer_sees_cards(self):
+        players = json.loads(self.view.encode('player2').decode())['players']
+        self.assertEqual([[], ['Kh', 'Kc']], [player['cards'] for player in players])
+        self.assertEqual('pair', players[1]['hand'])
+
+    def test_diff(self):
+        players = [
+            Player(42, 1, 'player1', 8, ['Ah', 'Ac'], 2),
+            Player(42, 2, 'player2', 10, ['Qh', 'Qc'], 0)
+        ]
+        table = Table(42, 'table', self.table.config, players=players, open_cards=['2s', '3s', '4s', '5s'])
+        view = TableView(table, 8, 'abc')
+        for viewer in ['player1', 'player2', 'player3', None]:
+            old = json.loads(self.view.encode(viewer).decode())
+            self.assertEqual(json.loads(view.encode(viewer).decode()), apply_patch(old, view.diff(self.view, viewer)))
+        self.assertNotIn('/players/1', [operation['path'] for operation in view.diff(self.view, 'player1')])
+
+    def test_diff_players_changed(self):
+        table = Table(42, 'table', self.table.config, players=self.table.players[:1])
+        view = TableView(table, 8, 'abc')
+        for viewer in ['player1', 'player2', None]:
+            old = json.loads(self.view.encode(viewer).decode())
+            self.assertEqual(json.loads(view.encode(viewer).decode()), apply_patch(old, view.diff(self.view, viewer)))
+
+    def test_diff_turn(self):
+        self.table.current_player = self.table.players[0]
+        view = TableView(self.table, 8, 'abc')
+        self.assertEqual(dict(self.table.to_dict('player1'), version=8, epoch='abc'),
+                         json.loads(view.encode('player1').decode()))
+        for old_view, new_view in [(self.view, view), (view, self.view)]:
+            for viewer in ['player1', 'player2']:
+                old = json.loads(old_view.encode(viewer).decode())
+                self.assertEqual(json.loads(new_view.encode(viewer).decode()),
+                                 apply_patch(old, new_view.diff(old_view, viewer)))
+
+    def test_views(self):
+        views = TableViews()
+        views.put('table', self.view)
+        self.assertIs(self.view, views.get('table', 7))
+        self.assertIsNone(views.get('table', 8))
+        self.assertIsNone(views.get('other table', 7))
+
+    def test_views_history(self):
+        views = TableViews()
+        for version in range(TableViews.HISTORY_SIZE + 1):
+            views.put('table', TableView(self.table, version, 'abc'))
+        self.assertIsNone(views.get('table', 0))
+        self.assertEqual(1, views.get('table', 1).version)
+
+    def test_views_keep_first_view_of_version(self):
+        views = TableViews()
+        views.put('table', self.view)
+        self.assertIs(self.view, views.put('table', TableView(self.table, 7, 'abc')))
+        self.assertIs(self.view, views.get('table', 7))
+
+
+class TestTableViewsLoad(AsyncTestCase):
+    @gen_test
+    async def test_concurrent_loads_are_shared(self):
+        views = TableViews()
+        loaded = Future()
+        table = Table(42, 'table', TableConfig(2, 3, 1, 2, 10))
+        calls = []
+
+        async def load_by_name(name):
+            calls.append(name)
+            return await loaded
+
+        with patch('pokerserver.models.table_view.Table.load_by_name', new=load_by_name):
+            waiting = [ensure_future(views.load('table', 3)) for _ in range(5)]
+            await sleep(0)
+            loaded.set_result(table)
+            results = await gather(*waiting)
+            self.assertIs(results[0], await views.load('table', 3))
+        self.assertEqual(['table'], calls)
+        self.assertTrue(all(view is results[0] for view in results))
+
+    @gen_test
+    async def test_failed_load(self):
+        views = TableViews()
+        with patch('pokerserver.models.table_view.Table.load_by_name', side_effect=TableNotFoundError()):
+            for _ in range(2):
+                with self.assertRaises(TableNotFoundError):
+                    await views.load('table', 3)
@@ -0,0 +1,112 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import Mock
+
+from tornado.testing import AsyncTestCase, gen_test
+
+from pokerserver.models import TimerWheel
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTimerWheel(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.wheel = TimerWheel(resolution=1, slots=4, levels=3, clock=self.clock)
+        self.wheel._ensure_running = Mock()  # pylint: disable=protected-access
+
+    def advance_to(self, now):
+        self.clock.now = now
+        return self.wheel.advance()
+
+    def test_fires_after_delay(self):
+        callback = Mock(return_value=None)
+        self.wheel.register('table', 2, callback)
+        self.assertEqual(0, self.advance_to(1.5))
+        callback.assert_not_called()
+        self.assertEqual(1, self.advance_to(2))
+        callback.assert_called_once_with()
+        self.assertNotIn('table', self.wheel)
+
+    def test_cascades_to_lower_levels(self):
+        fired = []
+        for delay in (1, 3, 5, 13, 40, 100):
+            self.wheel.register(delay, delay, lambda delay=delay: fired.append((delay, self.clock.now)))
+        for now in range(1, 101):
+            self.advance_to(now)
+        self.assertEqual([(1, 1), (3, 3), (5, 5), (13, 13), (40, 40), (100, 100)], fired)
+
+    def test_register_replaces_timer(self):
+        first, second = Mock(return_value=None), Mock(return_value=None)
+        self.wheel.register('table', 1, first)
+        self.wheel.register('table', 3, second)
+        self.assertEqual(1, len(self.wheel))
+        self.advance_to(5)
+        first.assert_not_called()
+        second.assert_called_once_with()
+
+    def test_cancel(self):
+        callback = Mock(return_value=None)
+        self.wheel.register('table', 10, callback)
+        self.assertTrue(self.wheel.cancel('table'))
+        self.assertFalse(self.wheel.cancel('table'))
+        self.advance_to(20)
+        callback.assert_not_called()
+
+    def test_deadline(self):
+        self.clock.now = 0.5
+        self.wheel.register('table', 2, Mock())
+        self.assertEqual(3, self.wheel.deadline('table'))
+        self.assertIsNone(self.wheel.deadline('other table'))
+
+    def test_realigns_after_idle_period(self):
+        callback = Mock(return_value=None)
+        self.clock.now = 1000
+        self.wheel.register('table', 2, callback)
+        self.assertEqual(0, self.advance_to(1001))
+        self.assertEqual(1, self.advance_to(1002))
+
+    def test_failing_callback_does_not_stop_the_wheel(self):
+        callback = Mock(return_value=None)
+        self.wheel.register('a', 1, Mock(side_effect=ValueError))
+        self.wheel.register('b', 1, callback)
+        self.assertEqual(2, self.advance_to(1))
+        callback.assert_called_once_with()
+
+    def test_metrics(self):
+        self.wheel.register('a', 1, Mock(return_value=None))
+        self.wheel.register('b', 10, Mock(return_value=None))
+        self.wheel.register('c', 10, Mock(return_value=None))
+        self.wheel.cancel('c')
+        self.advance_to(1)
+        metrics = self.wheel.metrics()
+        self.assertEqual(1, metrics['active'])
+        self.assertEqual(3, metrics['registered'])
+        self.assertEqual(1, metrics['cancelled'])
+        self.assertEqual(1, metrics['fired'])
+        self.assertEqual([0, 1, 0], metrics['levels'])
+
+
+class TestTimerWheelLoop(AsyncTestCase):
+    def tearDown(self):
+        TimerWheel.clear()
+        super().tearDown()
+
+    @gen_test
+    async def test_ticks_on_event_loop(self):
+        wheel = TimerWheel.create(resolution=0.001)
+        done = asyncio.Future()
+
+        async def callback():
+            done.set_result(True)
+
+        wheel.register('table', 0.005, callback)
+        self.assertTrue(await asyncio.wait_for(done, 1))
+        self.assertGreater(wheel.metrics()['ticks'], 0)
+        self.assertIsNone(wheel._handle)  # pylint: disable=protected-access
@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+from pokerserver.client import Table
+from pokerserver.models.engine import Call, Fold, Raise
+from pokerserver.simulator import (calling_strategy, load_strategy, random_strategy, simulate, simulate_table,
+                                   summarize, to_action)
+
+
+def always_raise(table, position):
+    return 'raise', 10000
+
+
+class TestStrategies(TestCase):
+    def setUp(self):
+        self.table = Table('table 1', 'player', [
+            {'name': 'player', 'position': 1, 'balance': 10, 'bet': 1, 'cards': ['Ah', 'Ad'], 'state': 'playing',
+             'table_id': 1},
+            {'name': 'other', 'position': 2, 'balance': 10, 'bet': 4, 'cards': [], 'state': 'playing', 'table_id': 1}
+        ], round='preflop')
+
+    def test_calling_strategy(self):
+        self.assertEqual('call', calling_strategy(self.table, 1))
+        self.assertEqual('check', calling_strategy(self.table, 2))
+
+    def test_random_strategy_raises_valid_amounts(self):
+        for _ in range(100):
+            decision = random_strategy(self.table, 1)
+            if decision not in ('fold', 'call'):
+                self.assertEqual('raise', decision[0])
+                self.assertTrue(4 <= decision[1] <= 10)
+
+    def test_load_strategy(self):
+        self.assertIs(calling_strategy, load_strategy('calling'))
+        self.assertIs(always_raise, load_strategy('tests.unit.test_simulator:always_raise'))
+        with self.assertRaises(ValueError):
+            load_strategy('unknown')
+
+    def test_to_action(self):
+        self.assertEqual(Fold('player'), to_action('player', 'fold'))
+        self.assertEqual(Call('player'), to_action('player', 'call'))
+        self.assertEqual(Raise('player', 5), to_action('player', ('raise', 5)))
+        with self.assertRaises(ValueError):
+            to_action('player', 'all in')
+
+
+class TestSimulator(TestCase):
+    def test_simulate_table(self):
+        result = simulate_table(['simple', 'calling', 'random'], seed=1, start_balance=20)
+        self.assertLessEqual(result.hands, 1000)
+        self.assertEqual(0, result.invalid_actions)
+        self.assertEqual(0, sum(result.gains.values()))
+        self.assertEqual(result, simulate_table(['simple', 'calling', 'random'], seed=1, start_balance=20))
+
+    def test_invalid_decisions_fold(self):
+        result = simulate_table(['tests.unit.test_simulator:always_raise', 'calling'], seed=1, max_hands=10)
+        self.assertGreater(result.invalid_actions, 0)
+        self.assertEqual(0, sum(result.gains.values()))
+
+    def test_max_hands(self):
+        result = simulate_table(['calling', 'calling'], seed=1, start_balance=1000, max_hands=3)
+        self.assertEqual(3, result.hands)
+
+    def test_simulate_rotates_seats(self):
+        results = simulate(['simple', 'calling'], tables=4, seed=2, processes=1, max_hands=20)
+        self.assertEqual([['simple', 'calling'], ['calling', 'simple']] * 2,
+                         [result.strategies for result in results])
+        self.assertEqual(['0', '1', '2', '3'], [result.seed.split(':')[1] for result in results])
+
+    def test_summarize(self):
+        results = simulate(['simple', 'calling'], tables=4, seed=2, processes=1, max_hands=20)
+        summary = summarize(results)
+        self.assertEqual(4, summary['tables'])
+        self.assertEqual(sum(result.hands for result in results), summary['hands'])
+        self.assertEqual({'simple', 'calling'}, set(summary['strategies']))
+        self.assertEqual(4, summary['strategies']['simple']['seats'])
+        self.assertEqual(0, sum(strategy['gain'] for strategy in summary['strategies'].values()))
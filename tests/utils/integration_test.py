@@ -10,9 +10,11 @@ from tornado.testing import AsyncHTTPTestCase, AsyncTestCase
 from tornado.web import Application
 
 from pokerserver.configuration import ServerConfig
-from pokerserver.controllers import HANDLERS
+from pokerserver.controllers import HANDLERS, UUIDCache
+from pokerserver.controllers.frontend import SpectatorBroadcast
 from pokerserver.database import Database, PlayersRelation, TableConfig, TableState, TablesRelation, create_relations
-from pokerserver.models import Pot, Table
+from pokerserver.models import (HandRankCache, Matchmaker, PlayerStatsAggregator, Pot, Statistics, Table, TableFeed,
+                                TableIndex, TableVersions, TableViews, TimerWheel)
 
 LOG = logging.getLogger(__name__)
 
@@ -37,11 +39,24 @@ class IntegrationTestCase(AsyncTestCase):
         self._tornado_loop = None
         super().setUp()
         ServerConfig.clear()
+        Statistics.clear_leaderboard()
+        PlayerStatsAggregator.clear()
+        UUIDCache.clear()
+        TableVersions.clear()
+        TableFeed.clear()
+        TableViews.clear()
+        TableIndex.clear()
+        Matchmaker.clear()
+        HandRankCache.clear()
+        SpectatorBroadcast.clear()
+        TimerWheel.create(resolution=0.001)
         if self.SETUP_DB_CONNECTION:
             self.db = self.get_asyncio_loop().run_until_complete(self.connect_database())
             self.get_asyncio_loop().run_until_complete(create_relations())
 
     def tearDown(self):
+        TimerWheel.clear()
+        Statistics.clear_leaderboard()
         if self.db is not None:
             self.get_asyncio_loop().run_until_complete(self.db.close_connection())
             self.db = None